@@ -0,0 +1,13 @@
+import os
+
+from tnt_common.http_client import ServiceClients
+
+# Global client registry
+AUTH_SERVICE_URL = os.getenv("AUTH_SERVICE_URL", "http://localhost:8000")
+VENDOR_SERVICE_URL = os.getenv("VENDOR_SERVICE_URL", "http://localhost:8001")
+ORDER_SERVICE_URL = os.getenv("ORDER_SERVICE_URL", "http://localhost:8002")
+
+service_clients = ServiceClients()
+service_clients.register("auth", AUTH_SERVICE_URL)
+service_clients.register("vendor", VENDOR_SERVICE_URL)
+service_clients.register("order", ORDER_SERVICE_URL)
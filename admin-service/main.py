@@ -3,20 +3,78 @@ from fastapi.security import HTTPBearer
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from typing import List
-import httpx
+from contextlib import asynccontextmanager
+import asyncio
+import os
+import redis.asyncio
 
 from database import get_db, engine, Base
 from models import AdminLog
-from security import require_admin
+from security import require_admin, SECRET_KEY, ALGORITHM
+from tnt_common.metrics import MetricsMiddleware, instrument_redis, metrics_response
+from tnt_common.rate_limit import RateLimitMiddleware
+from http_client import service_clients
 
 # Base.metadata.create_all(bind=engine)  # Commented out to avoid startup issues
 
-app = FastAPI(title="TNT Admin Service")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pooled clients for auth / vendor / order fan-outs
+    await service_clients.start()
+    yield
+    await service_clients.close()
+
+
+app = FastAPI(title="TNT Admin Service", lifespan=lifespan)
+
+app.add_middleware(
+    RateLimitMiddleware,
+    service="admin",
+    redis=instrument_redis(redis.asyncio.from_url(os.getenv("REDIS_URL", "redis://localhost:6379"))),
+    jwt_secret=SECRET_KEY,
+    jwt_algorithm=ALGORITHM
+)
+# Outermost, so rate-limited requests are timed too
+app.add_middleware(MetricsMiddleware)
 
 @app.get("/")
 def root():
     return {"service": "TNT Admin Service", "status": "running"}
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return metrics_response()
+
+# Reservation ids per order-service lookup request
+RESERVATION_LOOKUP_CHUNK = 1000
+
+
+def _forward_auth(payload) -> dict:
+    """Call order-service's admin endpoints as the requesting admin"""
+    return {"Authorization": f"Bearer {payload['token']}"}
+
+
+async def _fetch_reservations(slot_ids, payload) -> dict:
+    """slot_id -> reservation, fetched concurrently in chunks"""
+    client = service_clients.get("order")
+    responses = await asyncio.gather(*(
+        client.post(
+            "/reservations/lookup",
+            json={"slot_ids": slot_ids[start:start + RESERVATION_LOOKUP_CHUNK]},
+            headers=_forward_auth(payload)
+        )
+        for start in range(0, len(slot_ids), RESERVATION_LOOKUP_CHUNK)
+    ))
+
+    reservations = {}
+    for response in responses:
+        if response.status_code != 200:
+            raise HTTPException(status_code=500, detail="Failed to fetch reservations")
+        for reservation in response.json():
+            reservations[reservation["slot_id"]] = reservation
+    return reservations
+
 # ======================================================
 # VIEW ALL VENDORS
 # ======================================================
@@ -24,15 +82,14 @@ def root():
 async def get_all_vendors(payload=Depends(require_admin)):
     """Admin-only: View all vendors across the system"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get("http://localhost:8001/vendors/")
-            if response.status_code == 200:
-                vendors = response.json()
-                # Log admin action
-                log_admin_action("VIEW_VENDORS", payload["sub"])
-                return {"vendors": vendors, "count": len(vendors)}
-            else:
-                raise HTTPException(status_code=500, detail="Failed to fetch vendors")
+        response = await service_clients.get("vendor").get("/vendors/")
+        if response.status_code == 200:
+            vendors = response.json()
+            # Log admin action
+            log_admin_action("VIEW_VENDORS", payload["sub"])
+            return {"vendors": vendors, "count": len(vendors)}
+        else:
+            raise HTTPException(status_code=500, detail="Failed to fetch vendors")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Service unavailable: {str(e)}")
 
@@ -42,25 +99,53 @@ async def get_all_vendors(payload=Depends(require_admin)):
 @app.get("/orders")
 async def get_all_orders(
     status: str = None,
+    vendor_id: str = None,
+    created_from: str = None,
+    created_to: str = None,
+    cursor: str = None,
     limit: int = 50,
+    include_counts: bool = False,
     payload=Depends(require_admin)
 ):
-    """Admin-only: View all orders across the system"""
+    """Admin-only: View all orders across the system (keyset pages)"""
     try:
-        async with httpx.AsyncClient() as client:
-            # Get orders from order service
-            url = f"http://localhost:8002/orders?limit={limit}"
-            if status:
-                url += f"&status={status}"
-
-            response = await client.get(url)
-            if response.status_code == 200:
-                orders = response.json()
-                # Log admin action
-                log_admin_action("VIEW_ORDERS", payload["sub"])
-                return {"orders": orders, "count": len(orders)}
-            else:
-                raise HTTPException(status_code=500, detail="Failed to fetch orders")
+        # Get one page of orders from order service
+        params = {"limit": limit}
+        for name, value in (
+            ("status", status),
+            ("vendor_id", vendor_id),
+            ("created_from", created_from),
+            ("created_to", created_to),
+            ("cursor", cursor),
+        ):
+            if value:
+                params[name] = value
+
+        client = service_clients.get("order")
+        headers = _forward_auth(payload)
+
+        requests = [client.get("/orders", params=params, headers=headers)]
+        if include_counts:
+            count_params = {k: v for k, v in params.items() if k in ("vendor_id", "created_from", "created_to")}
+            requests.append(client.get("/orders/counts", params=count_params, headers=headers))
+
+        responses = await asyncio.gather(*requests)
+        response = responses[0]
+
+        if response.status_code == 200:
+            orders = response.json()
+            # Log admin action
+            log_admin_action("VIEW_ORDERS", payload["sub"])
+            result = {
+                "orders": orders,
+                "count": len(orders),
+                "next_cursor": response.headers.get("X-Next-Cursor")
+            }
+            if include_counts and responses[1].status_code == 200:
+                result["counts"] = responses[1].json()
+            return result
+        else:
+            raise HTTPException(status_code=500, detail="Failed to fetch orders")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Service unavailable: {str(e)}")
 
@@ -71,47 +156,45 @@ async def get_all_orders(
 async def get_slot_utilization(payload=Depends(require_admin)):
     """Admin-only: View slot utilization across all vendors"""
     try:
-        async with httpx.AsyncClient() as client:
-            # Get all slots from vendor service
-            response = await client.get("http://localhost:8001/slots/")
-            if response.status_code != 200:
-                raise HTTPException(status_code=500, detail="Failed to fetch slots")
-
-            slots = response.json()
-
-            # Get reservations from order service
-            res_response = await client.get("http://localhost:8002/reservations/")
-            reservations = res_response.json() if res_response.status_code == 200 else []
-
-            # Calculate utilization
-            utilization_report = []
-            for slot in slots:
-                slot_id = slot["id"]
-                max_capacity = slot["max_capacity"]
-                current_load = slot.get("current_load", 0)
-
-                # Find reservation data
-                reservation = next((r for r in reservations if r["slot_id"] == slot_id), None)
-                available = reservation["available_capacity"] if reservation else max_capacity
-
-                utilization = {
-                    "slot_id": slot_id,
-                    "vendor_id": slot["vendor_id"],
-                    "max_capacity": max_capacity,
-                    "current_load": current_load,
-                    "available_capacity": available,
-                    "utilization_percentage": ((max_capacity - available) / max_capacity * 100) if max_capacity > 0 else 0
-                }
-                utilization_report.append(utilization)
+        # Get all slots from vendor service
+        response = await service_clients.get("vendor").get("/slots/")
+        if response.status_code != 200:
+            raise HTTPException(status_code=500, detail="Failed to fetch slots")
 
-            # Log admin action
-            log_admin_action("VIEW_UTILIZATION", payload["sub"])
+        slots = response.json()
+
+        # Reservations of exactly these slots, looked up in bounded chunks
+        reservations = await _fetch_reservations([slot["id"] for slot in slots], payload)
 
-            return {
-                "utilization_report": utilization_report,
-                "total_slots": len(utilization_report),
-                "average_utilization": sum(u["utilization_percentage"] for u in utilization_report) / len(utilization_report) if utilization_report else 0
+        # Calculate utilization
+        utilization_report = []
+        for slot in slots:
+            slot_id = slot["id"]
+            max_capacity = slot["max_capacity"]
+            current_load = slot.get("current_load", 0)
+
+            # Find reservation data
+            reservation = reservations.get(slot_id)
+            available = reservation["available_capacity"] if reservation else max_capacity
+
+            utilization = {
+                "slot_id": slot_id,
+                "vendor_id": slot["vendor_id"],
+                "max_capacity": max_capacity,
+                "current_load": current_load,
+                "available_capacity": available,
+                "utilization_percentage": ((max_capacity - available) / max_capacity * 100) if max_capacity > 0 else 0
             }
+            utilization_report.append(utilization)
+
+        # Log admin action
+        log_admin_action("VIEW_UTILIZATION", payload["sub"])
+
+        return {
+            "utilization_report": utilization_report,
+            "total_slots": len(utilization_report),
+            "average_utilization": sum(u["utilization_percentage"] for u in utilization_report) / len(utilization_report) if utilization_report else 0
+        }
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Service unavailable: {str(e)}")
@@ -125,25 +208,27 @@ async def system_health(payload=Depends(require_admin)):
     health_status = {}
 
     services = {
-        "auth": "http://localhost:8000/health",
-        "vendor": "http://localhost:8001/",
-        "order": "http://localhost:8002/"
+        "auth": "/health",
+        "vendor": "/",
+        "order": "/"
     }
 
-    async with httpx.AsyncClient() as client:
-        for service_name, url in services.items():
-            try:
-                response = await client.get(url, timeout=5.0)
-                health_status[service_name] = {
-                    "status": "healthy" if response.status_code == 200 else "unhealthy",
-                    "response_time": response.elapsed.total_seconds(),
-                    "status_code": response.status_code
-                }
-            except Exception as e:
-                health_status[service_name] = {
-                    "status": "unreachable",
-                    "error": str(e)
-                }
+    async def probe(service_name: str, path: str):
+        try:
+            response = await service_clients.get(service_name).get(path, timeout=5.0)
+            health_status[service_name] = {
+                "status": "healthy" if response.status_code == 200 else "unhealthy",
+                "response_time": response.elapsed.total_seconds(),
+                "status_code": response.status_code
+            }
+        except Exception as e:
+            health_status[service_name] = {
+                "status": "unreachable",
+                "error": str(e)
+            }
+
+    # Probe all services concurrently over the pooled clients
+    await asyncio.gather(*(probe(name, path) for name, path in services.items()))
 
     # Log admin action
     log_admin_action("HEALTH_CHECK", payload["sub"])
@@ -20,8 +20,11 @@ def require_admin(credentials: HTTPAuthorizationCredentials = Depends(security))
             raise HTTPException(status_code=403, detail="Admin access required")
 
         return {
+            "sub": phone,
             "phone": phone,
-            "role": role
+            "role": role,
+            # Forwarded to order-service's admin listings
+            "token": token
         }
 
     except Exception:
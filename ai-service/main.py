@@ -2,19 +2,40 @@ from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 from typing import List, Optional
 import datetime
+import os
 import random
+import redis.asyncio
+
+from tnt_common.metrics import MetricsMiddleware, instrument_redis, metrics_response
+from tnt_common.rate_limit import RateLimitMiddleware
+
+# Same secret as the other services: user tokens are limited per subject,
+# order-service's service tokens are not limited
+JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "TNT_SUPER_SECRET_KEY")
+JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 
 app = FastAPI(title="TNT AI Service", version="1.0.0")
 
+app.add_middleware(
+    RateLimitMiddleware,
+    service="ai",
+    redis=instrument_redis(redis.asyncio.from_url(os.getenv("REDIS_URL", "redis://localhost:6379"))),
+    jwt_secret=JWT_SECRET_KEY,
+    jwt_algorithm=JWT_ALGORITHM
+)
+# Outermost, so rate-limited requests are timed too
+app.add_middleware(MetricsMiddleware)
+
 # ======================================================
 # REQUEST/RESPONSE MODELS
 # ======================================================
 
 class ETAPredictionRequest(BaseModel):
-    vendor_id: int
-    slot_id: int
+    vendor_id: str  # UUIDs from vendor-service
+    slot_id: str
     current_orders: int
     historical_avg_orders: float
+    history_days: Optional[int] = None  # trading days behind historical_avg_orders
     time_of_day: str  # "morning", "afternoon", "evening"
     day_of_week: str  # "monday", "tuesday", etc.
 
@@ -24,7 +45,7 @@ class ETAPredictionResponse(BaseModel):
     factors: List[str]
 
 class RushDetectionRequest(BaseModel):
-    vendor_id: int
+    vendor_id: str
     current_capacity: int
     available_capacity: int
     booking_rate_per_minute: float
@@ -68,7 +89,10 @@ def predict_eta(request: ETAPredictionRequest) -> ETAPredictionResponse:
     estimated_minutes = int(base_time * load_multiplier * time_multiplier * day_multiplier)
 
     # Confidence based on historical data availability
-    confidence = min(0.95, request.historical_avg_orders / 50)  # higher confidence with more data
+    if request.history_days is not None:
+        confidence = min(0.95, 0.5 + request.history_days / 60)  # ~8 weeks of history for full confidence
+    else:
+        confidence = min(0.95, request.historical_avg_orders / 50)  # higher confidence with more data
 
     # Factors contributing to ETA
     factors = []
@@ -152,6 +176,10 @@ def root():
 def health():
     return {"status": "healthy", "timestamp": datetime.datetime.utcnow()}
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return metrics_response()
+
 @app.post("/predict-eta", response_model=ETAPredictionResponse)
 def predict_eta_endpoint(request: ETAPredictionRequest):
     """Predict estimated time of arrival for an order"""
@@ -176,8 +204,8 @@ def detect_rush_endpoint(request: RushDetectionRequest):
 def test_eta():
     """Test endpoint with sample data"""
     sample_request = ETAPredictionRequest(
-        vendor_id=1,
-        slot_id=1,
+        vendor_id="1",
+        slot_id="1",
         current_orders=5,
         historical_avg_orders=20.0,
         time_of_day="afternoon",
@@ -189,7 +217,7 @@ def test_eta():
 def test_rush():
     """Test endpoint with sample data"""
     sample_request = RushDetectionRequest(
-        vendor_id=1,
+        vendor_id="1",
         current_capacity=20,
         available_capacity=5,
         booking_rate_per_minute=1.5,
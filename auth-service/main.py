@@ -5,8 +5,11 @@ from sqlalchemy.orm import Session
 from jose import jwt, JWTError
 from datetime import datetime, timedelta
 from pydantic import BaseModel, validator
+from contextlib import asynccontextmanager
+from typing import Optional
+import os
 import random
-import httpx
+import redis.asyncio
 
 from database import get_db, engine
 from models import User
@@ -14,10 +17,32 @@ from utils.response import success_response, error_response
 from utils.jwt_service import jwt_service
 from utils.otp_service import otp_service
 from utils.audit_logger import audit_logger
+from utils.http_client import service_clients
+from tnt_common.metrics import MetricsMiddleware, instrument_redis, metrics_response
+from tnt_common.rate_limit import RateLimitMiddleware
 
 
 # ---------------- APP INIT ----------------
-app = FastAPI(title="TNT Auth Service")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pooled client for vendor-service lookups
+    await service_clients.start()
+    yield
+    await service_clients.close()
+
+
+app = FastAPI(title="TNT Auth Service", lifespan=lifespan)
+
+# Throttles OTP / login abuse before it reaches the database
+app.add_middleware(
+    RateLimitMiddleware,
+    service="auth",
+    redis=instrument_redis(redis.asyncio.from_url(os.getenv("REDIS_URL", "redis://localhost:6379"))),
+    jwt_secret=jwt_service.secret_key,
+    jwt_algorithm=jwt_service.algorithm
+)
+# Outermost, so rate-limited requests are timed too
+app.add_middleware(MetricsMiddleware)
 
 User.metadata.create_all(bind=engine)
 
@@ -56,6 +81,11 @@ def health():
     return success_response("Auth Service is healthy ✅")
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return metrics_response()
+
+
 # ---------------- REQUEST MODELS ----------------
 class LoginRequest(BaseModel):
     phone: str
@@ -109,9 +139,12 @@ async def verify_otp(data: VerifyOTPRequest, db: Session = Depends(get_db)):
 
     user = db.query(User).filter(User.phone == data.phone).first()
 
+    # Resolve vendor identity once (also embedded in the token below)
+    vendor_id = await get_vendor_id(data.phone)
+    is_vendor = vendor_id is not None
+
     if not user:
         # Determine role by checking vendor existence
-        is_vendor = await check_vendor_exists(data.phone)
         role = "vendor" if is_vendor else "student"
 
         user = User(phone=data.phone, role=role)
@@ -119,7 +152,6 @@ async def verify_otp(data: VerifyOTPRequest, db: Session = Depends(get_db)):
         db.commit()
     else:
         # Update role if user exists but role might be outdated
-        is_vendor = await check_vendor_exists(data.phone)
         new_role = "vendor" if is_vendor else "student"
         if user.role != new_role:
             user.role = new_role
@@ -128,7 +160,11 @@ async def verify_otp(data: VerifyOTPRequest, db: Session = Depends(get_db)):
     db.refresh(user)
 
     # Create JWT token
-    token = jwt_service.create_access_token(user.phone, user.role)
+    token = jwt_service.create_access_token(
+        user.phone,
+        user.role,
+        vendor_id=vendor_id if user.role == "vendor" else None
+    )
 
     # Log successful login
     audit_logger.log_login_attempt(user.phone, success=True)
@@ -202,15 +238,22 @@ def get_all_users(
 
 
 # ---------------- HELPER FUNCTIONS ----------------
-async def check_vendor_exists(phone: str) -> bool:
-    """Check if phone exists as vendor in vendor-service"""
+async def get_vendor_id(phone: str) -> Optional[str]:
+    """Return the vendor-service id for a phone, or None if it is not a vendor"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"http://localhost:8001/vendors/phone/{phone}")
-            return response.status_code == 200
+        client = service_clients.get("vendor")
+        response = await client.get(f"/vendors/phone/{phone}")
+        if response.status_code == 200:
+            return response.json()["id"]
+        return None
     except:
         # If vendor-service is down, assume not vendor
-        return False
+        return None
+
+
+async def check_vendor_exists(phone: str) -> bool:
+    """Check if phone exists as vendor in vendor-service"""
+    return await get_vendor_id(phone) is not None
 
 
 # ---------------- ADMIN: ASSIGN ROLE ----------------
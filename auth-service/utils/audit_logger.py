@@ -7,8 +7,8 @@ class AuditLogger:
         self.logger = logging.getLogger('tnt_audit')
         self.logger.setLevel(logging.INFO)
 
-        # Create logs directory if it doesn't exist
-        log_dir = os.path.join(os.getcwd(), 'logs')
+        # Create logs directory if it doesn't exist (AUDIT_LOG_DIR, default ./logs)
+        log_dir = os.getenv('AUDIT_LOG_DIR', os.path.join(os.getcwd(), 'logs'))
         os.makedirs(log_dir, exist_ok=True)
 
         # File handler
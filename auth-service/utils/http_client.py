@@ -0,0 +1,9 @@
+import os
+
+from tnt_common.http_client import ServiceClients
+
+# Global client registry
+VENDOR_SERVICE_URL = os.getenv("VENDOR_SERVICE_URL", "http://localhost:8001")
+
+service_clients = ServiceClients()
+service_clients.register("vendor", VENDOR_SERVICE_URL)
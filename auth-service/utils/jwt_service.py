@@ -3,14 +3,17 @@ from datetime import datetime, timedelta
 from jose import jwt, JWTError
 from fastapi import HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials
+from typing import Optional
 
 class JWTService:
     def __init__(self):
         self.secret_key = os.getenv("JWT_SECRET_KEY", "TNT_SUPER_SECRET_KEY")
         self.algorithm = os.getenv("JWT_ALGORITHM", "HS256")
         self.access_token_expire_minutes = int(os.getenv("JWT_ACCESS_TOKEN_EXPIRE_MINUTES", 10))
+        # Embed vendor_id so vendor/order services can skip the phone lookup
+        self.embed_vendor_id = os.getenv("JWT_EMBED_VENDOR_ID", "true").lower() == "true"
 
-    def create_access_token(self, phone: str, role: str) -> str:
+    def create_access_token(self, phone: str, role: str, vendor_id: Optional[str] = None) -> str:
         """Create JWT access token"""
         expire = datetime.utcnow() + timedelta(minutes=self.access_token_expire_minutes)
 
@@ -22,6 +25,9 @@ class JWTService:
             "iss": "tnt-auth-service"
         }
 
+        if vendor_id and self.embed_vendor_id:
+            payload["vendor_id"] = str(vendor_id)
+
         return jwt.encode(payload, self.secret_key, algorithm=self.algorithm)
 
     def verify_token(self, credentials: HTTPAuthorizationCredentials) -> dict:
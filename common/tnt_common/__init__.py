@@ -0,0 +1,8 @@
+"""
+Code shared by every TNT service (install with `pip install -e common`).
+
+- http_client: pooled httpx clients for calls to other services
+- metrics: Prometheus metrics, client instrumentation and GET /metrics
+- rate_limit: distributed per-client rate limiting (ASGI middleware)
+- ttl_cache: bounded in-process LRU cache with expiring entries
+"""
@@ -0,0 +1,81 @@
+import importlib.util
+import os
+from typing import Dict, Optional
+
+import httpx
+
+from tnt_common.metrics import http_client_hooks
+
+# Pool / timeout defaults (override per upstream with <NAME>_HTTP_* env vars)
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "2"))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "5"))
+
+H2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+def _env(name: str, key: str, default):
+    return type(default)(os.getenv(f"{name.upper()}_HTTP_{key}", default))
+
+
+class ServiceClients:
+    """
+    One long-lived, pooled httpx.AsyncClient per upstream service.
+
+    Clients are opened at app lifespan and closed on shutdown, so calls on
+    the request path reuse keep-alive connections instead of dialing a new
+    TCP connection each time.
+    """
+
+    def __init__(self):
+        self._upstreams: Dict[str, str] = {}
+        self._auth: Dict[str, Optional[httpx.Auth]] = {}
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    def register(self, name: str, base_url: str, auth: Optional[httpx.Auth] = None):
+        self._upstreams[name] = base_url
+        self._auth[name] = auth
+
+    def _build(self, name: str) -> httpx.AsyncClient:
+        limits = httpx.Limits(
+            max_connections=_env(name, "MAX_CONNECTIONS", HTTP_MAX_CONNECTIONS),
+            max_keepalive_connections=_env(name, "MAX_KEEPALIVE", HTTP_MAX_KEEPALIVE),
+            keepalive_expiry=_env(name, "KEEPALIVE_EXPIRY", HTTP_KEEPALIVE_EXPIRY),
+        )
+        timeout = httpx.Timeout(
+            _env(name, "TIMEOUT", HTTP_TIMEOUT),
+            connect=_env(name, "CONNECT_TIMEOUT", HTTP_CONNECT_TIMEOUT),
+        )
+        # HTTP/2 only where the upstream speaks it and h2 is installed
+        http2 = H2_AVAILABLE and os.getenv(f"{name.upper()}_HTTP2", "false").lower() == "true"
+
+        return httpx.AsyncClient(
+            base_url=self._upstreams[name],
+            limits=limits,
+            timeout=timeout,
+            http2=http2,
+            auth=self._auth[name],
+            event_hooks=http_client_hooks(name),
+        )
+
+    async def start(self):
+        """Open a client for every registered upstream"""
+        for name in self._upstreams:
+            if name not in self._clients:
+                self._clients[name] = self._build(name)
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        """Return the pooled client for an upstream (opened lazily outside the app)"""
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            client = self._clients[name] = self._build(name)
+        return client
+
+    async def close(self):
+        """Close every pool"""
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
@@ -0,0 +1,248 @@
+"""
+Prometheus metrics, served on GET /metrics.
+
+Shared by every service. Label sets are
+resolved to metric children once (at import, startup or first use) and
+kept, so the request path only reads a clock and observes a value.
+
+With several uvicorn workers, point PROMETHEUS_MULTIPROC_DIR at an empty
+directory shared by the workers so /metrics reports all of them.
+"""
+import inspect
+import os
+from time import perf_counter
+from typing import Dict, Iterable, Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest
+from prometheus_client import multiprocess
+from starlette.responses import Response
+
+PROMETHEUS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+# Seconds: from sub-millisecond Redis calls to requests stuck on a slow upstream
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+STATUS_CLASSES = ("1xx", "2xx", "3xx", "4xx", "5xx")
+# Created up front for every route (others on first use)
+PRIMED_STATUS_CLASSES = ("2xx", "4xx", "5xx")
+HTTP_METHODS = ("GET", "POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS")
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+# ======================================================
+# METRICS
+# ======================================================
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Time to answer a request, per route template",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS
+)
+STAGE_SECONDS = Histogram(
+    "operation_stage_duration_seconds",
+    "Time spent in each stage of an instrumented operation",
+    ["operation", "stage"],
+    buckets=LATENCY_BUCKETS
+)
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "db_pool_checkout_duration_seconds",
+    "Time to get a connection from the pool (waiting for a free one, or connecting)",
+    ["pool"],
+    buckets=LATENCY_BUCKETS
+)
+REDIS_COMMAND_SECONDS = Histogram(
+    "redis_command_duration_seconds",
+    "Redis round trips, per command (EVALSHA for scripts, PIPELINE for a pipeline)",
+    ["command"],
+    buckets=LATENCY_BUCKETS
+)
+HTTP_CLIENT_SECONDS = Histogram(
+    "http_client_request_duration_seconds",
+    "Calls to other services, until the response headers arrive",
+    ["upstream", "status"],
+    buckets=LATENCY_BUCKETS
+)
+CONTENTION_TOTAL = Counter(
+    "lock_contention_total",
+    "Times a caller lost a race for a shared resource (seat, lock, queue slot)",
+    ["resource", "outcome"]
+)
+
+
+class LabelSet:
+    """Children of `metric` under fixed leading labels, one attribute per name"""
+
+    def __init__(self, metric, prefix: Tuple[str, ...], names: Iterable[str]):
+        for name in names:
+            setattr(self, name, metric.labels(*prefix, name))
+
+
+def stages(operation: str, *names: str) -> LabelSet:
+    """Stage timers of one operation: `with STAGES.commit.time(): ...`"""
+    return LabelSet(STAGE_SECONDS, (operation,), names)
+
+
+def contention(resource: str, *outcomes: str) -> LabelSet:
+    """Contention counters of one resource: `CONTENTION.full.inc()`"""
+    return LabelSet(CONTENTION_TOTAL, (resource,), outcomes)
+
+
+# ======================================================
+# CLIENT INSTRUMENTATION (DB POOL / REDIS / HTTP)
+# ======================================================
+def instrument_pool(engine, name: str):
+    """Time checkouts from a SQLAlchemy engine's pool (sync or asyncio engine)"""
+    from sqlalchemy import event
+
+    engine = getattr(engine, "sync_engine", engine)
+    child = DB_POOL_CHECKOUT_SECONDS.labels(name)
+
+    def wrap(pool):
+        connect = pool.connect
+
+        def timed_connect():
+            started = perf_counter()
+            try:
+                return connect()
+            finally:
+                child.observe(perf_counter() - started)
+
+        pool.connect = timed_connect
+
+    wrap(engine.pool)
+    # dispose() swaps in a fresh pool
+    event.listen(engine, "engine_disposed", lambda disposed: wrap(disposed.pool))
+    return engine
+
+
+_redis_children: Dict[str, object] = {}
+
+
+def _redis_child(command) -> object:
+    child = _redis_children.get(command)
+    if child is None:
+        name = command.decode() if isinstance(command, bytes) else str(command)
+        child = _redis_children[command] = REDIS_COMMAND_SECONDS.labels(name.upper())
+    return child
+
+
+def _timed_redis(call, is_async: bool, command=None):
+    """Wrap a client's execute_command (command taken from the call) or a pipeline's execute"""
+    if is_async:
+        async def timed(*args, **options):
+            started = perf_counter()
+            try:
+                return await call(*args, **options)
+            finally:
+                _redis_child(command or args[0]).observe(perf_counter() - started)
+    else:
+        def timed(*args, **options):
+            started = perf_counter()
+            try:
+                return call(*args, **options)
+            finally:
+                _redis_child(command or args[0]).observe(perf_counter() - started)
+    return timed
+
+
+def instrument_redis(client):
+    """Time every command and pipeline of a redis-py client (sync or asyncio); returns it"""
+    is_async = inspect.iscoroutinefunction(client.execute_command)
+    client.execute_command = _timed_redis(client.execute_command, is_async)
+
+    pipeline = client.pipeline
+
+    def timed_pipeline(*args, **kwargs):
+        pipe = pipeline(*args, **kwargs)
+        pipe.execute = _timed_redis(pipe.execute, is_async, "PIPELINE")
+        return pipe
+
+    client.pipeline = timed_pipeline
+    return client
+
+
+def http_client_hooks(upstream: str) -> Dict[str, list]:
+    """httpx.AsyncClient event hooks timing each call to `upstream`"""
+    children = [HTTP_CLIENT_SECONDS.labels(upstream, status) for status in STATUS_CLASSES]
+
+    async def on_request(request):
+        request.extensions["metrics_started"] = perf_counter()
+
+    async def on_response(response):
+        started = response.request.extensions.get("metrics_started")
+        if started is not None:
+            children[min(max(response.status_code // 100, 1), 5) - 1].observe(perf_counter() - started)
+
+    return {"request": [on_request], "response": [on_response]}
+
+
+# ======================================================
+# ASGI MIDDLEWARE + ENDPOINT
+# ======================================================
+class MetricsMiddleware:
+    """
+    Request latency per method, route template and status class. The
+    route table is read on the first request and the children of its
+    routes are created then; unknown paths share one route label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._routes = None
+        self._children: Dict[Tuple[str, str, str], object] = {}
+
+    def _prime(self, app):
+        routes = {}
+        for route in getattr(app, "routes", []):
+            endpoint = getattr(route, "endpoint", None)
+            if endpoint is None:
+                continue
+            routes.setdefault(endpoint, route.path)
+            for method in getattr(route, "methods", None) or ("GET",):
+                for status in PRIMED_STATUS_CLASSES:
+                    self._children[(method, route.path, status)] = REQUEST_SECONDS.labels(method, route.path, status)
+        self._routes = routes
+
+    def _child(self, method: str, route: str, status: str):
+        child = self._children.get((method, route, status))
+        if child is None:
+            # 1xx / 3xx, HEAD / OPTIONS, unmatched paths; unknown methods are "OTHER"
+            key = (method if method in HTTP_METHODS else "OTHER", route, status)
+            child = self._children.get(key)
+            if child is None:
+                child = self._children[key] = REQUEST_SECONDS.labels(*key)
+        return child
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if self._routes is None:
+            self._prime(scope["app"])
+
+        started = perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router leaves the matched endpoint in the scope
+            route = self._routes.get(scope.get("endpoint"), UNMATCHED_ROUTE)
+            status_class = STATUS_CLASSES[min(max(status // 100, 1), 5) - 1]
+            self._child(scope["method"], route, status_class).observe(perf_counter() - started)
+
+
+def metrics_response() -> Response:
+    """Prometheus text exposition of this process (or of every worker)"""
+    registry = REGISTRY
+    if PROMETHEUS_MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return Response(generate_latest(registry), headers={"Content-Type": CONTENT_TYPE_LATEST})
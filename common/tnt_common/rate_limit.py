@@ -0,0 +1,277 @@
+import ipaddress
+import logging
+import math
+import os
+import re
+import time
+from typing import Dict, Optional
+
+from jose import jwt
+from redis.exceptions import RedisError
+from starlette.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+# Same settings as get_rate_limit_config() in security-config.py
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_REQUESTS = int(os.getenv("RATE_LIMIT_REQUESTS", "100"))
+RATE_LIMIT_WINDOW = int(os.getenv("RATE_LIMIT_WINDOW", "60"))  # seconds
+RATE_LIMIT_KEY_PREFIX = os.getenv("RATE_LIMIT_KEY_PREFIX", "rate_limit:")
+RATE_LIMIT_BLOCK_DURATION = int(os.getenv("RATE_LIMIT_BLOCK_DURATION", "300"))
+
+# Largest batch of tokens a worker leases for one key (local pre-filter)
+RATE_LIMIT_MAX_LEASE = int(os.getenv("RATE_LIMIT_MAX_LEASE", str(max(1, RATE_LIMIT_REQUESTS // 10))))
+# Leased tokens not spent within this many seconds are dropped
+RATE_LIMIT_LEASE_TTL = float(os.getenv("RATE_LIMIT_LEASE_TTL", "1"))
+RATE_LIMIT_LOCAL_KEYS = int(os.getenv("RATE_LIMIT_LOCAL_KEYS", "10000"))
+# Seconds to stop asking Redis after it fails (requests are let through)
+RATE_LIMIT_REDIS_BACKOFF = float(os.getenv("RATE_LIMIT_REDIS_BACKOFF", "5"))
+
+# Only honour X-Forwarded-For behind a proxy that sets it
+RATE_LIMIT_TRUST_FORWARDED = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "false").lower() == "true"
+# Networks whose callers are not limited. Empty by default: behind a local
+# reverse proxy every request arrives from localhost
+RATE_LIMIT_EXEMPT_NETWORKS = [
+    ipaddress.ip_network(network.strip())
+    for network in os.getenv("RATE_LIMIT_EXEMPT_NETWORKS", "").split(",")
+    if network.strip()
+]
+# Service-to-service callers are recognised by their signed token, not their address
+SERVICE_TOKEN_ISSUERS = {"tnt-order-service"}
+
+EXEMPT_PATHS = {"/", "/health", "/docs", "/openapi.json", "/metrics"}
+
+# Path segments that are ids (uuid / numeric / phone) collapse into one route key
+_ID_SEGMENT = re.compile(r"^([0-9a-fA-F]{8}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{12}|\+?\d+)$")
+
+
+# ======================================================
+# LUA SCRIPT (GCRA, executed atomically inside Redis)
+# ======================================================
+# KEYS[1] = theoretical arrival time, KEYS[2] = block flag, KEYS[3] = strike counter
+# ARGV[1] = now, ARGV[2] = emission interval, ARGV[3] = window,
+# ARGV[4] = tokens wanted, ARGV[5] = requests refused locally since the last call,
+# ARGV[6] = block duration, ARGV[7] = strikes before blocking
+# Returns {tokens granted, retry after (ms)}
+GCRA_SCRIPT = """
+local blocked = redis.call('PTTL', KEYS[2])
+if blocked > 0 then
+    return {0, blocked}
+end
+
+local now = tonumber(ARGV[1])
+local interval = tonumber(ARGV[2])
+local window = tonumber(ARGV[3])
+
+local tat = tonumber(redis.call('GET', KEYS[1]) or '0')
+if tat < now then
+    tat = now
+end
+
+local available = math.floor((now + window - tat) / interval)
+
+-- Every refused request counts; a client that keeps going is blocked
+local strikes = tonumber(ARGV[5])
+if available < 1 then
+    strikes = strikes + 1
+end
+if strikes > 0 then
+    local total = redis.call('INCRBY', KEYS[3], strikes)
+    redis.call('PEXPIRE', KEYS[3], math.ceil(window * 1000))
+    if total >= tonumber(ARGV[7]) then
+        redis.call('SET', KEYS[2], 1, 'EX', ARGV[6])
+        redis.call('DEL', KEYS[3])
+        return {0, tonumber(ARGV[6]) * 1000}
+    end
+end
+
+if available < 1 then
+    return {0, math.ceil((tat - window + interval - now) * 1000)}
+end
+
+local granted = math.min(available, tonumber(ARGV[4]))
+tat = tat + granted * interval
+redis.call('SET', KEYS[1], string.format('%.6f', tat), 'PX', math.ceil((tat - now) * 1000))
+return {granted, 0}
+"""
+
+
+class _LocalBucket:
+    """Tokens this worker leased from Redis for one key"""
+
+    __slots__ = ("tokens", "expires_at", "lease", "denied_until", "refused")
+
+    def __init__(self):
+        self.tokens = 0
+        self.expires_at = 0.0
+        self.lease = 0
+        self.denied_until = 0.0
+        self.refused = 0
+
+
+class RateLimiter:
+    """
+    Distributed GCRA limit (`requests` per `window`, bursts up to the
+    full quota) kept in Redis and shared by every worker.
+
+    Each worker leases tokens in batches and spends them locally, so a
+    busy key touches Redis about once per lease instead of once per
+    request. Leases start at one token and double while a key keeps
+    draining them (capped by RATE_LIMIT_MAX_LEASE), so quiet clients are
+    never over-reserved. Refusals are also answered locally until their
+    Retry-After; clients that keep hammering are blocked for
+    RATE_LIMIT_BLOCK_DURATION.
+    """
+
+    def __init__(self, redis, requests: int = RATE_LIMIT_REQUESTS, window: int = RATE_LIMIT_WINDOW):
+        self.redis = redis
+        self.window = window
+        self.interval = window / requests
+        self.strike_limit = requests
+        self._gcra = redis.register_script(GCRA_SCRIPT)
+        self._buckets: Dict[str, _LocalBucket] = {}
+        self._redis_down_until = 0.0
+
+    async def check(self, key: str, identity: str) -> Optional[float]:
+        """None if allowed, else seconds until the client may retry"""
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+
+        if bucket is None:
+            bucket = self._buckets[key] = _LocalBucket()
+            self._prune(now)
+
+        if bucket.denied_until > now:
+            bucket.refused += 1
+            return bucket.denied_until - now
+
+        if bucket.expires_at > now:
+            if bucket.tokens > 0:
+                bucket.tokens -= 1
+                return None
+            # Lease drained before it expired: hot key, lease more
+            want = min(bucket.lease * 2, RATE_LIMIT_MAX_LEASE)
+        else:
+            want = 1
+
+        if now < self._redis_down_until:
+            return None
+
+        prefix = RATE_LIMIT_KEY_PREFIX
+        try:
+            granted, retry_ms = await self._gcra(
+                keys=[
+                    f"{prefix}{key}",
+                    f"{prefix}block:{identity}",
+                    f"{prefix}strikes:{identity}",
+                ],
+                args=[
+                    time.time(), self.interval, self.window, want,
+                    bucket.refused, RATE_LIMIT_BLOCK_DURATION, self.strike_limit,
+                ]
+            )
+        except RedisError as e:
+            # Fail open: an outage must not take the service down with it
+            logger.warning(f"Rate limiter unavailable: {e}")
+            self._redis_down_until = now + RATE_LIMIT_REDIS_BACKOFF
+            return None
+
+        bucket.refused = 0
+
+        if granted:
+            bucket.tokens = int(granted) - 1
+            bucket.lease = int(granted)
+            bucket.expires_at = now + RATE_LIMIT_LEASE_TTL
+            return None
+
+        retry_after = int(retry_ms) / 1000
+        bucket.tokens = 0
+        bucket.denied_until = now + retry_after
+        return retry_after
+
+    def _prune(self, now: float):
+        if len(self._buckets) <= RATE_LIMIT_LOCAL_KEYS:
+            return
+        for key in [k for k, b in self._buckets.items() if b.expires_at <= now and b.denied_until <= now]:
+            del self._buckets[key]
+        if len(self._buckets) > RATE_LIMIT_LOCAL_KEYS:
+            self._buckets.clear()
+
+
+# ======================================================
+# ASGI MIDDLEWARE
+# ======================================================
+def route_key(method: str, path: str) -> str:
+    return method + " " + "/".join(
+        "{id}" if _ID_SEGMENT.match(segment) else segment
+        for segment in path.split("/")
+    )
+
+
+class RateLimitMiddleware:
+    """
+    Limits every client per route: by JWT subject when the request
+    carries a valid token, else by client IP. Service tokens are not
+    limited. Answers 429 with Retry-After before the request reaches any
+    handler.
+    """
+
+    def __init__(self, app, service: str, redis, jwt_secret: Optional[str] = None, jwt_algorithm: str = "HS256"):
+        self.app = app
+        self.service = service
+        self.jwt_secret = jwt_secret
+        self.jwt_algorithm = jwt_algorithm
+        self.limiter = RateLimiter(redis)
+
+    async def __call__(self, scope, receive, send):
+        if not RATE_LIMIT_ENABLED or scope["type"] != "http" or scope["path"] in EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        identity = self._identity(scope)
+        if identity is None:
+            await self.app(scope, receive, send)
+            return
+
+        key = f"{self.service}:{route_key(scope['method'], scope['path'])}:{identity}"
+        retry_after = await self.limiter.check(key, f"{self.service}:{identity}")
+
+        if retry_after is None:
+            await self.app(scope, receive, send)
+            return
+
+        response = JSONResponse(
+            {"detail": "Too many requests"},
+            status_code=429,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+        )
+        await response(scope, receive, send)
+
+    def _identity(self, scope) -> Optional[str]:
+        """Rate-limit identity, or None for exempt callers"""
+        headers = dict(scope["headers"])
+
+        authorization = headers.get(b"authorization", b"").decode("latin-1")
+        if self.jwt_secret and authorization[:7].lower() == "bearer ":
+            try:
+                payload = jwt.decode(authorization[7:], self.jwt_secret, algorithms=[self.jwt_algorithm])
+            except Exception:
+                payload = None
+            if payload:
+                if payload.get("iss") in SERVICE_TOKEN_ISSUERS:
+                    return None
+                if payload.get("sub"):
+                    return f"sub:{payload['sub']}"
+
+        client_ip = scope["client"][0] if scope.get("client") else "unknown"
+        if RATE_LIMIT_TRUST_FORWARDED and b"x-forwarded-for" in headers:
+            client_ip = headers[b"x-forwarded-for"].decode("latin-1").split(",")[0].strip()
+
+        try:
+            address = ipaddress.ip_address(client_ip)
+        except ValueError:
+            return f"ip:{client_ip}"
+
+        if any(address in network for network in RATE_LIMIT_EXEMPT_NETWORKS):
+            return None
+        return f"ip:{client_ip}"
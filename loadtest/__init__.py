@@ -0,0 +1,22 @@
+"""
+Lunch-rush load harness for the booking path.
+
+Starts order-service and ai-service locally (uvicorn subprocesses) next
+to a vendor-service stand-in, a database (throwaway SQLite unless
+--order-db-url is given) and Redis (a fakeredis server unless
+--redis-url is given), drives one scenario against POST /orders and
+friends, then reports throughput, latency percentiles, 409/429 rates and
+capacity-correctness checks read back through the admin API.
+
+    python -m loadtest burst --students 2000 --capacity 300 --concurrency 200
+    python -m loadtest mixed --students 500 --slots 20 --browse 4
+    python -m loadtest cancel --students 1000 --slots 5 --cancel-ratio 0.3
+
+SQLite takes one writer at a time, so booking latency on the default
+stack is dominated by lock waits: use it to check correctness and to
+compare changes on the same machine, and point --order-db-url at
+Postgres (and --redis-url at a real Redis) for absolute numbers. Run the
+harness on other cores than the services when measuring.
+
+See `python -m loadtest <scenario> --help` for the options.
+"""
@@ -0,0 +1,114 @@
+import argparse
+import asyncio
+import json
+import random
+import sys
+
+from loadtest import __doc__ as DOC
+from loadtest.report import Recorder, print_report
+from loadtest.scenarios import SCENARIOS, Client, verify
+from loadtest.stack import LocalStack, build_fixture
+
+
+async def run_scenario(stack: LocalStack, args):
+    recorder = Recorder()
+    client = Client(stack.order_url, recorder, args)
+    rng = random.Random(args.seed)
+
+    recorder.start()
+    try:
+        ledger = await SCENARIOS[args.scenario](client, stack.fixture, args, rng)
+    finally:
+        recorder.stop()
+        await client.close()
+
+    checks = await verify(stack.order_url, stack.fixture, ledger, args.scenario, args)
+    return recorder.summary(), checks, ledger
+
+
+def fixture_for(args):
+    if args.scenario == "burst":
+        return build_fixture(vendors=1, slots=1, capacity=args.capacity)
+    return build_fixture(vendors=args.vendors, slots=args.slots, capacity=args.capacity)
+
+
+def main(args) -> int:
+    with LocalStack(
+        fixture_for(args),
+        order_db_url=args.order_db_url,
+        redis_url=args.redis_url,
+        workers=args.workers,
+        rate_limit=args.rate_limit,
+        vendor_latency_ms=args.vendor_latency_ms,
+        keep=args.keep
+    ) as stack:
+        summary, checks, ledger = asyncio.run(run_scenario(stack, args))
+
+        extra = {
+            "stack": f"order-service x{args.workers} on {stack.order_db_url.split(':')[0]}, "
+                     f"redis {stack.redis_url}",
+            "bookings": f"{len(ledger.booked)} confirmed, {len(ledger.cancelled)} cancelled, "
+                        f"{ledger.full} turned away (409), {ledger.gave_up} gave up (429)",
+        }
+        if args.keep:
+            extra["logs"] = stack.workdir
+
+    print_report(args.scenario, summary, checks, extra)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "scenario": args.scenario,
+                "options": {k: v for k, v in vars(args).items() if k != "json"},
+                "summary": summary,
+                "checks": checks,
+            }, f, indent=2)
+
+    return 0 if all(check["ok"] for check in checks) else 1
+
+
+def parse_args(argv=None):
+    common = argparse.ArgumentParser(add_help=False)
+    stack = common.add_argument_group("stack")
+    stack.add_argument("--order-db-url", help="order database (default: throwaway SQLite)")
+    stack.add_argument("--redis-url", help="Redis to use (default: a fakeredis server)")
+    stack.add_argument("--workers", type=int, default=1, help="order-service uvicorn workers")
+    stack.add_argument("--rate-limit", action="store_true", help="keep the per-client rate limiter on")
+    stack.add_argument("--vendor-latency-ms", type=float, default=0, help="delay added by the vendor stand-in")
+    stack.add_argument("--keep", action="store_true", help="keep the work dir (logs, SQLite file)")
+
+    load = common.add_argument_group("load")
+    load.add_argument("--students", type=int, default=1000)
+    load.add_argument("--concurrency", type=int, default=100, help="requests in flight")
+    load.add_argument("--capacity", type=int, default=100, help="seats per slot")
+    load.add_argument("--retries", type=int, default=5, help="retries of a 429 (queued) booking")
+    load.add_argument("--max-retry-wait", type=float, default=2, help="cap on Retry-After (s)")
+    load.add_argument("--timeout", type=float, default=30)
+    load.add_argument("--seed", type=int, default=42)
+    load.add_argument("--json", help="also write the results to this file")
+
+    parser = argparse.ArgumentParser(
+        prog="python -m loadtest",
+        description=DOC,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    scenarios = parser.add_subparsers(dest="scenario", required=True)
+
+    scenarios.add_parser("burst", parents=[common], help="everyone books one slot at once")
+
+    mixed = scenarios.add_parser("mixed", parents=[common], help="browse + book across many slots")
+    mixed.add_argument("--vendors", type=int, default=5)
+    mixed.add_argument("--slots", type=int, default=20)
+    mixed.add_argument("--browse", type=int, default=4, help="browse requests per booking")
+
+    cancel = scenarios.add_parser("cancel", parents=[common], help="book, cancel some, re-book the freed seats")
+    cancel.add_argument("--vendors", type=int, default=2)
+    cancel.add_argument("--slots", type=int, default=5)
+    cancel.add_argument("--cancel-ratio", type=float, default=0.3)
+    cancel.add_argument("--rebook", type=int, default=300, help="students in the second wave")
+
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args()))
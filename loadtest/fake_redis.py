@@ -0,0 +1,49 @@
+"""
+Standalone fakeredis server, used when no --redis-url is given.
+
+    python -m loadtest.fake_redis --port 6390
+
+Runs in its own process so the services and the load generator do not
+share its interpreter. Lua scripts need `lupa` installed next to fakeredis.
+"""
+import argparse
+
+from fakeredis import TcpFakeServer
+from fakeredis._clients._tcp_server import TCPFakeRequestHandler
+from redis.exceptions import ResponseError
+
+
+class RequestHandler(TCPFakeRequestHandler):
+    """
+    Error replies (NOSCRIPT, WRONGTYPE, ...) keep the connection open, as
+    on a real server. fakeredis closes it, which the asyncio client only
+    notices on its next command (e.g. the SCRIPT LOAD after a NOSCRIPT).
+    """
+
+    def setup(self):
+        super().setup()
+        read_response = self.current_client.read_response
+
+        def read_reply():
+            try:
+                return read_response()
+            except ResponseError as e:
+                return e
+
+        self.current_client.read_response = read_reply
+
+
+def main(args):
+    server = TcpFakeServer((args.host, args.port))
+    server.RequestHandlerClass = RequestHandler
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6390)
+    main(parser.parse_args())
@@ -0,0 +1,79 @@
+import math
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class Recorder:
+    """Status and latency of every request, grouped by operation"""
+
+    def __init__(self):
+        self.samples: Dict[str, List[tuple]] = defaultdict(list)
+        self.started = None
+        self.finished = None
+
+    def start(self):
+        self.started = time.perf_counter()
+
+    def stop(self):
+        self.finished = time.perf_counter()
+
+    def add(self, operation: str, status: int, seconds: float):
+        # status 0 = connection error / timeout
+        self.samples[operation].append((status, seconds))
+
+    def summary(self) -> Dict:
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        operations = {}
+
+        for operation, samples in sorted(self.samples.items()):
+            latencies = sorted(seconds for _, seconds in samples)
+            statuses = Counter(status for status, _ in samples)
+            operations[operation] = {
+                "requests": len(samples),
+                "throughput": len(samples) / elapsed if elapsed else 0.0,
+                "p50_ms": percentile(latencies, 50) * 1000,
+                "p95_ms": percentile(latencies, 95) * 1000,
+                "p99_ms": percentile(latencies, 99) * 1000,
+                "statuses": {str(status): count for status, count in sorted(statuses.items())},
+                "conflict_rate": statuses[409] / len(samples),
+                "busy_rate": statuses[429] / len(samples),
+                "error_rate": sum(c for s, c in statuses.items() if s == 0 or s >= 500) / len(samples),
+            }
+
+        total = sum(len(samples) for samples in self.samples.values())
+        return {
+            "elapsed_s": elapsed,
+            "requests": total,
+            "throughput": total / elapsed if elapsed else 0.0,
+            "operations": operations,
+        }
+
+
+def print_report(scenario: str, summary: Dict, checks: List[Dict], extra: Optional[Dict] = None):
+    print(f"\n{scenario}: {summary['requests']} requests in {summary['elapsed_s']:.2f}s "
+          f"({summary['throughput']:.0f} req/s)")
+    for key, value in (extra or {}).items():
+        print(f"  {key}: {value}")
+
+    print(f"\n{'operation':<16}{'requests':>9}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+          f"{'409':>8}{'429':>8}{'err':>8}  statuses")
+    for operation, stats in summary["operations"].items():
+        print(
+            f"{operation:<16}{stats['requests']:>9}{stats['throughput']:>9.0f}"
+            f"{stats['p50_ms']:>9.1f}{stats['p95_ms']:>9.1f}{stats['p99_ms']:>9.1f}"
+            f"{stats['conflict_rate']:>8.1%}{stats['busy_rate']:>8.1%}{stats['error_rate']:>8.1%}"
+            f"  {stats['statuses']}"
+        )
+
+    print("\nchecks")
+    for check in checks:
+        print(f"  [{'ok' if check['ok'] else 'FAIL'}] {check['name']}: {check['detail']}")
@@ -0,0 +1,253 @@
+import asyncio
+import random
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+import httpx
+
+from loadtest.report import Recorder
+from loadtest.stack import token
+
+
+def student_phone(i: int) -> str:
+    return f"+9199{i:08d}"
+
+
+class Ledger:
+    """What the clients were told: orders placed, orders cancelled, bookers who gave up"""
+
+    def __init__(self):
+        self.booked: Dict[str, tuple] = {}  # order id -> (student, slot id)
+        self.cancelled = set()
+        self.gave_up = 0
+        self.full = 0
+
+
+# ======================================================
+# CLIENT
+# ======================================================
+class Client:
+    """Timed calls to order-service; 429s are retried after Retry-After like the app does"""
+
+    def __init__(self, base_url: str, recorder: Recorder, args):
+        self.http = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=args.timeout,
+            limits=httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        )
+        self.recorder = recorder
+        self.retries = args.retries
+        self.max_retry_wait = args.max_retry_wait
+
+    async def close(self):
+        await self.http.aclose()
+
+    async def call(self, operation: str, method: str, path: str, bearer: str, **kwargs) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            response = await self.http.request(
+                method, path, headers={"Authorization": f"Bearer {bearer}"}, **kwargs
+            )
+        except httpx.HTTPError:
+            self.recorder.add(operation, 0, time.perf_counter() - started)
+            return None
+
+        self.recorder.add(operation, response.status_code, time.perf_counter() - started)
+        return response
+
+    async def book(self, ledger: Ledger, student: str, bearer: str, slot: Dict, items: List[str]):
+        body = {
+            "slot_id": slot["id"],
+            "items": [{"item_id": item, "quantity": 1} for item in items],
+        }
+
+        for _ in range(self.retries + 1):
+            response = await self.call("book", "POST", "/orders/", bearer, json=body)
+
+            if response is not None and response.status_code == 429:
+                retry_after = float(response.headers.get("Retry-After", "1"))
+                await asyncio.sleep(min(retry_after, self.max_retry_wait))
+                continue
+
+            if response is not None and response.status_code == 200:
+                order_id = response.json()["order_id"]
+                ledger.booked[order_id] = (student, slot["id"])
+                return order_id
+
+            if response is not None and response.status_code == 409:
+                ledger.full += 1
+            return None
+
+        ledger.gave_up += 1
+        return None
+
+    async def cancel(self, ledger: Ledger, order_id: str, bearer: str):
+        response = await self.call("cancel", "POST", f"/orders/{order_id}/cancel", bearer)
+        if response is not None and response.status_code == 200:
+            ledger.cancelled.add(order_id)
+
+
+async def _bounded(concurrency: int, coroutines):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(coroutine):
+        async with semaphore:
+            await coroutine
+
+    await asyncio.gather(*(run(c) for c in coroutines))
+
+
+def _cart(fixture: Dict, slot: Dict, rng: random.Random) -> List[str]:
+    items = fixture["items"][slot["vendor_id"]]
+    return rng.sample(items, rng.randint(1, min(2, len(items))))
+
+
+# ======================================================
+# SCENARIOS
+# ======================================================
+async def burst(client: Client, fixture: Dict, args, rng: random.Random) -> Ledger:
+    """Every student books the same slot at once (the noon rush on one counter)"""
+    ledger = Ledger()
+    slot = fixture["slots"][0]
+
+    async def student(i: int):
+        phone = student_phone(i)
+        await client.book(ledger, phone, token(phone, "student"), slot, _cart(fixture, slot, rng))
+
+    await _bounded(args.concurrency, [student(i) for i in range(args.students)])
+    return ledger
+
+
+async def mixed(client: Client, fixture: Dict, args, rng: random.Random) -> Ledger:
+    """Students browse (history, order status) around one booking; vendors poll their lists"""
+    ledger = Ledger()
+    vendor_tokens = [
+        token(vendor["phone"], "vendor", vendor_id=vendor["id"]) for vendor in fixture["vendors"]
+    ]
+
+    async def student(i: int):
+        phone = student_phone(i)
+        bearer = token(phone, "student")
+        slot = rng.choice(fixture["slots"])
+        steps = ["browse"] * args.browse + ["book"]
+        rng.shuffle(steps)
+        order_id = None
+
+        for step in steps:
+            if step == "book":
+                order_id = await client.book(ledger, phone, bearer, slot, _cart(fixture, slot, rng))
+                continue
+
+            browse = rng.random()
+            if browse < 0.2:
+                await client.call("vendor_list", "GET", "/orders/vendor", rng.choice(vendor_tokens),
+                                  params={"limit": 50})
+            elif browse < 0.6 and order_id:
+                await client.call("order_status", "GET", f"/orders/{order_id}", bearer)
+            else:
+                await client.call("history", "GET", "/orders/student", bearer, params={"limit": 20})
+
+    await _bounded(args.concurrency, [student(i) for i in range(args.students)])
+    return ledger
+
+
+async def cancel(client: Client, fixture: Dict, args, rng: random.Random) -> Ledger:
+    """A booking wave where some students cancel, then a second wave takes the freed seats"""
+    ledger = Ledger()
+
+    async def student(i: int):
+        phone = student_phone(i)
+        bearer = token(phone, "student")
+        slot = rng.choice(fixture["slots"])
+        order_id = await client.book(ledger, phone, bearer, slot, _cart(fixture, slot, rng))
+
+        if order_id and rng.random() < args.cancel_ratio:
+            await client.cancel(ledger, order_id, bearer)
+
+    first_wave = args.students
+    await _bounded(args.concurrency, [student(i) for i in range(first_wave)])
+    await _bounded(args.concurrency, [student(first_wave + i) for i in range(args.rebook)])
+    return ledger
+
+
+SCENARIOS = {
+    "burst": burst,
+    "mixed": mixed,
+    "cancel": cancel,
+}
+
+
+# ======================================================
+# CORRECTNESS (read back through the admin API)
+# ======================================================
+async def _all_orders(http: httpx.AsyncClient, vendor_id: str) -> List[Dict]:
+    orders, cursor = [], None
+    while True:
+        params = {"vendor_id": vendor_id, "limit": 200}
+        if cursor:
+            params["cursor"] = cursor
+        response = await http.get("/orders", params=params)
+        response.raise_for_status()
+        orders += response.json()
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return orders
+
+
+async def verify(base_url: str, fixture: Dict, ledger: Ledger, scenario: str, args) -> List[Dict]:
+    headers = {"Authorization": f"Bearer {token('loadtest-admin', 'admin')}"}
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, timeout=30) as http:
+        orders = [
+            order
+            for per_vendor in await asyncio.gather(*(
+                _all_orders(http, vendor["id"]) for vendor in fixture["vendors"]
+            ))
+            for order in per_vendor
+        ]
+        slot_ids = [slot["id"] for slot in fixture["slots"]]
+        reservations = {}
+        for i in range(0, len(slot_ids), 1000):
+            response = await http.post("/reservations/lookup", json={"slot_ids": slot_ids[i:i + 1000]})
+            response.raise_for_status()
+            reservations.update({r["slot_id"]: r for r in response.json()})
+
+    active = [order for order in orders if order["status"] != "cancelled"]
+    active_per_slot = Counter(order["slot_id"] for order in active)
+    capacity = {slot["id"]: slot["max_capacity"] for slot in fixture["slots"]}
+    checks = []
+
+    def check(name: str, ok: bool, detail: str):
+        checks.append({"name": name, "ok": ok, "detail": detail})
+
+    oversold = {s: n for s, n in active_per_slot.items() if n > capacity[s]}
+    check("no oversold slot", not oversold,
+          f"{len(oversold)} slots over capacity" if oversold else f"{len(active)} active orders in {len(capacity)} slots")
+
+    drift = {
+        s: (reservations[s]["available_capacity"], capacity[s] - active_per_slot[s])
+        for s in capacity
+        if s not in reservations or reservations[s]["available_capacity"] != capacity[s] - active_per_slot[s]
+    }
+    check("capacity accounted", not drift,
+          f"{len(drift)} slots where available != max - active, e.g. {next(iter(drift.items()))}" if drift
+          else "available == max - active for every slot")
+
+    pairs = Counter((order["student_phone"], order["slot_id"]) for order in active)
+    doubles = sum(1 for n in pairs.values() if n > 1)
+    check("no double booking", not doubles, f"{doubles} student/slot pairs booked twice" if doubles else "none")
+
+    expected_active = set(ledger.booked) - ledger.cancelled
+    actual_active = {order["id"] for order in active}
+    check("responses match database", expected_active == actual_active,
+          f"{len(expected_active)} confirmed to clients, {len(actual_active)} active in the database, "
+          f"{len(expected_active ^ actual_active)} differ")
+
+    if scenario == "burst":
+        slot = fixture["slots"][0]["id"]
+        # Every seat sold unless bookers gave up on 429 first
+        sold = active_per_slot[slot]
+        check("sold out under demand", sold >= min(capacity[slot], args.students - ledger.gave_up),
+              f"{sold}/{capacity[slot]} seats sold to {args.students} students ({ledger.gave_up} gave up on 429)")
+
+    return checks
@@ -0,0 +1,262 @@
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import httpx
+from jose import jwt
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Same defaults as the services' core/security modules
+JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "TNT_SUPER_SECRET_KEY")
+JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
+
+STARTUP_TIMEOUT = 60
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def token(sub: str, role: str, **claims) -> str:
+    """A token auth-service would have issued"""
+    payload = {"sub": sub, "role": role, "exp": datetime.utcnow() + timedelta(hours=6), **claims}
+    return jwt.encode(payload, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
+
+
+# ======================================================
+# FIXTURE (vendors, slots and menu items of one run)
+# ======================================================
+def build_fixture(vendors: int, slots: int, capacity: int) -> Dict:
+    """`slots` slots of `capacity` seats, dealt round-robin over `vendors` vendors"""
+    start = datetime(2026, 1, 1, 12, 0)
+    fixture = {"vendors": [], "slots": [], "items": {}}
+
+    for v in range(vendors):
+        vendor_id = str(uuid.uuid4())
+        fixture["vendors"].append({
+            "id": vendor_id,
+            "name": f"Load Test Vendor {v}",
+            "vendor_type": "canteen",
+            "phone": f"+9100000{v:05d}",
+        })
+        fixture["items"][vendor_id] = [str(uuid.uuid4()) for _ in range(3)]
+
+    for s in range(slots):
+        vendor = fixture["vendors"][s % vendors]
+        offset = timedelta(minutes=15 * (s // vendors))
+        fixture["slots"].append({
+            "id": str(uuid.uuid4()),
+            "vendor_id": vendor["id"],
+            "start_time": (start + offset).isoformat(),
+            "end_time": (start + offset + timedelta(minutes=15)).isoformat(),
+            "max_capacity": capacity,
+            "current_load": 0,
+        })
+
+    return fixture
+
+
+# ======================================================
+# LOCAL STACK
+# ======================================================
+class LocalStack:
+    """
+    order-service + ai-service + vendor-service stand-in as uvicorn
+    subprocesses, with Redis and the order database they share. Logs go
+    to <workdir>/<service>.log.
+    """
+
+    def __init__(
+        self,
+        fixture: Dict,
+        order_db_url: Optional[str] = None,
+        redis_url: Optional[str] = None,
+        workers: int = 1,
+        rate_limit: bool = False,
+        vendor_latency_ms: float = 0,
+        keep: bool = False
+    ):
+        self.fixture = fixture
+        self.order_db_url = order_db_url
+        self.redis_url = redis_url
+        self.workers = workers
+        self.rate_limit = rate_limit
+        self.vendor_latency_ms = vendor_latency_ms
+        self.keep = keep
+        self.workdir = tempfile.mkdtemp(prefix="tnt-loadtest-")
+        self.order_url = None
+        self._processes: List[subprocess.Popen] = []
+        self._logs = []
+
+    def __enter__(self):
+        try:
+            self.start()
+        except BaseException:
+            self.stop()
+            raise
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self):
+        fixture_path = os.path.join(self.workdir, "fixture.json")
+        with open(fixture_path, "w") as f:
+            json.dump(self.fixture, f)
+
+        # 1️⃣ Redis: the given one, else a fakeredis server of our own
+        if not self.redis_url:
+            port = free_port()
+            self._spawn("redis", [sys.executable, "-m", "loadtest.fake_redis", "--port", str(port)], REPO_ROOT)
+            self._wait_for_port(port)
+            self.redis_url = f"redis://127.0.0.1:{port}"
+
+        if not self.order_db_url:
+            # Busy timeout: concurrent writers wait for the SQLite lock instead of failing
+            self.order_db_url = f"sqlite:///{os.path.join(self.workdir, 'orders.db')}?timeout=30"
+
+        env = {
+            "REDIS_URL": self.redis_url,
+            "ORDER_DB_URL": self.order_db_url,
+            "JWT_SECRET_KEY": JWT_SECRET_KEY,
+            "RATE_LIMIT_ENABLED": "true" if self.rate_limit else "false",
+            "LOADTEST_FIXTURE": fixture_path,
+            "LOADTEST_VENDOR_LATENCY_MS": str(self.vendor_latency_ms),
+            # Shared tnt_common package (not installed) for the services and the migration
+            "PYTHONPATH": os.pathsep.join(filter(None, [os.path.join(REPO_ROOT, "common"), os.environ.get("PYTHONPATH")])),
+        }
+
+        # 2️⃣ Upstreams first: order-service syncs slots from vendor-service on startup
+        vendor_port, ai_port, order_port = free_port(), free_port(), free_port()
+        self._spawn("vendor", self._uvicorn("loadtest.vendor_stub:app", vendor_port), REPO_ROOT, env)
+        self._spawn("ai", self._uvicorn("main:app", ai_port), os.path.join(REPO_ROOT, "ai-service"), env)
+
+        # 3️⃣ Migrate once, then start the workers without racing each other on it
+        order_dir = os.path.join(REPO_ROOT, "order-service")
+        migrate = subprocess.run(
+            [sys.executable, "-m", "app.db.migrate"],
+            cwd=order_dir, env={**os.environ, **env}, capture_output=True, text=True
+        )
+        if migrate.returncode != 0:
+            raise RuntimeError(f"order-service migration failed:\n{migrate.stderr}")
+
+        self._spawn(
+            "order",
+            self._uvicorn("app.main:app", order_port, self.workers),
+            order_dir,
+            {
+                **env,
+                "AUTO_MIGRATE": "false",
+                "VENDOR_SERVICE_URL": f"http://127.0.0.1:{vendor_port}",
+                "AI_SERVICE_URL": f"http://127.0.0.1:{ai_port}",
+            }
+        )
+
+        for port in (vendor_port, ai_port, order_port):
+            self._wait_for_http(f"http://127.0.0.1:{port}/")
+
+        self.order_url = f"http://127.0.0.1:{order_port}"
+        self._wait_for_slot_sync()
+
+    def stop(self):
+        for process in self._processes:
+            if process.poll() is None:
+                process.terminate()
+        for process in self._processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        for log in self._logs:
+            log.close()
+        self._processes.clear()
+        self._logs.clear()
+
+        if not self.keep:
+            shutil.rmtree(self.workdir, ignore_errors=True)
+
+    # --------------------------------------------------
+    # HELPERS
+    # --------------------------------------------------
+    def _uvicorn(self, app: str, port: int, workers: int = 1) -> List[str]:
+        return [
+            sys.executable, "-m", "uvicorn", app,
+            "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers), "--log-level", "warning", "--no-access-log",
+        ]
+
+    def _spawn(self, name: str, command: List[str], cwd: str, env: Optional[Dict] = None):
+        log = open(os.path.join(self.workdir, f"{name}.log"), "w")
+        self._logs.append(log)
+        process = subprocess.Popen(
+            command, cwd=cwd, env={**os.environ, **(env or {})},
+            stdout=log, stderr=subprocess.STDOUT
+        )
+        process.name = name
+        self._processes.append(process)
+
+    def _check_alive(self):
+        for process in self._processes:
+            if process.poll() is not None:
+                raise RuntimeError(
+                    f"{process.name} exited with {process.returncode}, "
+                    f"see {os.path.join(self.workdir, process.name + '.log')}"
+                )
+
+    def _wait_for_port(self, port: int):
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while time.monotonic() < deadline:
+            self._check_alive()
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                return
+            except OSError:
+                time.sleep(0.1)
+        raise RuntimeError(f"Nothing listening on port {port}")
+
+    def _wait_for_http(self, url: str):
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while time.monotonic() < deadline:
+            self._check_alive()
+            try:
+                if httpx.get(url, timeout=1).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.2)
+        raise RuntimeError(f"{url} did not come up, logs in {self.workdir}")
+
+    def _wait_for_slot_sync(self):
+        """Every fixture slot is in slot_reservations (synced from the stand-in)"""
+        slot_ids = [slot["id"] for slot in self.fixture["slots"]]
+        headers = {"Authorization": f"Bearer {token('loadtest-admin', 'admin')}"}
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+
+        while time.monotonic() < deadline:
+            self._check_alive()
+            synced = 0
+            for i in range(0, len(slot_ids), 1000):
+                response = httpx.post(
+                    f"{self.order_url}/reservations/lookup",
+                    json={"slot_ids": slot_ids[i:i + 1000]},
+                    headers=headers,
+                    timeout=10
+                )
+                if response.status_code == 200:
+                    synced += len(response.json())
+            if synced == len(slot_ids):
+                return
+            time.sleep(0.5)
+
+        raise RuntimeError(f"Slot sync did not finish, logs in {self.workdir}")
@@ -0,0 +1,80 @@
+"""
+vendor-service stand-in: serves the vendors and slots of a load-test
+fixture on the endpoints order-service calls.
+
+    LOADTEST_FIXTURE=fixture.json uvicorn loadtest.vendor_stub:app --port 8001
+
+The real vendor-service's GET /slots/{id} is vendor-scoped while
+order-service calls it without a token, so the harness puts this in
+front of order-service instead. LOADTEST_VENDOR_LATENCY_MS adds a
+fixed delay to every call to model a slower upstream.
+"""
+import asyncio
+import json
+import os
+
+from fastapi import FastAPI, Header, HTTPException
+from jose import jwt
+
+FIXTURE_PATH = os.getenv("LOADTEST_FIXTURE", "fixture.json")
+LATENCY = float(os.getenv("LOADTEST_VENDOR_LATENCY_MS", "0")) / 1000
+SECRET_KEY = os.getenv("JWT_SECRET_KEY", "TNT_SUPER_SECRET_KEY")
+ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
+
+with open(FIXTURE_PATH) as f:
+    _fixture = json.load(f)
+
+VENDORS = {vendor["id"]: vendor for vendor in _fixture["vendors"]}
+VENDORS_BY_PHONE = {vendor["phone"]: vendor for vendor in _fixture["vendors"]}
+SLOTS = {slot["id"]: slot for slot in _fixture["slots"]}
+
+app = FastAPI(title="TNT Vendor Service (load-test stand-in)")
+
+
+async def _upstream_delay():
+    if LATENCY:
+        await asyncio.sleep(LATENCY)
+
+
+@app.get("/")
+def root():
+    return {"service": "TNT Vendor Service (stand-in)", "status": "running"}
+
+
+@app.get("/vendors/")
+async def get_all_vendors():
+    await _upstream_delay()
+    return list(VENDORS.values())
+
+
+@app.get("/vendors/phone/{phone}")
+async def get_vendor_by_phone(phone: str):
+    await _upstream_delay()
+    vendor = VENDORS_BY_PHONE.get(phone)
+    if not vendor:
+        raise HTTPException(status_code=404, detail="Vendor not found")
+    return vendor
+
+
+@app.get("/slots/")
+async def get_slots(authorization: str = Header("")):
+    """Vendor-scoped, like the real route (order-service calls it as the vendor)"""
+    await _upstream_delay()
+    try:
+        payload = jwt.decode(authorization.removeprefix("Bearer "), SECRET_KEY, algorithms=[ALGORITHM])
+    except Exception:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+
+    vendor = VENDORS_BY_PHONE.get(payload.get("sub"))
+    if not vendor:
+        raise HTTPException(status_code=404, detail="Vendor not found")
+    return [slot for slot in SLOTS.values() if slot["vendor_id"] == vendor["id"]]
+
+
+@app.get("/slots/{slot_id}")
+async def get_slot(slot_id: str):
+    await _upstream_delay()
+    slot = SLOTS.get(slot_id)
+    if not slot:
+        raise HTTPException(status_code=404, detail="Slot not found")
+    return slot
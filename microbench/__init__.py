@@ -0,0 +1,20 @@
+"""
+Micro-benchmarks of the per-request hot functions, with stored baselines.
+
+    python -m microbench                 # run everything, compare with baselines.json
+    python -m microbench -k jwt          # only benchmarks whose name contains "jwt"
+    python -m microbench --check         # exit 1 on a regression (for CI)
+    python -m microbench --update        # record the current numbers as the baselines
+
+Each service's suite (microbench/suites/) runs in its own interpreter
+from that service's directory, so services import their modules as they
+do in production. Every timing round is bracketed by rounds of a fixed
+pure-Python reference loop and results are compared as multiples of it,
+which keeps one set of baselines usable across machines of different
+speeds and steady on noisy shared runners. A benchmark fails the check
+when it is more than its threshold (default 25%) slower than its
+baseline and the slowdown is larger than the spread of its own timing
+rounds; other slowdowns, and any on runs shorter than --min-time 0.1
+--repeat 3, are reported as "noisy". Re-record baselines with --update when a change
+is meant to move them.
+"""
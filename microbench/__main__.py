@@ -0,0 +1,185 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from typing import Dict, List
+
+from microbench import __doc__ as DOC
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+
+# Allowed slowdown vs the baseline, unless a benchmark sets its own
+DEFAULT_THRESHOLD = 0.25
+
+# Shorter or fewer rounds than this are too noisy to call a regression:
+# slowdowns are reported as "noisy" and do not fail --check
+MIN_CHECK_TIME = 0.1
+MIN_CHECK_REPEAT = 3
+
+# suite -> (service directory it runs from, module)
+SUITES = {
+    "order": ("order-service", "microbench.suites.order_service"),
+    "vendor": ("vendor-service", "microbench.suites.vendor_service"),
+    "ai": ("ai-service", "microbench.suites.ai_service"),
+    "auth": ("auth-service", "microbench.suites.auth_service"),
+}
+
+
+def run_suite(suite: str, patterns: List[str], args) -> Dict:
+    service_dir, module = SUITES[suite]
+    command = [sys.executable, "-m", module, "--min-time", str(args.min_time), "--repeat", str(args.repeat)]
+    for pattern in patterns:
+        command += ["-k", pattern]
+
+    env = dict(os.environ)
+    # Repo root for the suites, common/ for the shared tnt_common package
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [REPO_ROOT, os.path.join(REPO_ROOT, "common"), env.get("PYTHONPATH")]))
+
+    # Service modules that log to files at import (auth-service's audit log)
+    # write outside the tree
+    with tempfile.TemporaryDirectory(prefix="microbench-") as log_dir:
+        env["AUDIT_LOG_DIR"] = log_dir
+        completed = subprocess.run(
+            command, cwd=os.path.join(REPO_ROOT, service_dir), env=env, capture_output=True, text=True
+        )
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "failed")
+
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def load_baselines() -> Dict:
+    if not os.path.exists(BASELINES_PATH):
+        return {"benchmarks": {}}
+    with open(BASELINES_PATH) as f:
+        return json.load(f)
+
+
+def compare(name: str, result: Dict, baselines: Dict, reliable: bool = True) -> Dict:
+    """
+    Change of the score (time in reference-loop units) vs the baseline's.
+    A slowdown past the threshold is only a regression on a `reliable`
+    run and when it is larger than the run's own round-to-round spread.
+    """
+    score = result["score"]
+    baseline = baselines["benchmarks"].get(name)
+    threshold = result["threshold"] or DEFAULT_THRESHOLD
+
+    row = {"name": name, "ns": result["ns"], "score": score, "threshold": threshold,
+           "baseline_ns": None, "change": None, "status": "new"}
+    if baseline:
+        row["baseline_ns"] = baseline["ns"]
+        row["change"] = score / baseline["score"] - 1
+        if row["change"] <= threshold:
+            row["status"] = "ok"
+        elif reliable and row["change"] > result.get("spread", 0):
+            row["status"] = "SLOWER"
+        else:
+            row["status"] = "noisy"
+    return row
+
+
+def _duration(ns: float) -> str:
+    for unit, scale in (("ns", 1), ("µs", 1e3), ("ms", 1e6)):
+        if ns < scale * 1000:
+            return f"{ns / scale:.1f} {unit}"
+    return f"{ns / 1e9:.2f} s"
+
+
+def print_rows(rows: List[Dict], errors: Dict[str, str]):
+    print(f"{'benchmark':<32}{'time':>12}{'baseline':>12}{'change':>9}{'limit':>8}  status")
+    for row in rows:
+        baseline = _duration(row["baseline_ns"]) if row["baseline_ns"] else "-"
+        change = f"{row['change']:+.1%}" if row["change"] is not None else "-"
+        print(f"{row['name']:<32}{_duration(row['ns']):>12}{baseline:>12}{change:>9}"
+              f"{row['threshold']:>+8.0%}  {row['status']}")
+    for suite, error in errors.items():
+        print(f"{suite + ' suite':<32}{'':>12}{'':>12}{'':>9}{'':>8}  ERROR {error}")
+
+
+def update_baselines(baselines: Dict, rows: List[Dict]):
+    baselines["recorded"] = {
+        "at": datetime.utcnow().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+    }
+    for row in rows:
+        baselines["benchmarks"][row["name"]] = {"ns": round(row["ns"], 1), "score": round(row["score"], 5)}
+    baselines["benchmarks"] = dict(sorted(baselines["benchmarks"].items()))
+
+    with open(BASELINES_PATH, "w") as f:
+        json.dump(baselines, f, indent=2)
+        f.write("\n")
+
+
+def main(args) -> int:
+    baselines = load_baselines()
+    suites = args.suites or list(SUITES)
+    rows, errors = [], {}
+    reliable = args.min_time >= MIN_CHECK_TIME and args.repeat >= MIN_CHECK_REPEAT
+
+    for suite in suites:
+        try:
+            results = run_suite(suite, args.patterns, args)
+        except RuntimeError as e:
+            errors[suite] = str(e)
+            continue
+
+        for name, result in results.items():
+            row = compare(name, result, baselines, reliable)
+
+            # One retry before calling it a regression (shared CI runners are noisy)
+            if row["status"] == "SLOWER":
+                retry = run_suite(suite, [name], args)[name]
+                row = min(row, compare(name, retry, baselines, reliable), key=lambda r: r["score"])
+
+            rows.append(row)
+
+    print_rows(rows, errors)
+    if not reliable:
+        print(f"\nruns shorter than --min-time {MIN_CHECK_TIME} --repeat {MIN_CHECK_REPEAT} "
+              f"do not report regressions")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"results": rows, "errors": errors}, f, indent=2)
+
+    if args.update:
+        update_baselines(baselines, rows)
+        print(f"\nbaselines updated: {os.path.relpath(BASELINES_PATH)}")
+        return 0
+
+    if args.check:
+        regressions = [row["name"] for row in rows if row["status"] == "SLOWER"]
+        if regressions or errors:
+            print(f"\n{len(regressions)} regression(s), {len(errors)} suite error(s)")
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="python -m microbench",
+        description=DOC,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("suites", nargs="*", metavar="suite",
+                        help=f"suites to run ({', '.join(SUITES)}; default: all)")
+    parser.add_argument("-k", dest="patterns", action="append", default=[],
+                        help="only benchmarks whose name contains this (repeatable)")
+    parser.add_argument("--check", action="store_true", help="exit 1 on a regression or suite error")
+    parser.add_argument("--update", action="store_true", help="record the results as baselines")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per timing round")
+    parser.add_argument("--repeat", type=int, default=5, help="timing rounds (best is kept)")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+    unknown = set(args.suites) - set(SUITES)
+    if unknown:
+        parser.error(f"unknown suite(s): {', '.join(sorted(unknown))}")
+    sys.exit(main(args))
@@ -0,0 +1,94 @@
+import argparse
+import gc
+import json
+import statistics
+import time
+from typing import Callable, Dict, Optional
+
+# name -> {"setup": returns the zero-argument callable to time, "threshold": allowed slowdown}
+REGISTRY: Dict[str, Dict] = {}
+
+
+def benchmark(name: str, threshold: Optional[float] = None):
+    """Register `setup`; it runs once, untimed, and returns the callable to time"""
+    def register(setup: Callable[[], Callable[[], object]]):
+        REGISTRY[name] = {"setup": setup, "threshold": threshold}
+        return setup
+    return register
+
+
+def reference():
+    """Fixed pure-Python work every result is expressed against"""
+    total = 0
+    table = {}
+    for i in range(500):
+        table[i % 64] = total
+        total += (i * i) % 7 + len(str(i))
+    return sorted(table.values())
+
+
+def _timed(fn: Callable, loops: int) -> float:
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        return time.perf_counter() - started
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def _calibrate(fn: Callable, min_time: float) -> int:
+    fn()  # warm up (imports, caches, first-query planning)
+    loops = 1
+    while _timed(fn, loops) < min_time:
+        loops *= 2
+    return loops
+
+
+def measure(fn: Callable, min_time: float = 0.2, repeat: int = 5) -> Dict[str, float]:
+    """
+    Time `fn` in `repeat` rounds of at least `min_time` seconds, each
+    bracketed by two rounds of the reference loop. Returns the best
+    nanoseconds per call, the score: the median over rounds of the
+    call's time in reference-loop units, and the spread: how far the
+    slowest round's score is above the fastest's (the run's noise). Slow
+    spells of a shared machine hit a round and its brackets alike, so the
+    score stays steady where raw times do not.
+    """
+    loops = _calibrate(fn, min_time)
+    reference_loops = _calibrate(reference, min_time / 2)
+
+    best, scores = float("inf"), []
+    reference_before = _timed(reference, reference_loops) / reference_loops
+    for _ in range(repeat):
+        elapsed = _timed(fn, loops) / loops
+        reference_after = _timed(reference, reference_loops) / reference_loops
+        best = min(best, elapsed)
+        scores.append(elapsed / ((reference_before + reference_after) / 2))
+        reference_before = reference_after
+
+    return {"ns": best * 1e9, "score": statistics.median(scores), "spread": max(scores) / min(scores) - 1}
+
+
+def run_suite():
+    """Entry point of a suite module: time the selected benchmarks, print JSON on stdout"""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-k", dest="patterns", action="append", default=[])
+    parser.add_argument("--min-time", type=float, default=0.2)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results = {}
+    for name, entry in REGISTRY.items():
+        if args.patterns and not any(pattern in name for pattern in args.patterns):
+            continue
+        results[name] = {
+            **measure(entry["setup"](), args.min_time, args.repeat),
+            "threshold": entry["threshold"],
+        }
+
+    # Last line of stdout (service imports may print before it)
+    print("\n" + json.dumps(results))
@@ -0,0 +1,35 @@
+"""ai-service: the two prediction endpoints' model functions"""
+from main import ETAPredictionRequest, RushDetectionRequest, detect_rush, predict_eta
+
+from microbench.harness import benchmark, run_suite
+
+
+@benchmark("ai.predict_eta")
+def predict_eta_bench():
+    request = ETAPredictionRequest(
+        vendor_id="7a1c2f4e-0000-4000-8000-000000000001",
+        slot_id="7a1c2f4e-0000-4000-8000-000000000002",
+        current_orders=14,
+        historical_avg_orders=9.5,
+        history_days=28,
+        time_of_day="afternoon",
+        day_of_week="monday"
+    )
+    return lambda: predict_eta(request)
+
+
+@benchmark("ai.detect_rush")
+def detect_rush_bench():
+    request = RushDetectionRequest(
+        vendor_id="7a1c2f4e-0000-4000-8000-000000000001",
+        current_capacity=40,
+        available_capacity=6,
+        booking_rate_per_minute=3.5,
+        time_of_day="afternoon",
+        day_of_week="monday"
+    )
+    return lambda: detect_rush(request)
+
+
+if __name__ == "__main__":
+    run_suite()
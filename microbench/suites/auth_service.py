@@ -0,0 +1,37 @@
+"""auth-service: token verification, OTP verification"""
+from datetime import datetime
+
+from fastapi.security import HTTPAuthorizationCredentials
+
+from utils.jwt_service import jwt_service
+from utils.otp_service import OTPService
+
+from microbench.harness import benchmark, run_suite
+
+PHONE = "+919900000001"
+
+
+@benchmark("auth.verify_token")
+def verify_token_bench():
+    credentials = HTTPAuthorizationCredentials(
+        scheme="Bearer",
+        credentials=jwt_service.create_access_token(PHONE, "student")
+    )
+    return lambda: jwt_service.verify_token(credentials)
+
+
+@benchmark("auth.verify_otp")
+def verify_otp_bench():
+    service = OTPService()
+    otp = service.generate_otp(PHONE)
+
+    def verify():
+        # A successful verify consumes the OTP: re-arm it (one dict store) each call
+        service.otp_storage[PHONE] = {"otp": otp, "timestamp": datetime.utcnow(), "attempts": 0}
+        service.verify_otp(PHONE, otp)
+
+    return verify
+
+
+if __name__ == "__main__":
+    run_suite()
@@ -0,0 +1,59 @@
+"""order-service: JWT check on every request, student order history serialization"""
+import uuid
+from datetime import datetime, timedelta
+
+from fastapi.security import HTTPAuthorizationCredentials
+from jose import jwt
+
+from app.core.security import ALGORITHM, SECRET_KEY, verify_jwt
+from app.db.models import Order, OrderItem, OrderStatus
+from app.schemas.order import order_response_list
+from app.utils.pagination import DEFAULT_PAGE_SIZE
+
+from microbench.harness import benchmark, run_suite
+
+
+def _credentials(role: str) -> HTTPAuthorizationCredentials:
+    token = jwt.encode(
+        {"sub": "+919900000001", "role": role, "exp": datetime.utcnow() + timedelta(days=1)},
+        SECRET_KEY,
+        algorithm=ALGORITHM
+    )
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+@benchmark("order.verify_jwt")
+def verify_jwt_bench():
+    credentials = _credentials("student")
+    return lambda: verify_jwt(credentials)
+
+
+@benchmark("order.student_history_page")
+def student_history_bench():
+    """One GET /orders/student page: ORM rows (items loaded) -> JSON bytes"""
+    created = datetime(2026, 1, 1, 12, 0)
+    orders = []
+    for i in range(DEFAULT_PAGE_SIZE):
+        order_id = uuid.uuid4()
+        orders.append(Order(
+            id=order_id,
+            student_phone="+919900000001",
+            vendor_id=uuid.uuid4(),
+            slot_id=uuid.uuid4(),
+            status=OrderStatus.completed,
+            created_at=created - timedelta(minutes=i),
+            estimated_minutes=12,
+            eta_confidence=80,
+            items=[
+                OrderItem(id=uuid.uuid4(), order_id=order_id, item_id=uuid.uuid4(), quantity=q)
+                for q in (1, 2)
+            ]
+        ))
+
+    return lambda: order_response_list.dump_json(
+        order_response_list.validate_python(orders, from_attributes=True)
+    )
+
+
+if __name__ == "__main__":
+    run_suite()
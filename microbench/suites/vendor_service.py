@@ -0,0 +1,74 @@
+"""vendor-service: vendor token check, slot overlap query of create_slot"""
+import os
+import tempfile
+import uuid
+from datetime import datetime, time, timedelta
+
+# Always a throwaway SQLite file: the suite seeds its own rows
+os.environ["VENDOR_DB_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_vendor.db')}"
+
+from fastapi.security import HTTPAuthorizationCredentials  # noqa: E402
+from jose import jwt  # noqa: E402
+from sqlalchemy.dialects.postgresql import UUID  # noqa: E402
+from sqlalchemy.ext.compiler import compiles  # noqa: E402
+
+from database import Base, SessionLocal, engine  # noqa: E402
+from models import Slot, Vendor  # noqa: E402
+from routes.slot_routes import find_overlapping_slot  # noqa: E402
+from security import ALGORITHM, SECRET_KEY, verify_vendor_token  # noqa: E402
+
+from microbench.harness import benchmark, run_suite  # noqa: E402
+
+
+# The models use the Postgres UUID type; store it as CHAR(32) on the bench database
+@compiles(UUID, "sqlite")
+def _uuid_on_sqlite(element, compiler, **kw):
+    return "CHAR(32)"
+
+
+VENDORS = 100
+SLOTS_PER_VENDOR = 48  # 15-minute slots, 08:00 to 20:00
+
+
+@benchmark("vendor.verify_vendor_token")
+def verify_vendor_token_bench():
+    token = jwt.encode(
+        {"sub": "+910000000001", "role": "vendor", "vendor_id": str(uuid.uuid4()),
+         "exp": datetime.utcnow() + timedelta(days=1)},
+        SECRET_KEY,
+        algorithm=ALGORITHM
+    )
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    return lambda: verify_vendor_token(credentials)
+
+
+@benchmark("vendor.slot_overlap_query")
+def slot_overlap_bench():
+    """create_slot's check for a new, non-overlapping slot of a vendor with a full day of slots"""
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+
+    vendor_ids = [uuid.uuid4() for _ in range(VENDORS)]
+    db.add_all(
+        Vendor(id=vendor_id, name=f"Vendor {i}", vendor_type="canteen", phone=f"+91000{i:07d}")
+        for i, vendor_id in enumerate(vendor_ids)
+    )
+    day = datetime(2026, 1, 1, 8, 0)
+    db.add_all(
+        Slot(
+            vendor_id=vendor_id,
+            start_time=(day + timedelta(minutes=15 * s)).time(),
+            end_time=(day + timedelta(minutes=15 * (s + 1))).time(),
+            max_capacity=20
+        )
+        for vendor_id in vendor_ids
+        for s in range(SLOTS_PER_VENDOR)
+    )
+    db.commit()
+
+    vendor_id = vendor_ids[VENDORS // 2]
+    return lambda: find_overlapping_slot(db, vendor_id, time(20, 0), time(20, 15))
+
+
+if __name__ == "__main__":
+    run_suite()
@@ -3,6 +3,10 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
 
 import os
+import time
+from datetime import datetime, timedelta
+
+import httpx
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "TNT_SUPER_SECRET_KEY")
 ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 
@@ -42,3 +46,52 @@ def require_vendor(payload=Depends(verify_jwt)):
             detail="Vendor access only"
         )
     return payload
+
+
+def require_admin(payload=Depends(verify_jwt)):
+    if payload.get("role") != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access only"
+        )
+    return payload
+
+
+SERVICE_TOKEN_TTL = int(os.getenv("SERVICE_TOKEN_TTL", "60"))
+
+
+def create_service_token(phone: str, role: str, vendor_id=None) -> str:
+    """Short-lived token for calling another service on a user's behalf"""
+    now = datetime.utcnow()
+    payload = {
+        "sub": phone,
+        "role": role,
+        "iat": now,
+        "exp": now + timedelta(seconds=SERVICE_TOKEN_TTL),
+        "iss": "tnt-order-service"
+    }
+    if vendor_id:
+        payload["vendor_id"] = str(vendor_id)
+
+    return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
+
+
+class ServiceTokenAuth(httpx.Auth):
+    """
+    Signs calls to other services as order-service, so their rate limiters
+    recognise it by its token. The token is reused until half its lifetime
+    is left; calls that carry their own token (on a user's behalf) keep it.
+    """
+
+    def __init__(self):
+        self._token = None
+        self._renew_at = 0.0
+
+    def auth_flow(self, request):
+        if "Authorization" not in request.headers:
+            now = time.monotonic()
+            if self._token is None or now >= self._renew_at:
+                self._token = create_service_token("order-service", "service")
+                self._renew_at = now + SERVICE_TOKEN_TTL / 2
+            request.headers["Authorization"] = f"Bearer {self._token}"
+        yield request
@@ -1,8 +1,7 @@
-from app.db.session import engine
-from app.db.models import Base
+from app.db.migrate import migrate
 
 def init_db():
-    Base.metadata.create_all(bind=engine)
+    migrate()
 
 if __name__ == "__main__":
     init_db()
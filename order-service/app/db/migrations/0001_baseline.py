@@ -0,0 +1,6 @@
+"""Tables as they existed before migrations (create_all never drops or alters)"""
+from app.db.models import Base
+
+
+def upgrade(conn):
+    Base.metadata.create_all(bind=conn)
@@ -0,0 +1,22 @@
+"""Indexes for the booking and listing hot paths"""
+from app.db.migrations import create_index
+
+TRANSACTIONAL = False
+
+
+def upgrade(conn):
+    # Double-booking check: (student_phone, slot_id) among non-cancelled orders
+    create_index(
+        conn, "ix_orders_student_slot_active", "orders", "student_phone, slot_id",
+        where="status <> 'cancelled'"
+    )
+
+    # Vendor listings filtered by status, newest first
+    create_index(conn, "ix_orders_vendor_status_created", "orders", "vendor_id, status, created_at, id")
+
+    # Keyset pagination without a status filter
+    create_index(conn, "ix_orders_vendor_created", "orders", "vendor_id, created_at, id")
+    create_index(conn, "ix_orders_student_created", "orders", "student_phone, created_at, id")
+
+    # selectinload(Order.items)
+    create_index(conn, "ix_order_items_order_id", "order_items", "order_id")
@@ -0,0 +1,17 @@
+"""Demand rollup tables and their watermark"""
+from app.db.models import (
+    Base,
+    OrderDemandHourly,
+    OrderDemandDaily,
+    OrderDemandProfile,
+    RollupWatermark
+)
+
+
+def upgrade(conn):
+    Base.metadata.create_all(bind=conn, tables=[
+        OrderDemandHourly.__table__,
+        OrderDemandDaily.__table__,
+        OrderDemandProfile.__table__,
+        RollupWatermark.__table__,
+    ])
@@ -0,0 +1,7 @@
+"""Remember the vendor's max capacity so syncs apply deltas, not overwrites"""
+from app.db.migrations import add_column
+
+
+def upgrade(conn):
+    # NULL on existing rows: the next sync records the max without touching availability
+    add_column(conn, "slot_reservations", "max_capacity", "INTEGER")
@@ -0,0 +1,6 @@
+"""Track the last slot event applied to each reservation (idempotent consumer)"""
+from app.db.migrations import add_column
+
+
+def upgrade(conn):
+    add_column(conn, "slot_reservations", "event_version", "BIGINT")
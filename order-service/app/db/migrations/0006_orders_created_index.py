@@ -0,0 +1,8 @@
+"""Index for the admin order listing (all vendors, newest first)"""
+from app.db.migrations import create_index
+
+TRANSACTIONAL = False
+
+
+def upgrade(conn):
+    create_index(conn, "ix_orders_created", "orders", "created_at, id")
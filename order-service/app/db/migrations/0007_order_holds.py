@@ -0,0 +1,14 @@
+"""Expiry of pending holds, and the index the expiry sweeper scans"""
+from app.db.migrations import add_column, create_index
+
+TRANSACTIONAL = False
+
+
+def upgrade(conn):
+    # NULL for every existing order: only holds expire
+    add_column(conn, "orders", "hold_expires_at", "TIMESTAMP")
+
+    create_index(
+        conn, "ix_orders_pending_expiry", "orders", "hold_expires_at",
+        where="status = 'pending'"
+    )
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, String, Integer, Enum, ForeignKey, DateTime
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Integer, BigInteger, Enum, ForeignKey, DateTime, Date, Index, text
+from sqlalchemy import Uuid as UUID  # native on Postgres, CHAR(32) on the SQLite stand-in
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import relationship
 import uuid
 import enum
 from datetime import datetime
@@ -40,6 +41,37 @@ class Order(Base):
     eta_confidence = Column(Integer, nullable=True)  # 0-100 percentage
 
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Pending holds: the seat is released if not confirmed by then
+    hold_expires_at = Column(DateTime, nullable=True)
+
+    # Never lazy-loaded: callers eager-load with selectinload (no N+1)
+    items = relationship(
+        "OrderItem",
+        lazy="raise",
+        passive_deletes=True,
+        order_by="OrderItem.id"
+    )
+
+    # Mirrors migrations/0002, 0006 and 0007 so create_all and migrated databases match
+    __table_args__ = (
+        # Keyset pagination: newest-first listings seek on (owner, created_at, id)
+        Index("ix_orders_vendor_created", "vendor_id", "created_at", "id"),
+        Index("ix_orders_student_created", "student_phone", "created_at", "id"),
+        Index("ix_orders_created", "created_at", "id"),
+        Index("ix_orders_vendor_status_created", "vendor_id", "status", "created_at", "id"),
+        # Double-booking check
+        Index(
+            "ix_orders_student_slot_active", "student_phone", "slot_id",
+            postgresql_where=text("status <> 'cancelled'"),
+            sqlite_where=text("status <> 'cancelled'")
+        ),
+        # Hold expiry sweep
+        Index(
+            "ix_orders_pending_expiry", "hold_expires_at",
+            postgresql_where=text("status = 'pending'"),
+            sqlite_where=text("status = 'pending'")
+        ),
+    )
 
 
 # -----------------------------
@@ -52,7 +84,8 @@ class OrderItem(Base):
     order_id = Column(
         UUID(as_uuid=True),
         ForeignKey("orders.id", ondelete="CASCADE"),
-        nullable=False
+        nullable=False,
+        index=True
     )
     item_id = Column(UUID(as_uuid=True), nullable=False)
     quantity = Column(Integer, nullable=False)
@@ -66,3 +99,46 @@ class SlotReservation(Base):
 
     slot_id = Column(UUID(as_uuid=True), primary_key=True)
     available_capacity = Column(Integer, nullable=False)
+    # Vendor-side max at the last sync; capacity changes are applied as deltas
+    max_capacity = Column(Integer, nullable=True)
+    # Slot version of the last vendor slot event applied (dedupes redeliveries)
+    event_version = Column(BigInteger, nullable=True)
+
+
+# -----------------------------
+# Demand Rollups (incremental, see services/demand_rollup.py)
+# -----------------------------
+class OrderDemandHourly(Base):
+    __tablename__ = "order_demand_hourly"
+
+    vendor_id = Column(UUID(as_uuid=True), primary_key=True)
+    bucket_start = Column(DateTime, primary_key=True)  # UTC, truncated to the hour
+    order_count = Column(Integer, nullable=False, default=0)
+
+
+class OrderDemandDaily(Base):
+    __tablename__ = "order_demand_daily"
+
+    vendor_id = Column(UUID(as_uuid=True), primary_key=True)
+    day = Column(Date, primary_key=True)  # UTC
+    order_count = Column(Integer, nullable=False, default=0)
+
+
+class OrderDemandProfile(Base):
+    """Per vendor, weekday (0 = Monday) and hour: orders / trading days"""
+    __tablename__ = "order_demand_profile"
+
+    vendor_id = Column(UUID(as_uuid=True), primary_key=True)
+    weekday = Column(Integer, primary_key=True)
+    hour = Column(Integer, primary_key=True)
+    order_total = Column(Integer, nullable=False, default=0)
+    days_observed = Column(Integer, nullable=False, default=0)
+
+
+class RollupWatermark(Base):
+    """Last (created_at, id) of `orders` folded into the rollups"""
+    __tablename__ = "rollup_watermarks"
+
+    name = Column(String, primary_key=True)
+    last_created_at = Column(DateTime, nullable=True)
+    last_order_id = Column(UUID(as_uuid=True), nullable=True)
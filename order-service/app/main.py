@@ -1,25 +1,89 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from app.db.session import engine, get_db
-from app.db.models import Base
+from tnt_common.metrics import MetricsMiddleware, metrics_response
+from tnt_common.rate_limit import RateLimitMiddleware
+from app.core.security import SECRET_KEY, ALGORITHM
+from app.db.session import async_engine
+from app.db.migrate import migrate
+from app.routers.admin import router as admin_router
 from app.routers.orders import router as orders_router
-from app.services.booking import sync_slot_reservations
-from sqlalchemy.orm import Session
+from app.services.slot_sync import run_slot_sync
+from app.services.slot_events import run_slot_event_consumer
+from app.services.slot_capacity import run_write_behind, run_reconciliation
+from app.services.slot_cache import slot_cache, run_slot_invalidation
+from app.services.vendor_helper import vendor_cache_stats, run_vendor_invalidation
+from app.services.eta_enrichment import run_eta_enrichment
+from app.services.order_counters import run_counter_reconciliation
+from app.services.demand_rollup import run_demand_rollup
+from app.services.order_events import run_vendor_feed
+from app.services.order_holds import run_hold_expiry
+from app.utils.http_client import service_clients
+from app.utils.redis_client import redis_client
 
-Base.metadata.create_all(bind=engine)
+# Bring the schema up to date (AUTO_MIGRATE=false to run `python -m app.db.migrate` separately)
+if os.getenv("AUTO_MIGRATE", "true").lower() == "true":
+    migrate()
 
-app = FastAPI(title="TNT Order Service")
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pooled inter-service HTTP clients
+    await service_clients.start()
+
+    # Slot reservation sync runs in the background (ready immediately),
+    # next to capacity write-behind + reconciliation
+    background_tasks = [
+        asyncio.create_task(run_slot_sync()),
+        asyncio.create_task(run_slot_event_consumer()),
+        asyncio.create_task(run_write_behind()),
+        asyncio.create_task(run_reconciliation()),
+        asyncio.create_task(run_slot_invalidation()),
+        asyncio.create_task(run_vendor_invalidation()),
+        asyncio.create_task(run_eta_enrichment()),
+        asyncio.create_task(run_counter_reconciliation()),
+        asyncio.create_task(run_demand_rollup()),
+        asyncio.create_task(run_vendor_feed()),
+        asyncio.create_task(run_hold_expiry()),
+    ]
+
+    yield
+
+    # Stop background workers, then release pools
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    await service_clients.close()
+    await async_engine.dispose()
+
+
+app = FastAPI(title="TNT Order Service", lifespan=lifespan)
+
+app.add_middleware(
+    RateLimitMiddleware,
+    service="order",
+    redis=redis_client.async_client,
+    jwt_secret=SECRET_KEY,
+    jwt_algorithm=ALGORITHM
+)
+# Outermost, so rate-limited requests are timed too
+app.add_middleware(MetricsMiddleware)
+
+app.include_router(admin_router)
 app.include_router(orders_router)
 
 @app.get("/")
 def root():
     return {"service": "TNT Order Service", "status": "running"}
 
-@app.on_event("startup")
-async def startup_event():
-    """Sync slot reservations on startup"""
-    db: Session = next(get_db())
-    try:
-        await sync_slot_reservations(db)
-    finally:
-        db.close()
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return metrics_response()
+
+@app.get("/cache/stats")
+def cache_stats():
+    return {
+        "slot_cache": slot_cache.stats(),
+        "vendor_identity": vendor_cache_stats()
+    }
@@ -0,0 +1,106 @@
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.schemas.order import OrderSummary, OrderLookup, OrderCounts
+from app.schemas.reservation import ReservationResponse, ReservationLookup
+from app.core.security import require_admin
+from app.db.session import get_async_db
+from app.services.booking import get_all_orders, count_orders, get_orders_by_ids
+from app.services.reservations import list_reservations, lookup_reservations
+from app.db.models import OrderStatus
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER
+from uuid import UUID
+from datetime import datetime
+from typing import Optional, List
+
+# Listings for admin-service (called with the admin's bearer token).
+# Included before the orders router so /orders/counts and /orders/lookup
+# are not taken for an order id.
+router = APIRouter(tags=["Admin"])
+
+
+# ======================================================
+# ORDERS
+# ======================================================
+@router.get("/orders", response_model=List[OrderSummary])
+async def list_all_orders(
+    response: Response,
+    status: Optional[OrderStatus] = None,
+    vendor_id: Optional[UUID] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    payload=Depends(require_admin),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Newest-first keyset page of all orders; next page cursor in X-Next-Cursor"""
+    orders, next_cursor = await get_all_orders(
+        db=db,
+        vendor_id=vendor_id,
+        status=status,
+        created_from=created_from,
+        created_to=created_to,
+        cursor=cursor,
+        limit=limit
+    )
+
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+    return orders
+
+
+@router.get("/orders/counts", response_model=OrderCounts)
+async def get_order_counts(
+    vendor_id: Optional[UUID] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    payload=Depends(require_admin),
+    db: AsyncSession = Depends(get_async_db)
+):
+    by_status = await count_orders(
+        db=db,
+        vendor_id=vendor_id,
+        created_from=created_from,
+        created_to=created_to
+    )
+
+    return {"total": sum(by_status.values()), "by_status": by_status}
+
+
+@router.post("/orders/lookup", response_model=List[OrderSummary])
+async def lookup_orders(
+    data: OrderLookup,
+    payload=Depends(require_admin),
+    db: AsyncSession = Depends(get_async_db)
+):
+    return await get_orders_by_ids(db, data.ids)
+
+
+# ======================================================
+# SLOT RESERVATIONS
+# ======================================================
+@router.get("/reservations/", response_model=List[ReservationResponse])
+async def list_all_reservations(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    payload=Depends(require_admin),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Keyset page of reservations by slot id; next page cursor in X-Next-Cursor"""
+    reservations, next_cursor = await list_reservations(db, cursor, limit)
+
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+    return reservations
+
+
+@router.post("/reservations/lookup", response_model=List[ReservationResponse])
+async def lookup_slot_reservations(
+    data: ReservationLookup,
+    payload=Depends(require_admin),
+    db: AsyncSession = Depends(get_async_db)
+):
+    return await lookup_reservations(db, data.slot_ids)
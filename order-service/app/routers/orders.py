@@ -1,27 +1,139 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.schemas.order import OrderCreate, OrderResponse, OrderItemResponse
+from fastapi import APIRouter, Depends, Header, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.schemas.order import OrderCreate, CartCheckout, OrderResponse, OrderSummary, order_response_list
 from app.core.security import require_student, require_vendor
-from app.db.session import get_db
-from app.services.booking import create_order, complete_order, get_vendor_orders, cancel_order, get_student_orders
+from app.db.session import get_async_db
+from app.services.booking import create_order, create_orders_batch, confirm_order, complete_order, get_vendor_orders, cancel_order, get_student_orders, get_student_order, join_waitlist, leave_waitlist, get_waitlist_position, vendor_orders_query, student_orders_query, stream_orders
 from app.db.models import OrderStatus
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER
 from uuid import UUID
-from typing import Optional, List
+from datetime import datetime
+from typing import Optional, List, Literal
 from app.services.vendor_helper import get_vendor_id_by_phone
+from app.services.order_events import vendor_feed
+from app.services.admission import admission
+from app.services.idempotency import idempotency, fingerprint, IDEMPOTENCY_HEADER
+import asyncio
+import os
 
 router = APIRouter(
     prefix="/orders",
     tags=["Orders"]
 )
 
+# Comment frames keep idle feeds open through proxies
+VENDOR_FEED_HEARTBEAT = float(os.getenv("VENDOR_FEED_HEARTBEAT", "15"))
+
+
+def _ndjson(query) -> StreamingResponse:
+    """Stream a full listing as one JSON order per line"""
+    async def lines():
+        async for order in stream_orders(query):
+            yield OrderSummary.model_validate(order).model_dump_json() + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
 
 @router.post("/")
 async def place_order(
     data: OrderCreate,
     payload=Depends(require_student),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db),
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER)
+):
+    async def place():
+        # Flash crowds are queued / turned away before any upstream or DB work
+        async with admission.ticket(data.slot_id, payload["sub"]):
+            order = await create_order(
+                db=db,
+                student_phone=payload["sub"],
+                slot_id=data.slot_id,
+                items=data.items
+            )
+
+        return {
+            "order_id": order.id,
+            "status": order.status,
+            "slot_id": order.slot_id
+        }
+
+    return await idempotency.run(
+        "orders.place", payload["sub"], idempotency_key, fingerprint(data), place
+    )
+
+
+@router.post("/hold")
+async def hold_order(
+    data: OrderCreate,
+    payload=Depends(require_student),
+    db: AsyncSession = Depends(get_async_db),
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER)
+):
+    """Hold a seat while the student finishes the cart; confirm before hold_expires_at"""
+    async def hold():
+        async with admission.ticket(data.slot_id, payload["sub"]):
+            order = await create_order(
+                db=db,
+                student_phone=payload["sub"],
+                slot_id=data.slot_id,
+                items=data.items,
+                hold=True
+            )
+
+        return {
+            "order_id": order.id,
+            "status": order.status,
+            "slot_id": order.slot_id,
+            "hold_expires_at": order.hold_expires_at
+        }
+
+    return await idempotency.run(
+        "orders.hold", payload["sub"], idempotency_key, fingerprint(data), hold
+    )
+
+
+@router.post("/checkout")
+async def checkout_cart(
+    data: CartCheckout,
+    payload=Depends(require_student),
+    db: AsyncSession = Depends(get_async_db),
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER)
+):
+    """Book several slots / orders in one all-or-nothing transaction"""
+    async def checkout():
+        # Admitted to every slot in the cart, or turned away before any work
+        async with admission.tickets([cart.slot_id for cart in data.orders], payload["sub"]):
+            orders = await create_orders_batch(
+                db=db,
+                student_phone=payload["sub"],
+                carts=data.orders
+            )
+
+        return {
+            "orders": [
+                {
+                    "order_id": order.id,
+                    "status": order.status,
+                    "slot_id": order.slot_id
+                }
+                for order in orders
+            ]
+        }
+
+    return await idempotency.run(
+        "orders.checkout", payload["sub"], idempotency_key, fingerprint(data), checkout
+    )
+
+
+@router.post("/waitlist")
+async def join_slot_waitlist(
+    data: OrderCreate,
+    payload=Depends(require_student),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    order = await create_order(
+    """Wait for a full slot; the order is placed when a seat frees up"""
+    position = await join_waitlist(
         db=db,
         student_phone=payload["sub"],
         slot_id=data.slot_id,
@@ -29,109 +141,248 @@ async def place_order(
     )
 
     return {
-        "order_id": order.id,
-        "status": order.status,
-        "slot_id": order.slot_id
+        "slot_id": data.slot_id,
+        "position": position
+    }
+
+
+@router.get("/waitlist/{slot_id}")
+async def get_slot_waitlist_position(
+    slot_id: UUID,
+    payload=Depends(require_student)
+):
+    return {
+        "slot_id": slot_id,
+        "position": await get_waitlist_position(payload["sub"], slot_id)
     }
 
 
+@router.delete("/waitlist/{slot_id}")
+async def leave_slot_waitlist(
+    slot_id: UUID,
+    payload=Depends(require_student)
+):
+    await leave_waitlist(payload["sub"], slot_id)
+
+    return {"slot_id": slot_id, "status": "left"}
+
+
 @router.get("/vendor")
 async def get_orders_for_vendor(
+    response: Response,
     status: Optional[OrderStatus] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    format: Literal["json", "ndjson"] = "json",
     payload=Depends(require_vendor),
-    db: Session = Depends(get_db)
-):
+    db: AsyncSession = Depends(get_async_db)
+) -> List[OrderSummary]:
+    """
+    Newest-first page of the vendor's orders; the next page's cursor is
+    returned in the X-Next-Cursor header. format=ndjson streams every
+    matching order instead (cursor / limit are ignored).
+    """
     vendor_phone = payload["sub"]  # phone from JWT
 
-    # Get vendor_id from Vendor Service
-    vendor_id = await get_vendor_id_by_phone(vendor_phone)
+    # Resolve vendor_id (JWT claim / identity cache / Vendor Service)
+    vendor_id = await get_vendor_id_by_phone(vendor_phone, payload)
 
-    orders = get_vendor_orders(
+    if format == "ndjson":
+        return _ndjson(vendor_orders_query(vendor_id, status, created_from, created_to))
+
+    orders, next_cursor = await get_vendor_orders(
         db=db,
         vendor_id=vendor_id,
-        status=status
+        status=status,
+        created_from=created_from,
+        created_to=created_to,
+        cursor=cursor,
+        limit=limit
     )
 
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
     return orders
 
 
+@router.get("/vendor/stream")
+async def stream_vendor_orders(
+    payload=Depends(require_vendor)
+):
+    """
+    Server-Sent Events feed of the vendor's new, cancelled and completed
+    orders (events: order.created / order.cancelled / order.completed,
+    data: the order). Load the current list with GET /orders/vendor first.
+    """
+    vendor_id = await get_vendor_id_by_phone(payload["sub"], payload)
+    queue = vendor_feed.subscribe(vendor_id)
+
+    async def frames():
+        try:
+            yield ": connected\n\n"
+            while True:
+                try:
+                    frame = await asyncio.wait_for(queue.get(), VENDOR_FEED_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                if frame is None:  # dropped as too slow, or shutting down
+                    return
+                yield frame
+        finally:
+            vendor_feed.unsubscribe(vendor_id, queue)
+
+    return StreamingResponse(
+        frames(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.post("/{order_id}/complete")
 async def complete_order_api(
     order_id: UUID,
     payload=Depends(require_vendor),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db),
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER)
 ):
     vendor_phone = payload["sub"]
 
-    # Get vendor_id from Vendor Service
-    vendor_id = await get_vendor_id_by_phone(vendor_phone)
+    async def complete():
+        # Resolve vendor_id (JWT claim / identity cache / Vendor Service)
+        vendor_id = await get_vendor_id_by_phone(vendor_phone, payload)
 
-    order = complete_order(
-        db=db,
-        order_id=order_id,
-        vendor_id=vendor_id
+        order = await complete_order(
+            db=db,
+            order_id=order_id,
+            vendor_id=vendor_id
+        )
+
+        return {
+            "order_id": order.id,
+            "status": order.status
+        }
+
+    return await idempotency.run(
+        "orders.complete", vendor_phone, idempotency_key, fingerprint(order_id), complete
     )
 
-    return {
-        "order_id": order.id,
-        "status": order.status
-    }
+
+@router.post("/{order_id}/confirm")
+async def confirm_order_api(
+    order_id: UUID,
+    payload=Depends(require_student),
+    db: AsyncSession = Depends(get_async_db),
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER)
+):
+    """Turn a pending hold into an order (409 once the hold has expired)"""
+    student_phone = payload["sub"]
+
+    async def confirm():
+        order = await confirm_order(
+            db=db,
+            order_id=order_id,
+            student_phone=student_phone
+        )
+
+        return {
+            "order_id": order.id,
+            "status": order.status,
+            "slot_id": order.slot_id
+        }
+
+    return await idempotency.run(
+        "orders.confirm", student_phone, idempotency_key, fingerprint(order_id), confirm
+    )
 
 
 @router.post("/{order_id}/cancel")
 async def cancel_order_api(
     order_id: UUID,
     payload=Depends(require_student),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db),
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER)
 ):
     student_phone = payload["sub"]
 
-    order = cancel_order(
-        db=db,
-        order_id=order_id,
-        student_phone=student_phone
-    )
+    async def cancel():
+        order = await cancel_order(
+            db=db,
+            order_id=order_id,
+            student_phone=student_phone
+        )
 
-    return {
-        "order_id": order.id,
-        "status": order.status
-    }
+        return {
+            "order_id": order.id,
+            "status": order.status
+        }
+
+    return await idempotency.run(
+        "orders.cancel", student_phone, idempotency_key, fingerprint(order_id), cancel
+    )
 
 
 @router.get("/student")
 async def get_student_order_history(
     status: Optional[OrderStatus] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    format: Literal["json", "ndjson"] = "json",
     payload=Depends(require_student),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> List[OrderResponse]:
     student_phone = payload["sub"]
 
-    orders = get_student_orders(
+    if format == "ndjson":
+        return _ndjson(student_orders_query(student_phone, status, created_from, created_to))
+
+    orders, next_cursor = await get_student_orders(
         db=db,
         student_phone=student_phone,
-        status=status
+        status=status,
+        created_from=created_from,
+        created_to=created_to,
+        cursor=cursor,
+        limit=limit
     )
 
-    # Convert to response format
-    response_orders = []
-    for order in orders:
-        items = [
-            OrderItemResponse(
-                item_id=item.item_id,
-                quantity=item.quantity
-            )
-            for item in order.items
-        ]
-
-        response_orders.append(
-            OrderResponse(
-                id=order.id,
-                vendor_id=order.vendor_id,
-                slot_id=order.slot_id,
-                status=order.status.value,
-                created_at=order.created_at,
-                items=items
-            )
-        )
+    # ORM rows (items already loaded) -> JSON without FastAPI's re-validation
+    body = order_response_list.dump_json(
+        order_response_list.validate_python(orders, from_attributes=True)
+    )
+
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    )
 
-    return response_orders
+
+@router.get("/{order_id}")
+async def get_order_details(
+    order_id: UUID,
+    payload=Depends(require_student),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Order status, including the ETA once enrichment has filled it in"""
+    order = await get_student_order(
+        db=db,
+        order_id=order_id,
+        student_phone=payload["sub"]
+    )
+
+    return {
+        "order_id": order.id,
+        "status": order.status,
+        "slot_id": order.slot_id,
+        "vendor_id": order.vendor_id,
+        "created_at": order.created_at,
+        "hold_expires_at": order.hold_expires_at,
+        "estimated_minutes": order.estimated_minutes,
+        "eta_confidence": order.eta_confidence
+    }
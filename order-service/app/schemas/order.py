@@ -1,7 +1,8 @@
-from pydantic import BaseModel
-from typing import List
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, field_validator
+from typing import Dict, List, Optional
 from uuid import UUID
 from datetime import datetime
+from app.utils.pagination import MAX_LOOKUP_IDS
 
 
 class OrderItemCreate(BaseModel):
@@ -14,15 +15,63 @@ class OrderCreate(BaseModel):
     items: List[OrderItemCreate]
 
 
+class CartCheckout(BaseModel):
+    orders: List[OrderCreate] = Field(..., min_length=1)
+
+
 class OrderItemResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     item_id: UUID
     quantity: int
 
 
+def _enum_value(value):
+    return getattr(value, "value", value)
+
+
 class OrderResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: UUID
     vendor_id: UUID
     slot_id: UUID
     status: str
     created_at: datetime
     items: List[OrderItemResponse]
+    # Set while the order is a pending hold
+    hold_expires_at: Optional[datetime] = None
+    # Filled in asynchronously by the ETA enrichment worker
+    estimated_minutes: Optional[int] = None
+    eta_confidence: Optional[int] = None
+
+    _status_value = field_validator("status", mode="before")(_enum_value)
+
+
+# Validates ORM rows and dumps JSON in one pass (no per-order dict round trip)
+order_response_list = TypeAdapter(List[OrderResponse])
+
+
+class OrderSummary(BaseModel):
+    """One row of a vendor / admin listing or NDJSON export"""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    student_phone: str
+    vendor_id: UUID
+    slot_id: UUID
+    status: str
+    created_at: datetime
+    estimated_minutes: Optional[int] = None
+    eta_confidence: Optional[int] = None
+
+    _status_value = field_validator("status", mode="before")(_enum_value)
+
+
+class OrderLookup(BaseModel):
+    ids: List[UUID] = Field(..., max_length=MAX_LOOKUP_IDS)
+
+
+class OrderCounts(BaseModel):
+    total: int
+    by_status: Dict[str, int]
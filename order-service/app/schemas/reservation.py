@@ -0,0 +1,16 @@
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Optional
+from uuid import UUID
+from app.utils.pagination import MAX_LOOKUP_IDS
+
+
+class ReservationResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    slot_id: UUID
+    available_capacity: int
+    max_capacity: Optional[int] = None
+
+
+class ReservationLookup(BaseModel):
+    slot_ids: List[UUID] = Field(..., max_length=MAX_LOOKUP_IDS)
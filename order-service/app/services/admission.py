@@ -0,0 +1,159 @@
+import logging
+import math
+import os
+import time
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Iterable
+
+from fastapi import HTTPException
+from redis.exceptions import RedisError
+
+from tnt_common import metrics
+from app.services.slot_capacity import slot_capacity
+from app.utils.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+# Bookers admitted beyond the remaining capacity (absorbs failed bookings)
+ADMISSION_MARGIN = int(os.getenv("ADMISSION_MARGIN", "5"))
+# An admitted booker that never finishes frees its ticket after this
+ADMISSION_TICKET_TTL = float(os.getenv("ADMISSION_TICKET_TTL", "10"))
+# Queued students who stop retrying drop out after this
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "60"))
+# Expected time one booking holds its ticket (drives Retry-After)
+ADMISSION_BOOKING_SECONDS = float(os.getenv("ADMISSION_BOOKING_SECONDS", "1"))
+
+# Script results
+ADMITTED = 1
+QUEUED = 0
+FULL = -1
+
+ADMISSION_CONTENTION = metrics.contention("admission", "queued", "full")
+
+
+# ======================================================
+# LUA SCRIPT (executed atomically inside Redis)
+# ======================================================
+# KEYS[1] = admitted bookers (zset, score = ticket expiry), KEYS[2] = queue
+# (zset, score = arrival), KEYS[3..] = capacity counter (or all of its shards)
+# ARGV[1] = student, ARGV[2] = now, ARGV[3] = ticket ttl, ARGV[4] = margin,
+# ARGV[5] = queue timeout
+# Returns {result, position, admission window}
+ADMIT_SCRIPT = """
+local now = tonumber(ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', now - tonumber(ARGV[5]))
+
+local remaining = 0
+for i = 3, #KEYS do
+    local shard = redis.call('GET', KEYS[i])
+    if not shard then
+        -- No live counter yet: the booking path loads it
+        return {1, 0, 0}
+    end
+    remaining = remaining + tonumber(shard)
+end
+if remaining <= 0 then
+    redis.call('ZREM', KEYS[2], ARGV[1])
+    return {-1, 0, 0}
+end
+
+local window = remaining + tonumber(ARGV[4]) - redis.call('ZCARD', KEYS[1])
+redis.call('ZADD', KEYS[2], 'NX', now, ARGV[1])
+local rank = redis.call('ZRANK', KEYS[2], ARGV[1])
+
+if rank < window then
+    redis.call('ZREM', KEYS[2], ARGV[1])
+    redis.call('ZADD', KEYS[1], now + tonumber(ARGV[3]), ARGV[1])
+    redis.call('EXPIRE', KEYS[1], math.ceil(tonumber(ARGV[3])))
+    return {1, 0, window}
+end
+
+redis.call('EXPIRE', KEYS[2], math.ceil(tonumber(ARGV[5])))
+return {0, rank - math.max(window, 0) + 1, window}
+"""
+
+
+class AdmissionController:
+    """
+    Virtual queue in front of slot booking.
+
+    Per slot, only (remaining capacity + margin) bookers are in flight at
+    once; everyone else gets a FIFO position and a Retry-After from one
+    Redis script, before any vendor-service or database work. Full slots
+    are rejected from the same script.
+    """
+
+    def __init__(self):
+        # Event-loop client: admission runs in front of every booking
+        self.redis = redis_client.async_client
+        self._admit = self.redis.register_script(ADMIT_SCRIPT)
+
+    @staticmethod
+    def admitted_key(slot_id) -> str:
+        return f"slot_admitted:{slot_id}"
+
+    @staticmethod
+    def queue_key(slot_id) -> str:
+        return f"slot_queue:{slot_id}"
+
+    async def admit(self, slot_id, student: str):
+        """Take a ticket or raise 409 (full) / 429 (queued, with position)"""
+        try:
+            result, position, window = await self._admit(
+                keys=[self.admitted_key(slot_id), self.queue_key(slot_id)] + slot_capacity.capacity_keys(slot_id),
+                args=[student, time.time(), ADMISSION_TICKET_TTL, ADMISSION_MARGIN, ADMISSION_QUEUE_TIMEOUT]
+            )
+        except RedisError as e:
+            # Fail open: the booking path still enforces capacity
+            logger.warning(f"Admission control unavailable: {e}")
+            return
+
+        if result == FULL:
+            ADMISSION_CONTENTION.full.inc()
+            raise HTTPException(
+                status_code=409,
+                detail="Slot is full"
+            )
+
+        if result == QUEUED:
+            ADMISSION_CONTENTION.queued.inc()
+            # Bookers ahead go through in waves of the admission window
+            retry_after = math.ceil(
+                math.ceil(position / max(window, 1)) * ADMISSION_BOOKING_SECONDS
+            )
+            raise HTTPException(
+                status_code=429,
+                detail={"message": "Slot is busy, retry later", "position": position},
+                headers={"Retry-After": str(max(retry_after, 1))}
+            )
+
+    async def release(self, slot_id, student: str):
+        try:
+            await self.redis.zrem(self.admitted_key(slot_id), student)
+        except RedisError as e:
+            logger.warning(f"Failed to release admission ticket: {e}")
+
+    @asynccontextmanager
+    async def ticket(self, slot_id, student: str):
+        """Hold an admission ticket for the duration of one booking"""
+        await self.admit(slot_id, student)
+        try:
+            yield
+        finally:
+            await self.release(slot_id, student)
+
+    @asynccontextmanager
+    async def tickets(self, slot_ids: Iterable, student: str):
+        """
+        Hold a ticket for every slot of a cart checkout, taken in slot
+        order; a slot that is full or queued gives the ones taken back
+        """
+        async with AsyncExitStack() as stack:
+            for slot_id in sorted(set(slot_ids), key=str):
+                await stack.enter_async_context(self.ticket(slot_id, student))
+            yield
+
+
+# Global controller instance
+admission = AdmissionController()
@@ -1,58 +1,81 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import func, insert, select, true, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from fastapi import HTTPException
 from app.db.models import (
     Order,
     OrderItem,
-    SlotReservation,
     OrderStatus
 )
-from app.utils.vendor_client import get_slot_by_id
-from app.utils.redis_client import redis_client
-from app.utils.ai_client import ai_client
+from app.services.slot_cache import slot_cache
+from app.services.eta_enrichment import enqueue_eta
+from app.services.order_counters import order_counters
+from app.services.order_events import publish_order_event, publish_promotion
+from tnt_common import metrics
+from app.db.session import AsyncSessionLocal
+from app.utils.pagination import DEFAULT_PAGE_SIZE, apply_keyset, split_page
+from app.services.slot_capacity import (
+    slot_capacity,
+    Promotion,
+    ALREADY_HELD,
+    HAS_CAPACITY,
+    NOT_HELD,
+    NOT_LOADED
+)
+from datetime import datetime, timedelta
+from typing import Dict, List
+from uuid import UUID
+import asyncio
 import logging
+import os
+import uuid
 
 logger = logging.getLogger(__name__)
 
+# How long a pending hold keeps its seat without being confirmed
+HOLD_TTL = timedelta(seconds=int(os.getenv("ORDER_HOLD_TTL", "300")))
 
-# ======================================================
-# HELPER FUNCTIONS
-# ======================================================
-def _get_time_of_day() -> str:
-    """Get current time of day category"""
-    import datetime
-    hour = datetime.datetime.utcnow().hour
-    if 6 <= hour < 12:
-        return "morning"
-    elif 12 <= hour < 17:
-        return "afternoon"
-    else:
-        return "evening"
-
-def _get_day_of_week() -> str:
-    """Get current day of week"""
-    import datetime
-    return datetime.datetime.utcnow().strftime("%A").lower()
+# Rows fetched per round trip when streaming a full listing
+STREAM_CHUNK_SIZE = 500
+
+# Pre-resolved stage timers / contention counters (GET /metrics)
+CREATE_ORDER_STAGES = metrics.stages(
+    "create_order", "slot_lookup", "duplicate_check", "reserve_seat", "insert", "commit", "after_commit"
+)
+CANCEL_ORDER_STAGES = metrics.stages(
+    "cancel_order", "fetch_order", "release_seat", "load_counter", "commit", "after_commit"
+)
+SEAT_CONTENTION = metrics.contention("slot_seat", "full", "already_held")
 
 
 # ======================================================
 # CREATE ORDER (STUDENT)
 # ======================================================
 async def create_order(
-    db: Session,
+    db: AsyncSession,
     student_phone: str,
     slot_id,
-    items
+    items,
+    hold: bool = False
 ):
-    # 1️⃣ Get slot info from Vendor Service
-    slot = await get_slot_by_id(slot_id)
-    vendor_id = slot["vendor_id"]
+    """
+    Book a seat. With hold=True the order stays pending until the
+    student confirms it within HOLD_TTL, else the sweeper releases it.
+    """
+    # 1️⃣ Get slot info (cached, falls back to Vendor Service)
+    with CREATE_ORDER_STAGES.slot_lookup.time():
+        slot = await slot_cache.get(slot_id)
+    vendor_id = UUID(str(slot["vendor_id"]))
 
     # 2️⃣ Prevent double booking (same student, same slot)
-    existing = db.query(Order).filter(
-        Order.student_phone == student_phone,
-        Order.slot_id == slot_id,
-        Order.status != OrderStatus.cancelled
-    ).first()
+    with CREATE_ORDER_STAGES.duplicate_check.time():
+        existing = await db.scalar(
+            select(Order.id).where(
+                Order.student_phone == student_phone,
+                Order.slot_id == slot_id,
+                Order.status != OrderStatus.cancelled
+            ).limit(1)
+        )
 
     if existing:
         raise HTTPException(
@@ -60,108 +83,262 @@ async def create_order(
             detail="You have already booked this slot"
         )
 
-    # 3️⃣ Acquire Redis distributed lock for slot (PREVENTS RACE CONDITIONS)
-    lock_key = f"slot_lock:{slot_id}"
-    if not redis_client.acquire_lock(lock_key, ttl_seconds=30):
-        logger.warning(f"Failed to acquire lock for slot {slot_id}")
+    # 3️⃣ Reserve capacity atomically in Redis (no lock, no row lock)
+    with CREATE_ORDER_STAGES.reserve_seat.time():
+        remaining = await slot_capacity.reserve(db, slot_id, student_phone)
+
+    if remaining == ALREADY_HELD:
+        SEAT_CONTENTION.already_held.inc()
+        raise HTTPException(
+            status_code=409,
+            detail="You have already booked this slot"
+        )
+
+    if remaining < 0:
+        SEAT_CONTENTION.full.inc()
         raise HTTPException(
             status_code=409,
-            detail="Slot is currently being booked by another user. Please try again."
+            detail="Slot is full"
         )
 
     try:
-        # 4️⃣ Lock slot reservation row (DATABASE LEVEL)
-        reservation = (
-            db.query(SlotReservation)
-            .filter(SlotReservation.slot_id == slot_id)
-            .with_for_update()
-            .first()
+        # 4️⃣ Create order (a hold is pending, with an expiry)
+        with CREATE_ORDER_STAGES.insert.time():
+            order = Order(
+                student_phone=student_phone,
+                vendor_id=vendor_id,
+                slot_id=slot_id,
+                status=OrderStatus.pending if hold else OrderStatus.confirmed,
+                hold_expires_at=datetime.utcnow() + HOLD_TTL if hold else None
+            )
+            db.add(order)
+            await db.flush()  # generate order.id
+
+            # 5️⃣ Create order items
+            for item in items:
+                db.add(
+                    OrderItem(
+                        order_id=order.id,
+                        item_id=item.item_id,
+                        quantity=item.quantity
+                    )
+                )
+
+        # 6️⃣ Commit transaction (slot_reservations is updated by write-behind)
+        with CREATE_ORDER_STAGES.commit.time():
+            await db.commit()
+
+    except BaseException:
+        # 7️⃣ Give the seat back if the order could not be stored, also when the
+        #    request is cancelled mid-commit (CancelledError is a BaseException)
+        try:
+            await db.rollback()
+        finally:
+            await slot_capacity.release(slot_id, student_phone)
+        raise
+
+    # 8️⃣ A hold is not an order yet: counters, feed and ETA wait for confirmation
+    if not hold:
+        with CREATE_ORDER_STAGES.after_commit.time():
+            await _order_placed(order)
+
+    return order
+
+
+async def _order_placed(order: Order):
+    """After commit: one more active order for the vendor, vendor feed, ETA"""
+    await order_counters.activated(order)
+    await publish_order_event("order.created", order)
+
+    # ETA is predicted after commit by the enrichment worker
+    try:
+        await enqueue_eta(order)
+    except Exception as e:
+        logger.warning(f"Failed to queue ETA for order {order.id}: {e}")
+
+
+# ======================================================
+# CONFIRM HOLD (STUDENT)
+# ======================================================
+async def confirm_order(
+    db: AsyncSession,
+    order_id,
+    student_phone: str
+):
+    # 1️⃣ Pending -> confirmed in one conditional UPDATE (no row lock held;
+    #    the expiry sweeper's UPDATE only takes holds that are past due)
+    confirmed = await db.scalar(
+        update(Order)
+        .where(
+            Order.id == order_id,
+            Order.student_phone == student_phone,
+            Order.status == OrderStatus.pending,
+            Order.hold_expires_at > datetime.utcnow()
+        )
+        .values(status=OrderStatus.confirmed, hold_expires_at=None)
+        .returning(Order.id)
+    )
+    await db.commit()
+
+    # 2️⃣ Nothing updated: say why
+    if not confirmed:
+        order = await db.scalar(
+            select(Order).where(
+                Order.id == order_id,
+                Order.student_phone == student_phone
+            )
         )
 
-        if not reservation or reservation.available_capacity <= 0:
+        if not order:
+            raise HTTPException(
+                status_code=404,
+                detail="Order not found"
+            )
+
+        if order.status == OrderStatus.confirmed:
+            raise HTTPException(
+                status_code=400,
+                detail="Order already confirmed"
+            )
+
+        if order.status == OrderStatus.pending:
             raise HTTPException(
                 status_code=409,
-                detail="Slot is full"
+                detail="Hold has expired"
             )
 
-        # 5️⃣ Decrease capacity
-        reservation.available_capacity -= 1
+        raise HTTPException(
+            status_code=400,
+            detail="Only pending holds can be confirmed"
+        )
 
-        # 6️⃣ Create order
-        order = Order(
-            student_phone=student_phone,
-            vendor_id=vendor_id,
-            slot_id=slot_id,
-            status=OrderStatus.confirmed
+    order = await db.scalar(select(Order).where(Order.id == confirmed))
+
+    # 3️⃣ Now a real order: counters, vendor feed, ETA
+    await _order_placed(order)
+
+    return order
+
+
+# ======================================================
+# CART CHECKOUT (STUDENT, SEVERAL SLOTS AT ONCE)
+# ======================================================
+async def create_orders_batch(
+    db: AsyncSession,
+    student_phone: str,
+    carts
+):
+    # 1️⃣ Deterministic slot order (reservation + insert order)
+    carts = sorted(carts, key=lambda cart: str(cart.slot_id))
+    slot_ids = [cart.slot_id for cart in carts]
+
+    if len(set(slot_ids)) != len(slot_ids):
+        raise HTTPException(
+            status_code=400,
+            detail="Each slot can appear only once per checkout"
         )
-        db.add(order)
-        db.flush()  # generate order.id
-
-        # 7️⃣ Create order items
-        for item in items:
-            db.add(
-                OrderItem(
-                    order_id=order.id,
-                    item_id=item.item_id,
-                    quantity=item.quantity
-                )
-            )
 
-        # 8️⃣ Get AI-powered ETA prediction
-        eta_prediction = None
-        try:
-            # Get current order count for this vendor
-            current_orders = db.query(Order).filter(
-                Order.vendor_id == vendor_id,
-                Order.status == OrderStatus.confirmed
-            ).count()
+    # 2️⃣ Slot info for every slot, fetched concurrently
+    slots = await asyncio.gather(*(slot_cache.get(slot_id) for slot_id in slot_ids))
 
-            # Prepare AI request
-            from app.utils.ai_client import ETAPredictionRequest
-            import datetime
+    # 3️⃣ Prevent double booking in one query
+    existing = await db.scalar(
+        select(Order.slot_id).where(
+            Order.student_phone == student_phone,
+            Order.slot_id.in_(slot_ids),
+            Order.status != OrderStatus.cancelled
+        ).limit(1)
+    )
 
-            eta_request = ETAPredictionRequest(
-                vendor_id=vendor_id,
-                slot_id=slot_id,
-                current_orders=current_orders,
-                historical_avg_orders=15.0,  # TODO: Calculate from historical data
-                time_of_day=self._get_time_of_day(),
-                day_of_week=self._get_day_of_week()
-            )
+    if existing:
+        raise HTTPException(
+            status_code=409,
+            detail=f"You have already booked slot {existing}"
+        )
 
-            eta_prediction = await ai_client.predict_eta(eta_request)
-        except Exception as e:
-            logger.warning(f"ETA prediction failed: {e}")
+    # 4️⃣ Reserve every slot atomically (all-or-nothing)
+    code, failed_slot = await slot_capacity.reserve_many(db, slot_ids, student_phone)
 
-        # 9️⃣ Commit transaction
-        db.commit()
-        db.refresh(order)
+    if code == ALREADY_HELD:
+        raise HTTPException(
+            status_code=409,
+            detail=f"You have already booked slot {failed_slot}"
+        )
 
-        # 10️⃣ Add ETA to order response
-        if eta_prediction:
-            order.estimated_minutes = eta_prediction.get("estimated_minutes")
-            order.eta_confidence = eta_prediction.get("confidence_score")
+    if code < 0:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Slot {failed_slot} is full"
+        )
 
-        return order
+    try:
+        # 5️⃣ Create all orders (ids assigned client-side, one flush)
+        orders = [
+            Order(
+                id=uuid.uuid4(),
+                student_phone=student_phone,
+                vendor_id=UUID(str(slot["vendor_id"])),
+                slot_id=cart.slot_id,
+                status=OrderStatus.confirmed
+            )
+            for cart, slot in zip(carts, slots)
+        ]
+        db.add_all(orders)
+        await db.flush()
+
+        # 6️⃣ Bulk insert every order item
+        item_rows = [
+            {
+                "order_id": order.id,
+                "item_id": item.item_id,
+                "quantity": item.quantity
+            }
+            for order, cart in zip(orders, carts)
+            for item in cart.items
+        ]
+        if item_rows:
+            await db.execute(insert(OrderItem), item_rows)
+
+        # 7️⃣ Commit everything in one transaction
+        await db.commit()
+
+    except BaseException:
+        # 8️⃣ All-or-nothing: give every seat back (on cancellation too)
+        try:
+            await db.rollback()
+        finally:
+            await slot_capacity.release_many(slot_ids, student_phone)
+        raise
 
-    finally:
-        # 9️⃣ Always release Redis lock
-        redis_client.release_lock(lock_key)
+    # 9️⃣ Active-order counters, vendor feeds, then ETA enrichment, after commit
+    await order_counters.activated(*orders)
+    await publish_order_event("order.created", *orders)
+
+    for order in orders:
+        try:
+            await enqueue_eta(order)
+        except Exception as e:
+            logger.warning(f"Failed to queue ETA for order {order.id}: {e}")
+
+    return orders
 
 
 # ======================================================
 # CANCEL ORDER (STUDENT)
 # ======================================================
-def cancel_order(
-    db: Session,
+async def cancel_order(
+    db: AsyncSession,
     order_id,
     student_phone: str
 ):
     # 1️⃣ Fetch order (ownership enforced)
-    order = db.query(Order).filter(
-        Order.id == order_id,
-        Order.student_phone == student_phone
-    ).first()
+    with CANCEL_ORDER_STAGES.fetch_order.time():
+        order = await db.scalar(
+            select(Order).where(
+                Order.id == order_id,
+                Order.student_phone == student_phone
+            )
+        )
 
     if not order:
         raise HTTPException(
@@ -182,118 +359,369 @@ def cancel_order(
             detail="Completed orders cannot be cancelled"
         )
 
-    # 3️⃣ Lock slot reservation row
-    reservation = (
-        db.query(SlotReservation)
-        .filter(SlotReservation.slot_id == order.slot_id)
-        .with_for_update()
-        .first()
-    )
-
-    if not reservation:
-        raise HTTPException(
-            status_code=500,
-            detail="Slot reservation missing"
-        )
+    # 3️⃣ Hand the seat to the head of the waitlist, else restore capacity
+    with CANCEL_ORDER_STAGES.release_seat.time():
+        released, promotion = await slot_capacity.release_or_promote(order.slot_id, student_phone)
+
+    if released == NOT_LOADED:
+        # No live counter: seed it from the table (the same load the
+        # booking path uses) and release through Redis. Adjusting the table
+        # directly would lose the seat to write-behind of a counter another
+        # worker loads from the pre-cancel row meanwhile.
+        with CANCEL_ORDER_STAGES.load_counter.time():
+            if not await slot_capacity.load(db, order.slot_id):
+                raise HTTPException(
+                    status_code=500,
+                    detail="Slot reservation missing"
+                )
+            released, promotion = await slot_capacity.release_or_promote(order.slot_id, student_phone)
 
-    # 4️⃣ Restore slot capacity
-    reservation.available_capacity += 1
+    if released == NOT_HELD:
+        logger.warning(f"Order {order.id} held no seat in slot {order.slot_id}")
 
-    # 5️⃣ Update order status
+    # 4️⃣ Update order status
+    was_active = order.status == OrderStatus.confirmed
     order.status = OrderStatus.cancelled
 
+    # 5️⃣ Promoted student's order goes in the same transaction
+    promoted = None
+    if promotion:
+        promoted = add_promoted_order(db, promotion, order.vendor_id, order.slot_id)
+
     # 6️⃣ Commit transaction
-    db.commit()
-    db.refresh(order)
+    try:
+        with CANCEL_ORDER_STAGES.commit.time():
+            await db.commit()
+    except BaseException:
+        # Put the seat back as it was (on cancellation too)
+        try:
+            await db.rollback()
+        finally:
+            if promotion:
+                await slot_capacity.undo_promotion(order.slot_id, student_phone, promotion)
+            elif released >= 0:
+                await slot_capacity.reserve(db, order.slot_id, student_phone)
+        raise
+
+    with CANCEL_ORDER_STAGES.after_commit.time():
+        # 7️⃣ No longer counts towards vendor load; tell the vendor's feed
+        if was_active:
+            await order_counters.deactivated(order)
+        await publish_order_event("order.cancelled", order)
+
+        # 8️⃣ The promoted order is a new booking: counters, feeds, student push, ETA
+        if promoted:
+            await promotion_placed(promoted)
 
     return order
 
 
 # ======================================================
-# SYNC SLOT RESERVATIONS (INITIALIZE FROM VENDOR SERVICE)
+# WAITLIST PROMOTION
 # ======================================================
-async def sync_slot_reservations(db: Session):
+def add_promoted_order(db: AsyncSession, promotion: Promotion, vendor_id, slot_id) -> Order:
+    """Add the order of a waitlisted student handed a seat (caller commits)"""
+    promoted = Order(
+        id=uuid.uuid4(),
+        student_phone=promotion.student_phone,
+        vendor_id=vendor_id,
+        slot_id=slot_id,
+        status=OrderStatus.confirmed
+    )
+    db.add(promoted)
+    db.add_all([
+        OrderItem(
+            order_id=promoted.id,
+            item_id=UUID(item["item_id"]),
+            quantity=item["quantity"]
+        )
+        for item in promotion.items
+    ])
+    return promoted
+
+
+async def promotion_placed(promoted: Order):
+    """After commit: a promoted order is a new booking (counters, feeds, student push, ETA)"""
+    await order_counters.activated(promoted)
+    await publish_order_event("order.created", promoted)
+    await publish_promotion(promoted)
+    try:
+        await enqueue_eta(promoted)
+    except Exception as e:
+        logger.warning(f"Failed to queue ETA for order {promoted.id}: {e}")
+
+
+async def promote_waitlist(slot_id, seats: int) -> List[Order]:
     """
-    Sync SlotReservation table with slots from Vendor Service.
-    This should be called on startup or periodically.
+    Hand up to `seats` free seats of a slot (e.g. added by the vendor) to
+    the head of its waitlist. Uses its own session; if the orders cannot
+    be stored, seats and waitlist are put back.
     """
-    import httpx
-
-    VENDOR_SERVICE_URL = "http://localhost:8001"
-
-    async with httpx.AsyncClient() as client:
-        # Get all vendors first
-        vendors_response = await client.get(f"{VENDOR_SERVICE_URL}/vendors/")
-        if vendors_response.status_code != 200:
-            raise HTTPException(status_code=500, detail="Failed to fetch vendors")
-
-        vendors = vendors_response.json()
-
-        for vendor in vendors:
-            # Get slots for each vendor
-            slots_response = await client.get(f"{VENDOR_SERVICE_URL}/slots/", headers={"Authorization": f"Bearer {vendor['phone']}"})
-            if slots_response.status_code == 200:
-                slots = slots_response.json()
-                for slot in slots:
-                    # Upsert SlotReservation
-                    reservation = db.query(SlotReservation).filter(SlotReservation.slot_id == slot["id"]).first()
-                    if not reservation:
-                        reservation = SlotReservation(
-                            slot_id=slot["id"],
-                            available_capacity=slot["max_capacity"]
-                        )
-                        db.add(reservation)
-                    else:
-                        # Update capacity if changed
-                        reservation.available_capacity = slot["max_capacity"]
-
-        db.commit()
-
-
-from typing import Optional
+    # 1️⃣ Vendor of the slot (cached, falls back to Vendor Service)
+    vendor_id = UUID(str((await slot_cache.get(slot_id))["vendor_id"]))
+
+    # 2️⃣ Seats to the head of the waitlist, atomically against the live counter
+    promotions = await slot_capacity.promote(slot_id, seats)
+    if not promotions:
+        return []
+
+    # 3️⃣ One order per promoted student, in one transaction
+    try:
+        async with AsyncSessionLocal() as db:
+            promoted = [add_promoted_order(db, promotion, vendor_id, slot_id) for promotion in promotions]
+            await db.commit()
+    except BaseException:
+        await slot_capacity.undo_promotions(slot_id, promotions)
+        raise
+
+    # 4️⃣ After commit: counters, feeds, student pushes, ETA
+    for order in promoted:
+        await promotion_placed(order)
+
+    return promoted
+
+
+async def promote_waitlists(added: Dict) -> int:
+    """Offer seats added to slots (slot -> seats added) to their waitlists; returns orders placed"""
+    placed = 0
+    for slot_id, seats in added.items():
+        if seats <= 0:
+            continue
+        try:
+            placed += len(await promote_waitlist(slot_id, seats))
+        except Exception as e:
+            logger.warning(f"Waitlist promotion for slot {slot_id} failed: {e}")
+    return placed
+
+
+# ======================================================
+# SLOT WAITLIST (STUDENT)
+# ======================================================
+async def join_waitlist(
+    db: AsyncSession,
+    student_phone: str,
+    slot_id,
+    items
+) -> int:
+    """Queue for a full slot; the order is created on the next cancellation"""
+    # 1️⃣ Slot must exist (cached, falls back to Vendor Service)
+    await slot_cache.get(slot_id)
+
+    # 2️⃣ Prevent waiting for a slot already booked
+    existing = await db.scalar(
+        select(Order.id).where(
+            Order.student_phone == student_phone,
+            Order.slot_id == slot_id,
+            Order.status != OrderStatus.cancelled
+        ).limit(1)
+    )
+
+    if existing:
+        raise HTTPException(
+            status_code=409,
+            detail="You have already booked this slot"
+        )
+
+    # 3️⃣ Join atomically against the live counter (cart stored with the entry)
+    position = await slot_capacity.join_waitlist(
+        db,
+        slot_id,
+        student_phone,
+        [{"item_id": str(item.item_id), "quantity": item.quantity} for item in items]
+    )
+
+    if position == ALREADY_HELD:
+        raise HTTPException(
+            status_code=409,
+            detail="You have already booked this slot"
+        )
+
+    if position == HAS_CAPACITY:
+        raise HTTPException(
+            status_code=409,
+            detail="Slot has free seats, book it directly"
+        )
+
+    if position < 0:
+        raise HTTPException(
+            status_code=404,
+            detail="Slot not found"
+        )
+
+    return position + 1
+
+
+async def leave_waitlist(student_phone: str, slot_id):
+    if not await slot_capacity.leave_waitlist(slot_id, student_phone):
+        raise HTTPException(
+            status_code=404,
+            detail="Not on the waitlist for this slot"
+        )
+
+
+async def get_waitlist_position(student_phone: str, slot_id) -> int:
+    position = await slot_capacity.waitlist_position(slot_id, student_phone)
+
+    if position is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Not on the waitlist for this slot"
+        )
+
+    return position + 1
+
+
+from typing import Dict, List, Optional
 from app.db.models import Order
 
 
-def get_vendor_orders(
-    db: Session,
-    vendor_id,
-    status: Optional[OrderStatus] = None
+def _listing_query(
+    owner_filter,
+    status: Optional[OrderStatus] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None
 ):
-    query = db.query(Order).filter(
-        Order.vendor_id == vendor_id
-    )
+    query = select(Order).where(owner_filter)
 
     if status:
-        query = query.filter(Order.status == status)
+        query = query.where(Order.status == status)
+
+    if created_from:
+        query = query.where(Order.created_at >= created_from)
 
-    return query.order_by(Order.created_at.desc()).all()
+    if created_to:
+        query = query.where(Order.created_at < created_to)
 
+    return query
 
-def get_student_orders(
-    db: Session,
+
+def vendor_orders_query(vendor_id, status=None, created_from=None, created_to=None):
+    return _listing_query(Order.vendor_id == vendor_id, status, created_from, created_to)
+
+
+def student_orders_query(student_phone: str, status=None, created_from=None, created_to=None):
+    return _listing_query(Order.student_phone == student_phone, status, created_from, created_to)
+
+
+async def get_vendor_orders(
+    db: AsyncSession,
+    vendor_id,
+    status: Optional[OrderStatus] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE
+):
+    """One newest-first page of a vendor's orders and the next-page cursor"""
+    query = vendor_orders_query(vendor_id, status, created_from, created_to)
+
+    result = await db.scalars(apply_keyset(query, Order, cursor, limit))
+    return split_page(result.all(), limit)
+
+
+async def get_student_orders(
+    db: AsyncSession,
     student_phone: str,
-    status: Optional[OrderStatus] = None
+    status: Optional[OrderStatus] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE
 ):
-    query = db.query(Order).filter(
-        Order.student_phone == student_phone
-    )
+    """
+    One newest-first page of a student's orders (items included) and the
+    next-page cursor. Two queries regardless of page size: the orders,
+    then every item of the page via selectinload.
+    """
+    query = student_orders_query(student_phone, status, created_from, created_to)
+    query = query.options(selectinload(Order.items))
 
-    if status:
-        query = query.filter(Order.status == status)
+    result = await db.scalars(apply_keyset(query, Order, cursor, limit))
+    return split_page(result.all(), limit)
+
+
+def admin_orders_query(vendor_id=None, status=None, created_from=None, created_to=None):
+    owner_filter = Order.vendor_id == vendor_id if vendor_id else true()
+    return _listing_query(owner_filter, status, created_from, created_to)
+
+
+async def get_all_orders(
+    db: AsyncSession,
+    vendor_id=None,
+    status: Optional[OrderStatus] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE
+):
+    """One newest-first page of orders across vendors (admin) and the next-page cursor"""
+    query = admin_orders_query(vendor_id, status, created_from, created_to)
+
+    result = await db.scalars(apply_keyset(query, Order, cursor, limit))
+    return split_page(result.all(), limit)
+
+
+async def count_orders(
+    db: AsyncSession,
+    vendor_id=None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None
+) -> Dict[str, int]:
+    """Orders per status in one GROUP BY (per vendor it stays on the vendor/status index)"""
+    query = select(Order.status, func.count()).group_by(Order.status)
+
+    if vendor_id:
+        query = query.where(Order.vendor_id == vendor_id)
+
+    if created_from:
+        query = query.where(Order.created_at >= created_from)
+
+    if created_to:
+        query = query.where(Order.created_at < created_to)
+
+    counts = {status.value: 0 for status in OrderStatus}
+    for status, count in (await db.execute(query)).all():
+        counts[status.value] = count
+    return counts
 
-    return query.order_by(Order.created_at.desc()).all()
 
+async def get_orders_by_ids(db: AsyncSession, order_ids: List[UUID]):
+    """Orders with the given ids in one query (unknown ids are left out)"""
+    if not order_ids:
+        return []
 
-def complete_order(
-    db,
+    result = await db.scalars(select(Order).where(Order.id.in_(set(order_ids))))
+    return result.all()
+
+
+async def stream_orders(query):
+    """
+    Yield every order matching a listing query, newest first, without
+    materializing the result (server-side cursor, fetched in chunks).
+    Uses its own session so it can outlive the request dependency.
+    """
+    async with AsyncSessionLocal() as db:
+        result = await db.stream_scalars(
+            query
+            .order_by(Order.created_at.desc(), Order.id.desc())
+            .execution_options(yield_per=STREAM_CHUNK_SIZE)
+        )
+        async for order in result:
+            yield order
+
+
+async def complete_order(
+    db: AsyncSession,
     order_id,
     vendor_id
 ):
     # 1️⃣ Fetch order (vendor ownership enforced)
-    order = db.query(Order).filter(
-        Order.id == order_id,
-        Order.vendor_id == vendor_id
-    ).first()
+    order = await db.scalar(
+        select(Order).where(
+            Order.id == order_id,
+            Order.vendor_id == vendor_id
+        )
+    )
 
     if not order:
         raise HTTPException(
@@ -317,7 +745,31 @@ def complete_order(
     # 3️⃣ Update status
     order.status = OrderStatus.completed
 
-    db.commit()
-    db.refresh(order)
+    await db.commit()
+
+    # 4️⃣ No longer counts towards vendor load; tell the vendor's feed
+    await order_counters.deactivated(order)
+    await publish_order_event("order.completed", order)
+
+    return order
+
+
+async def get_student_order(
+    db: AsyncSession,
+    order_id,
+    student_phone: str
+):
+    order = await db.scalar(
+        select(Order).where(
+            Order.id == order_id,
+            Order.student_phone == student_phone
+        )
+    )
+
+    if not order:
+        raise HTTPException(
+            status_code=404,
+            detail="Order not found"
+        )
 
     return order
@@ -0,0 +1,198 @@
+import asyncio
+import logging
+import os
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import (
+    Order,
+    OrderStatus,
+    OrderDemandHourly,
+    OrderDemandDaily,
+    OrderDemandProfile,
+    RollupWatermark
+)
+from app.db.session import AsyncSessionLocal
+from app.db.upsert import dialect_insert
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_INTERVAL = float(os.getenv("DEMAND_ROLLUP_INTERVAL", "60"))
+ROLLUP_BATCH = int(os.getenv("DEMAND_ROLLUP_BATCH", "5000"))
+# Orders younger than this may belong to transactions that have not
+# committed yet; leave them for the next pass so none is skipped
+ROLLUP_LAG = timedelta(seconds=float(os.getenv("DEMAND_ROLLUP_LAG", "60")))
+
+# Sent to the ETA model while a vendor has no history yet
+DEFAULT_HISTORICAL_AVG = 15.0
+
+WATERMARK_NAME = "order_demand"
+
+# Orders that turned into demand; expired holds and cancellations do not count
+DEMAND_STATUSES = {OrderStatus.confirmed, OrderStatus.completed}
+
+
+def _upsert(db: AsyncSession, model, rows, increments):
+    """INSERT .. ON CONFLICT (pk) DO UPDATE SET col = col + excluded.col"""
+    stmt = dialect_insert(db, model).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[column.name for column in model.__table__.primary_key],
+        set_={
+            column: getattr(model, column) + getattr(stmt.excluded, column)
+            for column in increments
+        }
+    )
+
+
+# ======================================================
+# ROLLUP
+# ======================================================
+async def roll_up(db: AsyncSession) -> int:
+    """
+    Fold one batch of orders newer than the watermark into the hourly,
+    daily and weekday/hour profile tables. Aggregates and watermark move
+    in one transaction, so a crash re-processes nothing twice.
+
+    Only confirmed and completed orders count as demand. The batch stops
+    at the first order that is still a pending hold, so the watermark
+    never passes an order before it is confirmed or expires; days whose
+    orders all fell through still count as trading days.
+    """
+    # Row lock serializes concurrent workers on Postgres
+    watermark = await db.scalar(
+        select(RollupWatermark)
+        .where(RollupWatermark.name == WATERMARK_NAME)
+        .with_for_update()
+    )
+    if not watermark:
+        watermark = RollupWatermark(name=WATERMARK_NAME)
+        db.add(watermark)
+
+    query = select(Order.vendor_id, Order.created_at, Order.id, Order.status).where(
+        Order.created_at < datetime.utcnow() - ROLLUP_LAG
+    )
+    if watermark.last_created_at is not None:
+        query = query.where(
+            tuple_(Order.created_at, Order.id)
+            > tuple_(watermark.last_created_at, watermark.last_order_id)
+        )
+
+    rows = (await db.execute(
+        query.order_by(Order.created_at, Order.id).limit(ROLLUP_BATCH)
+    )).all()
+
+    # Up to the first hold still waiting for confirmation or expiry
+    for index, (_, _, _, status) in enumerate(rows):
+        if status == OrderStatus.pending:
+            rows = rows[:index]
+            break
+
+    if not rows:
+        await db.rollback()
+        return 0
+
+    hourly = Counter()
+    daily = Counter()
+    for vendor_id, created_at, _, status in rows:
+        daily[(vendor_id, created_at.date())] += 0
+        if status in DEMAND_STATUSES:
+            hourly[(vendor_id, created_at.replace(minute=0, second=0, microsecond=0))] += 1
+            daily[(vendor_id, created_at.date())] += 1
+
+    # Days seen for the first time add a trading day to all 24 hours of that weekday
+    vendor_ids = {vendor_id for vendor_id, _ in daily}
+    known_days = set((await db.execute(
+        select(OrderDemandDaily.vendor_id, OrderDemandDaily.day).where(
+            OrderDemandDaily.vendor_id.in_(vendor_ids),
+            OrderDemandDaily.day.in_({day for _, day in daily})
+        )
+    )).all())
+    new_days = [key for key in daily if key not in known_days]
+
+    if hourly:
+        await db.execute(_upsert(db, OrderDemandHourly, [
+            {"vendor_id": vendor_id, "bucket_start": bucket, "order_count": count}
+            for (vendor_id, bucket), count in hourly.items()
+        ], ["order_count"]))
+
+    await db.execute(_upsert(db, OrderDemandDaily, [
+        {"vendor_id": vendor_id, "day": day, "order_count": count}
+        for (vendor_id, day), count in daily.items()
+    ], ["order_count"]))
+
+    if new_days:
+        await db.execute(_upsert(db, OrderDemandProfile, [
+            {
+                "vendor_id": vendor_id,
+                "weekday": day.weekday(),
+                "hour": hour,
+                "order_total": 0,
+                "days_observed": 1,
+            }
+            for vendor_id, day in new_days
+            for hour in range(24)
+        ], ["days_observed"]))
+
+    profile = Counter()
+    for (vendor_id, bucket), count in hourly.items():
+        profile[(vendor_id, bucket.weekday(), bucket.hour)] += count
+
+    if profile:
+        await db.execute(_upsert(db, OrderDemandProfile, [
+            {
+                "vendor_id": vendor_id,
+                "weekday": weekday,
+                "hour": hour,
+                "order_total": count,
+                "days_observed": 0,
+            }
+            for (vendor_id, weekday, hour), count in profile.items()
+        ], ["order_total"]))
+
+    _, watermark.last_created_at, watermark.last_order_id, _ = rows[-1]
+    await db.commit()
+
+    return len(rows)
+
+
+# ======================================================
+# READS
+# ======================================================
+async def historical_demand(
+    db: AsyncSession,
+    vendor_id,
+    at: Optional[datetime] = None
+) -> Tuple[float, int]:
+    """
+    Average orders a vendor takes in this weekday / hour, and the number
+    of trading days behind it (one primary-key lookup).
+    """
+    at = at or datetime.utcnow()
+    profile = await db.get(OrderDemandProfile, (vendor_id, at.weekday(), at.hour))
+
+    if not profile or not profile.days_observed:
+        return DEFAULT_HISTORICAL_AVG, 0
+
+    return profile.order_total / profile.days_observed, profile.days_observed
+
+
+# ======================================================
+# BACKGROUND WORKER
+# ======================================================
+async def run_demand_rollup():
+    """Periodically fold new orders into the demand rollups"""
+    while True:
+        try:
+            # Keep going while full batches come back (catch-up after downtime)
+            while True:
+                async with AsyncSessionLocal() as db:
+                    if await roll_up(db) < ROLLUP_BATCH:
+                        break
+        except Exception as e:
+            logger.warning(f"Demand rollup failed: {e}")
+
+        await asyncio.sleep(ROLLUP_INTERVAL)
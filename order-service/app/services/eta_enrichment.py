@@ -0,0 +1,236 @@
+import asyncio
+import datetime
+import json
+import logging
+import os
+import socket
+from collections import defaultdict
+from typing import Dict, List, Tuple
+from uuid import UUID
+
+from redis.exceptions import ResponseError
+from sqlalchemy import update
+
+from app.db.models import Order
+from app.db.session import AsyncSessionLocal
+from app.services.order_counters import order_counters
+from app.services.demand_rollup import historical_demand
+from app.utils.ai_client import ai_client, ETAPredictionRequest
+from app.utils.redis_client import decode_stream_entries, redis_client
+
+logger = logging.getLogger(__name__)
+
+ETA_STREAM = "eta:stream"
+ETA_GROUP = os.getenv("ETA_GROUP", "order-service")
+ETA_CONSUMER = f"{socket.gethostname()}-{os.getpid()}"
+ETA_BATCH_SIZE = int(os.getenv("ETA_BATCH_SIZE", "200"))
+ETA_POLL_INTERVAL = float(os.getenv("ETA_POLL_INTERVAL", "0.5"))
+# Entries unacknowledged this long (crashed worker, failed prediction) are re-claimed
+ETA_CLAIM_IDLE_MS = int(os.getenv("ETA_CLAIM_IDLE_MS", "10000"))
+ETA_MAX_ATTEMPTS = int(os.getenv("ETA_MAX_ATTEMPTS", "3"))
+
+
+def student_channel(student_phone: str) -> str:
+    """Pub/sub channel for pushes to one student"""
+    return f"student_orders:{student_phone}"
+
+
+# ======================================================
+# HELPER FUNCTIONS
+# ======================================================
+def _get_time_of_day() -> str:
+    """Get current time of day category"""
+    hour = datetime.datetime.utcnow().hour
+    if 6 <= hour < 12:
+        return "morning"
+    elif 12 <= hour < 17:
+        return "afternoon"
+    else:
+        return "evening"
+
+def _get_day_of_week() -> str:
+    """Get current day of week"""
+    return datetime.datetime.utcnow().strftime("%A").lower()
+
+
+# ======================================================
+# QUEUE
+# ======================================================
+async def enqueue_eta(order: Order):
+    """Schedule a committed order for ETA enrichment"""
+    await redis_client.async_client.xadd(ETA_STREAM, {
+        "order_id": str(order.id),
+        "vendor_id": str(order.vendor_id),
+        "slot_id": str(order.slot_id),
+        "student_phone": order.student_phone,
+    })
+
+
+async def _ensure_group():
+    try:
+        await redis_client.async_client.xgroup_create(ETA_STREAM, ETA_GROUP, id="0", mkstream=True)
+    except ResponseError as e:
+        if "BUSYGROUP" not in str(e):
+            raise
+
+
+async def _read_batch() -> List[Tuple[str, Dict]]:
+    """
+    New entries for this worker. They stay in the group's pending list
+    until acknowledged, so a worker that dies mid-batch loses nothing:
+    another one re-claims them once idle.
+    """
+    response = await redis_client.async_client.xreadgroup(
+        ETA_GROUP, ETA_CONSUMER, {ETA_STREAM: ">"}, count=ETA_BATCH_SIZE
+    )
+    return [entry for _, entries in response or [] for entry in decode_stream_entries(entries)]
+
+
+async def _claim_stale() -> List[Tuple[str, Dict]]:
+    """Take over entries left unacknowledged too long; drop them after ETA_MAX_ATTEMPTS"""
+    r = redis_client.async_client
+
+    stale = await r.xpending_range(
+        ETA_STREAM, ETA_GROUP, "-", "+", ETA_BATCH_SIZE, idle=ETA_CLAIM_IDLE_MS
+    )
+    exhausted = [p["message_id"] for p in stale if p["times_delivered"] >= ETA_MAX_ATTEMPTS]
+    if exhausted:
+        logger.warning(f"Giving up ETA enrichment after {ETA_MAX_ATTEMPTS} attempts: {exhausted}")
+        await _ack(exhausted)
+
+    retry = [p["message_id"] for p in stale if p["times_delivered"] < ETA_MAX_ATTEMPTS]
+    if not retry:
+        return []
+
+    claimed = await r.xclaim(ETA_STREAM, ETA_GROUP, ETA_CONSUMER, ETA_CLAIM_IDLE_MS, retry)
+    return decode_stream_entries(claimed)
+
+
+async def _ack(entry_ids: List[str]):
+    """Acknowledge and delete handled entries (nothing else reads them)"""
+    if not entry_ids:
+        return
+    pipe = redis_client.async_client.pipeline(transaction=True)
+    pipe.xack(ETA_STREAM, ETA_GROUP, *entry_ids)
+    pipe.xdel(ETA_STREAM, *entry_ids)
+    await pipe.execute()
+
+
+# ======================================================
+# ENRICHMENT
+# ======================================================
+async def enrich_batch(entries: List[Tuple[str, Dict]]) -> int:
+    """
+    Predict and store ETAs for a batch of stream entries.
+
+    Orders are grouped per vendor (one counter read and one rollup lookup
+    each) and per slot
+    (one AI call each, since every order in a slot shares its features),
+    then written back with a single bulk UPDATE. Entries are acknowledged
+    only after that commit; those whose prediction failed stay pending
+    and are retried once re-claimed.
+    """
+    by_vendor: Dict[str, Dict[str, List[Dict]]] = defaultdict(lambda: defaultdict(list))
+    done = []
+    for entry_id, entry in entries:
+        if not entry:
+            done.append(entry_id)  # deleted while pending
+            continue
+        by_vendor[entry["vendor_id"]][entry["slot_id"]].append({**entry, "entry_id": entry_id})
+
+    time_of_day = _get_time_of_day()
+    day_of_week = _get_day_of_week()
+
+    updates = []
+
+    async with AsyncSessionLocal() as db:
+        for vendor_id, slots in by_vendor.items():
+            # Current load for this vendor (maintained counter, O(1))
+            current_orders = await order_counters.vendor_active(db, UUID(vendor_id))
+
+            # Typical demand at this weekday / hour (demand rollups, O(1))
+            historical_avg, history_days = await historical_demand(db, UUID(vendor_id))
+
+            for slot_id, slot_entries in slots.items():
+                prediction = await ai_client.predict_eta(ETAPredictionRequest(
+                    vendor_id=vendor_id,
+                    slot_id=slot_id,
+                    current_orders=current_orders,
+                    historical_avg_orders=historical_avg,
+                    history_days=history_days,
+                    time_of_day=time_of_day,
+                    day_of_week=day_of_week
+                ))
+
+                if not prediction:
+                    continue
+
+                for entry in slot_entries:
+                    updates.append((entry, prediction))
+
+        if updates:
+            await db.execute(update(Order), [
+                {
+                    "id": UUID(entry["order_id"]),
+                    "estimated_minutes": prediction.get("estimated_minutes"),
+                    "eta_confidence": round(prediction.get("confidence_score", 0) * 100),
+                }
+                for entry, prediction in updates
+            ])
+            await db.commit()
+
+    await _ack(done + [entry["entry_id"] for entry, _ in updates])
+    await _push_etas(updates)
+    return len(updates)
+
+
+async def _push_etas(updates: List[Tuple[Dict, Dict]]):
+    """Notify students whose order just got an ETA"""
+    if not updates:
+        return
+
+    pipe = redis_client.async_client.pipeline(transaction=False)
+    for entry, prediction in updates:
+        pipe.publish(student_channel(entry["student_phone"]), json.dumps({
+            "event": "order.eta",
+            "order_id": entry["order_id"],
+            "estimated_minutes": prediction.get("estimated_minutes"),
+            "eta_confidence": round(prediction.get("confidence_score", 0) * 100),
+        }))
+    await pipe.execute()
+
+
+async def run_eta_enrichment():
+    """
+    Background worker: drain the ETA stream in batches. Every
+    order-service worker joins the same consumer group, so each order is
+    enriched once per deployment.
+    """
+    loop = asyncio.get_running_loop()
+    next_claim = 0.0
+    group_ready = False
+
+    while True:
+        try:
+            if not group_ready:
+                await _ensure_group()
+                group_ready = True
+
+            entries = []
+            if loop.time() >= next_claim:
+                entries = await _claim_stale()
+                next_claim = loop.time() + ETA_CLAIM_IDLE_MS / 1000
+            entries += await _read_batch()
+
+            # Keep draining while batches make progress
+            if entries and await enrich_batch(entries):
+                continue
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Unacked entries stay pending and are re-claimed once idle;
+            # the stream / group may have been deleted, so recreate it
+            logger.warning(f"ETA enrichment failed: {e}")
+            group_ready = False
+
+        await asyncio.sleep(ETA_POLL_INTERVAL)
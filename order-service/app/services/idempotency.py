@@ -0,0 +1,203 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import uuid
+from typing import Any, Awaitable, Callable, Optional
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from redis.exceptions import RedisError
+
+from tnt_common import metrics
+from app.utils.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+# How long a finished result is replayed for a retried key
+IDEMPOTENCY_TTL = int(os.getenv("IDEMPOTENCY_TTL", "86400"))
+# In-flight marker expiry (a crashed worker frees its keys after this);
+# a running request keeps refreshing its marker, however long it takes
+IDEMPOTENCY_LOCK_TTL = int(os.getenv("IDEMPOTENCY_LOCK_TTL", "30"))
+IDEMPOTENCY_HEARTBEAT = IDEMPOTENCY_LOCK_TTL / 3
+# How long a duplicate waits for the in-flight request before giving up
+IDEMPOTENCY_WAIT = float(os.getenv("IDEMPOTENCY_WAIT", "10"))
+IDEMPOTENCY_POLL = float(os.getenv("IDEMPOTENCY_POLL", "0.05"))
+
+MAX_KEY_LENGTH = 255
+
+KEY_CONTENTION = metrics.contention("idempotency_key", "lost_race", "still_in_progress")
+
+# Only the request that set the in-flight marker may extend or drop it
+# KEYS[1] = idempotency key, ARGV[1] = our marker, ARGV[2] = ttl
+REFRESH_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# KEYS[1] = idempotency key, ARGV[1] = our marker
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def fingerprint(*parts: Any) -> str:
+    """Stable hash of what a request asks for (key reuse with another body is rejected)"""
+    return hashlib.sha256(
+        json.dumps(jsonable_encoder(parts), sort_keys=True).encode()
+    ).hexdigest()
+
+
+class IdempotencyStore:
+    """
+    Cached results of write requests, keyed by the client's Idempotency-Key.
+
+    The first request claims the key with an in-flight marker and runs;
+    its result (success or 4xx) is stored with a TTL. Retries replay it
+    with one GET; duplicates that arrive while it runs wait for it
+    instead of booking again. Server errors and 429s release the key
+    so the retry runs for real. The in-flight marker is refreshed while
+    the handler runs, so it cannot expire under a slow first request.
+    """
+
+    def __init__(self):
+        self.redis = redis_client.async_client
+        self._refresh = self.redis.register_script(REFRESH_SCRIPT)
+        self._release_marker = self.redis.register_script(RELEASE_SCRIPT)
+
+    @staticmethod
+    def key(scope: str, principal: str, idempotency_key: str) -> str:
+        return f"idempotency:{scope}:{principal}:{idempotency_key}"
+
+    async def run(
+        self,
+        scope: str,
+        principal: str,
+        idempotency_key: Optional[str],
+        request_hash: str,
+        handler: Callable[[], Awaitable[Any]]
+    ):
+        if idempotency_key is None:
+            return await handler()
+
+        if not idempotency_key or len(idempotency_key) > MAX_KEY_LENGTH:
+            raise HTTPException(
+                status_code=400,
+                detail=f"{IDEMPOTENCY_HEADER} must be 1-{MAX_KEY_LENGTH} characters"
+            )
+
+        key = self.key(scope, principal, idempotency_key)
+        marker = json.dumps({"state": "pending", "fingerprint": request_hash, "owner": uuid.uuid4().hex})
+
+        try:
+            record = await self._claim_or_wait(key, request_hash, marker)
+        except RedisError as e:
+            # Fail open: without Redis the request runs unprotected
+            logger.warning(f"Idempotency store unavailable: {e}")
+            return await handler()
+
+        if record is not None:
+            return self._replay(record)
+
+        return await self._execute(key, request_hash, marker, handler)
+
+    async def _claim_or_wait(self, key: str, request_hash: str, marker: str) -> Optional[dict]:
+        """None once this request owns the key, else the finished record"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + IDEMPOTENCY_WAIT
+
+        while True:
+            raw = await self.redis.get(key)
+
+            if raw is None:
+                if await self.redis.set(key, marker, nx=True, ex=IDEMPOTENCY_LOCK_TTL):
+                    return None
+                KEY_CONTENTION.lost_race.inc()
+                continue  # lost the race: read the winner's marker
+
+            record = json.loads(raw)
+
+            if record["fingerprint"] != request_hash:
+                raise HTTPException(
+                    status_code=422,
+                    detail=f"{IDEMPOTENCY_HEADER} was already used for a different request"
+                )
+
+            if record["state"] == "done":
+                return record
+
+            if loop.time() >= deadline:
+                KEY_CONTENTION.still_in_progress.inc()
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"A request with this {IDEMPOTENCY_HEADER} is still in progress"
+                )
+
+            await asyncio.sleep(IDEMPOTENCY_POLL)
+
+    async def _execute(self, key: str, request_hash: str, marker: str, handler):
+        heartbeat = asyncio.create_task(self._heartbeat(key, marker))
+        try:
+            status_code, body = 200, jsonable_encoder(await handler())
+        except HTTPException as e:
+            # Server errors and 429 (busy, retry later) are not the answer to keep
+            if e.status_code >= 500 or e.status_code == 429:
+                await self._release(key, marker)
+                raise
+            status_code, body = e.status_code, {"detail": e.detail}
+        except BaseException:
+            # Failed or cancelled: the retry runs for real
+            await self._release(key, marker)
+            raise
+        finally:
+            heartbeat.cancel()
+
+        try:
+            await self.redis.set(key, json.dumps({
+                "state": "done",
+                "fingerprint": request_hash,
+                "status_code": status_code,
+                "body": body,
+            }), ex=IDEMPOTENCY_TTL)
+        except RedisError as e:
+            logger.warning(f"Failed to store idempotent result: {e}")
+
+        return JSONResponse(body, status_code=status_code)
+
+    async def _heartbeat(self, key: str, marker: str):
+        """Keep our in-flight marker alive until the handler finishes"""
+        while True:
+            await asyncio.sleep(IDEMPOTENCY_HEARTBEAT)
+            try:
+                if not await self._refresh(keys=[key], args=[marker, IDEMPOTENCY_LOCK_TTL]):
+                    return  # released, or already replaced
+            except RedisError as e:
+                logger.warning(f"Failed to refresh idempotency key: {e}")
+
+    async def _release(self, key: str, marker: str):
+        try:
+            await self._release_marker(keys=[key], args=[marker])
+        except RedisError as e:
+            logger.warning(f"Failed to release idempotency key: {e}")
+
+    @staticmethod
+    def _replay(record: dict) -> JSONResponse:
+        return JSONResponse(
+            record["body"],
+            status_code=record["status_code"],
+            headers={REPLAYED_HEADER: "true"}
+        )
+
+
+# Global store instance
+idempotency = IdempotencyStore()
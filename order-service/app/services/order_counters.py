@@ -0,0 +1,186 @@
+import asyncio
+import logging
+import os
+from typing import Iterable
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from tnt_common import metrics
+from app.db.models import Order, OrderStatus
+from app.db.session import AsyncSessionLocal
+from app.utils.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+COUNTER_RECONCILE_INTERVAL = float(os.getenv("ORDER_COUNTER_RECONCILE_INTERVAL", "300"))
+# Counters compared-and-set per script call
+COUNTER_RECONCILE_BATCH = int(os.getenv("ORDER_COUNTER_RECONCILE_BATCH", "500"))
+
+RECONCILE_LOCK_KEY = "order_counters:reconcile"
+RECONCILE_LOCK_CONTENTION = metrics.contention("order_counters_reconcile_lock", "held_elsewhere")
+
+# An order is "active" (counts towards vendor load) while confirmed
+ACTIVE_STATUS = OrderStatus.confirmed
+
+# Only adjust counters that exist: a missing one is rebuilt from the
+# table on its next read, so incrementing it from nothing would be wrong
+# KEYS[1] = counter, ARGV[1] = delta
+INCR_IF_EXISTS_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return redis.call('INCRBY', KEYS[1], ARGV[1])
+end
+return nil
+"""
+
+# Overwrite counters with their table counts, each only if it still holds
+# the value read before the count (an INCR / DECR landing in between
+# would otherwise be lost; such counters wait for the next pass)
+# KEYS = counters, ARGV = (value read, '' if missing; count) per counter
+# Returns the number of counters written
+COMPARE_AND_SET_SCRIPT = """
+local written = 0
+for i, key in ipairs(KEYS) do
+    if (redis.call('GET', key) or '') == ARGV[2 * i - 1] then
+        redis.call('SET', key, ARGV[2 * i])
+        written = written + 1
+    end
+end
+return written
+"""
+
+
+class OrderCounters:
+    """
+    Active-order counts per vendor, kept in Redis (a slot's load is its
+    live capacity counter, see slot_capacity.py).
+
+    Updated incrementally after every commit that confirms, cancels or
+    completes an order, so reading the load signal is a single GET.
+    A missing counter (or Redis outage) falls back to a COUNT on
+    `orders`; a periodic reconciliation pass overwrites any drift.
+    """
+
+    def __init__(self):
+        # Event-loop client: writes run after commit on the request path
+        self.redis = redis_client.async_client
+        self._incr_if_exists = self.redis.register_script(INCR_IF_EXISTS_SCRIPT)
+        self._compare_and_set = self.redis.register_script(COMPARE_AND_SET_SCRIPT)
+
+    @staticmethod
+    def vendor_key(vendor_id) -> str:
+        return f"vendor_active:{vendor_id}"
+
+    # --------------------------------------------------
+    # WRITES (after commit, fail-soft)
+    # --------------------------------------------------
+    async def _apply(self, vendor_ids: Iterable, delta: int):
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for vendor_id in vendor_ids:
+                await self._incr_if_exists(keys=[self.vendor_key(vendor_id)], args=[delta], client=pipe)
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Order counter update failed (reconciliation will fix it): {e}")
+
+    async def activated(self, *orders: Order):
+        await self._apply([order.vendor_id for order in orders], 1)
+
+    async def deactivated(self, *orders: Order):
+        await self._apply([order.vendor_id for order in orders], -1)
+
+    # --------------------------------------------------
+    # READS
+    # --------------------------------------------------
+    async def _read(self, db: AsyncSession, key: str, vendor_id) -> int:
+        try:
+            cached = await self.redis.get(key)
+            if cached is not None:
+                return int(cached)
+        except Exception as e:
+            logger.warning(f"Order counter read failed, counting in the database: {e}")
+            return await self._count(db, vendor_id)
+
+        count = await self._count(db, vendor_id)
+        try:
+            # NX: never clobber a counter that an increment just created
+            await self.redis.set(key, count, nx=True)
+        except Exception:
+            pass
+        return count
+
+    @staticmethod
+    async def _count(db: AsyncSession, vendor_id) -> int:
+        return await db.scalar(
+            select(func.count()).select_from(Order).where(
+                Order.vendor_id == vendor_id,
+                Order.status == ACTIVE_STATUS
+            )
+        )
+
+    async def vendor_active(self, db: AsyncSession, vendor_id) -> int:
+        """Active orders for a vendor (O(1) on a warm counter)"""
+        return await self._read(db, self.vendor_key(vendor_id), vendor_id)
+
+    # --------------------------------------------------
+    # RECONCILIATION
+    # --------------------------------------------------
+    async def reconcile(self, db: AsyncSession) -> int:
+        """
+        Correct every counter to the table's count (one GROUP BY);
+        counters for vendors with no active orders are reset to 0.
+
+        Counters are read before the count and compared-and-set after it
+        (COMPARE_AND_SET_SCRIPT), so one that moved meanwhile keeps its
+        increments and is corrected on the next pass. Returns the
+        counters written.
+        """
+        # 1️⃣ Current values first, so any change from here on is detected
+        keys = [
+            key.decode() if isinstance(key, bytes) else key
+            async for key in self.redis.scan_iter(match=self.vendor_key("*"), count=1000)
+        ]
+        seen = dict(zip(keys, await self.redis.mget(keys))) if keys else {}
+
+        # 2️⃣ Table counts
+        result = await db.execute(
+            select(Order.vendor_id, func.count())
+            .where(Order.status == ACTIVE_STATUS)
+            .group_by(Order.vendor_id)
+        )
+        counts = {self.vendor_key(vendor_id): count for vendor_id, count in result}
+
+        # 3️⃣ Compare-and-set, in batches
+        targets = list(set(seen) | set(counts))
+        written = 0
+        for start in range(0, len(targets), COUNTER_RECONCILE_BATCH):
+            batch = targets[start:start + COUNTER_RECONCILE_BATCH]
+            args = []
+            for key in batch:
+                args += [seen.get(key) or "", counts.get(key, 0)]
+            written += await self._compare_and_set(keys=batch, args=args)
+
+        return written
+
+
+# Global counters instance
+order_counters = OrderCounters()
+
+
+# ======================================================
+# BACKGROUND WORKER
+# ======================================================
+async def run_counter_reconciliation():
+    """Periodically correct counter drift (one worker per interval)"""
+    while True:
+        try:
+            # The lock is left to expire: at most one pass per interval across workers
+            if await order_counters.redis.set(RECONCILE_LOCK_KEY, "locked", ex=int(COUNTER_RECONCILE_INTERVAL), nx=True):
+                async with AsyncSessionLocal() as db:
+                    await order_counters.reconcile(db)
+            else:
+                RECONCILE_LOCK_CONTENTION.held_elsewhere.inc()
+        except Exception as e:
+            logger.warning(f"Order counter reconciliation failed: {e}")
+
+        await asyncio.sleep(COUNTER_RECONCILE_INTERVAL)
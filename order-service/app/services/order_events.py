@@ -0,0 +1,153 @@
+import asyncio
+import json
+import logging
+import os
+from collections import defaultdict
+from typing import Dict, Optional, Set
+
+from app.db.models import Order
+from app.schemas.order import OrderSummary
+from app.services.eta_enrichment import student_channel
+from app.utils.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+VENDOR_CHANNEL_PREFIX = "vendor_orders:"
+VENDOR_FEED_QUEUE_SIZE = int(os.getenv("VENDOR_FEED_QUEUE_SIZE", "100"))
+
+
+def vendor_channel(vendor_id) -> str:
+    """Pub/sub channel for order events of one vendor"""
+    return f"{VENDOR_CHANNEL_PREFIX}{vendor_id}"
+
+
+# ======================================================
+# PUBLISH (any worker)
+# ======================================================
+async def publish_order_event(event: str, *orders: Order):
+    """
+    Announce committed order changes to the vendors' live feeds. Never
+    fails the request: dashboards fall back to GET /orders/vendor.
+    """
+    try:
+        pipe = redis_client.async_client.pipeline(transaction=False)
+        for order in orders:
+            pipe.publish(vendor_channel(order.vendor_id), json.dumps({
+                "event": event,
+                "order": OrderSummary.model_validate(order).model_dump(mode="json"),
+            }))
+        await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Failed to publish {event} event: {e}")
+
+
+async def publish_promotion(order: Order):
+    """Tell a waitlisted student their order was created from a cancellation"""
+    try:
+        await redis_client.async_client.publish(student_channel(order.student_phone), json.dumps({
+            "event": "waitlist.promoted",
+            "order": OrderSummary.model_validate(order).model_dump(mode="json"),
+        }))
+    except Exception as e:
+        logger.warning(f"Failed to publish promotion of order {order.id}: {e}")
+
+
+# ======================================================
+# FAN-OUT (per process)
+# ======================================================
+class VendorFeedHub:
+    """
+    Fans vendor order events out to the SSE connections of this process.
+
+    The process holds a single Redis pattern subscription; each open
+    connection costs one bounded queue, so thousands of idle dashboards
+    need no extra Redis connections or polling.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = defaultdict(set)
+
+    def subscribe(self, vendor_id) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=VENDOR_FEED_QUEUE_SIZE)
+        self._subscribers[str(vendor_id)].add(queue)
+        return queue
+
+    def unsubscribe(self, vendor_id, queue: asyncio.Queue):
+        key = str(vendor_id)
+        queues = self._subscribers.get(key)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[key]
+
+    def has_subscribers(self, vendor_id: str) -> bool:
+        return vendor_id in self._subscribers
+
+    def dispatch(self, vendor_id: str, frame: Optional[str]):
+        """Queue a pre-rendered SSE frame for every connection of a vendor"""
+        for queue in list(self._subscribers.get(vendor_id, ())):
+            try:
+                queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                # Client is not reading: end its stream instead of buffering
+                # without bound (it reconnects and re-lists)
+                self.unsubscribe(vendor_id, queue)
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+
+    def close_all(self):
+        for vendor_id in list(self._subscribers):
+            for queue in list(self._subscribers[vendor_id]):
+                self.unsubscribe(vendor_id, queue)
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "vendors": len(self._subscribers),
+            "connections": sum(len(queues) for queues in self._subscribers.values()),
+        }
+
+
+# Global per-process hub
+vendor_feed = VendorFeedHub()
+
+
+def sse_frame(message: str) -> str:
+    """Render one published event as an SSE frame (once, for all subscribers)"""
+    event = json.loads(message)
+    return f"event: {event['event']}\ndata: {json.dumps(event['order'])}\n\n"
+
+
+# ======================================================
+# REDIS LISTENER
+# ======================================================
+async def run_vendor_feed():
+    """Relay vendor_orders:* messages to this process's connections"""
+    try:
+        while True:
+            pubsub = redis_client.async_client.pubsub()
+            try:
+                await pubsub.psubscribe(f"{VENDOR_CHANNEL_PREFIX}*")
+                async for message in pubsub.listen():
+                    if message["type"] != "pmessage":
+                        continue
+                    channel = message["channel"]
+                    if isinstance(channel, bytes):
+                        channel = channel.decode()
+                    vendor_id = channel[len(VENDOR_CHANNEL_PREFIX):]
+                    if vendor_feed.has_subscribers(vendor_id):
+                        vendor_feed.dispatch(vendor_id, sse_frame(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Vendor feed listener failed: {e}")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+    finally:
+        # Shutdown: end every open stream
+        vendor_feed.close_all()
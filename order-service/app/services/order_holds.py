@@ -0,0 +1,112 @@
+import asyncio
+import logging
+import os
+from datetime import datetime
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import Order, OrderStatus
+from app.db.session import AsyncSessionLocal
+from app.services.booking import add_promoted_order, promotion_placed
+from app.services.slot_capacity import slot_capacity, NOT_LOADED
+
+logger = logging.getLogger(__name__)
+
+HOLD_SWEEP_INTERVAL = float(os.getenv("ORDER_HOLD_SWEEP_INTERVAL", "5"))
+# Expired holds released per UPDATE
+HOLD_SWEEP_BATCH = int(os.getenv("ORDER_HOLD_SWEEP_BATCH", "1000"))
+
+
+async def release_expired_holds(db: AsyncSession, limit: int = HOLD_SWEEP_BATCH) -> int:
+    """
+    Cancel up to `limit` pending holds past their expiry in one UPDATE
+    and hand their seats to the slots' waitlists (else back to the
+    slots), as a cancellation does. Rows another worker is sweeping are
+    skipped, and a confirmation racing the sweep wins or loses on the
+    same row, so each hold is released exactly once.
+    """
+    # 1️⃣ One set-based UPDATE .. RETURNING over the pending-expiry index
+    due = (
+        select(Order.id)
+        .where(
+            Order.status == OrderStatus.pending,
+            Order.hold_expires_at <= datetime.utcnow()
+        )
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+
+    expired = (await db.execute(
+        update(Order)
+        .where(Order.id.in_(due), Order.status == OrderStatus.pending)
+        .values(status=OrderStatus.cancelled, hold_expires_at=None)
+        .returning(Order.slot_id, Order.student_phone, Order.vendor_id)
+        .execution_options(synchronize_session=False)
+    )).all()
+
+    if not expired:
+        await db.rollback()
+        return 0
+
+    # 2️⃣ Each seat to the head of its slot's waitlist, else back to the live
+    #    counter, one pipelined script call per hold (a holder already gone
+    #    means the seat was given back before)
+    pairs = [(slot_id, student_phone) for slot_id, student_phone, _ in expired]
+    results = await slot_capacity.release_or_promote_pairs(pairs)
+
+    # 3️⃣ Slots without a live counter: seed it from the committed table (where
+    #    these holds still count) and release through Redis, so a concurrent
+    #    load() can neither miss nor double-count them
+    unloaded = [i for i, (released, _) in enumerate(results) if released == NOT_LOADED]
+    if unloaded:
+        async with AsyncSessionLocal() as committed:
+            for slot_id in {pairs[i][0] for i in unloaded}:
+                await slot_capacity.load(committed, slot_id)
+        for i, result in zip(unloaded, await slot_capacity.release_or_promote_pairs([pairs[i] for i in unloaded])):
+            results[i] = result
+
+    # 4️⃣ Promoted students' orders go in the same transaction
+    promoted = [
+        (slot_id, student_phone, promotion, add_promoted_order(db, promotion, vendor_id, slot_id))
+        for (slot_id, student_phone, vendor_id), (_, promotion) in zip(expired, results)
+        if promotion
+    ]
+
+    try:
+        await db.commit()
+    except BaseException:
+        # Put the seats back as they were (on cancellation too)
+        try:
+            await db.rollback()
+        finally:
+            for slot_id, student_phone, promotion, _ in promoted:
+                await slot_capacity.undo_promotion(slot_id, student_phone, promotion)
+            for (slot_id, student_phone), (released, promotion) in zip(pairs, results):
+                if not promotion and released >= 0:
+                    await slot_capacity.reserve(db, slot_id, student_phone)
+        raise
+
+    # 5️⃣ Promoted orders are new bookings: counters, feeds, student pushes, ETA
+    for _, _, _, order in promoted:
+        await promotion_placed(order)
+
+    return len(expired)
+
+
+async def _sweep_once() -> int:
+    async with AsyncSessionLocal() as db:
+        return await release_expired_holds(db)
+
+
+async def run_hold_expiry():
+    """Release expired holds until cancelled"""
+    while True:
+        try:
+            # Keep sweeping while there is a backlog
+            while await _sweep_once() >= HOLD_SWEEP_BATCH:
+                pass
+        except Exception as e:
+            logger.warning(f"Hold expiry sweep failed: {e}")
+
+        await asyncio.sleep(HOLD_SWEEP_INTERVAL)
@@ -0,0 +1,71 @@
+import logging
+from typing import List, Optional, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import SlotReservation
+from app.schemas.reservation import ReservationResponse
+from app.services.slot_capacity import slot_capacity
+from app.utils.pagination import DEFAULT_PAGE_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+async def _live(reservations) -> List[ReservationResponse]:
+    """
+    Reservations with the live Redis counter where a slot has one (the
+    table trails it by the write-behind interval). One MGET per page.
+    """
+    rows = [ReservationResponse.model_validate(r) for r in reservations]
+    if not rows:
+        return rows
+
+    try:
+        counters = await slot_capacity.available_many([r.slot_id for r in rows])
+    except Exception as e:
+        logger.warning(f"Live slot counters unavailable: {e}")
+        return rows
+
+    for row, counter in zip(rows, counters):
+        if counter is not None:
+            row.available_capacity = counter
+    return rows
+
+
+async def list_reservations(
+    db: AsyncSession,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE
+) -> Tuple[List[ReservationResponse], Optional[str]]:
+    """One page of reservations in slot_id order (keyset on the primary key)"""
+    query = select(SlotReservation).order_by(SlotReservation.slot_id).limit(limit + 1)
+
+    if cursor:
+        try:
+            after = UUID(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.where(SlotReservation.slot_id > after)
+
+    reservations = (await db.scalars(query)).all()
+
+    next_cursor = None
+    if len(reservations) > limit:
+        reservations = reservations[:limit]
+        next_cursor = str(reservations[-1].slot_id)
+
+    return await _live(reservations), next_cursor
+
+
+async def lookup_reservations(db: AsyncSession, slot_ids: List[UUID]) -> List[ReservationResponse]:
+    """Reservations of the given slots in one query (unknown slots are left out)"""
+    if not slot_ids:
+        return []
+
+    reservations = await db.scalars(
+        select(SlotReservation).where(SlotReservation.slot_id.in_(set(slot_ids)))
+    )
+    return await _live(reservations.all())
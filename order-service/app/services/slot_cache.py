@@ -0,0 +1,170 @@
+import asyncio
+import json
+import logging
+import os
+from typing import Any, Dict
+
+from redis.exceptions import RedisError
+
+from app.utils.redis_client import redis_client
+from tnt_common.ttl_cache import TTLCache
+from app.utils.vendor_client import get_slot_by_id
+
+logger = logging.getLogger(__name__)
+
+SLOT_CACHE_SIZE = int(os.getenv("SLOT_CACHE_SIZE", "1024"))
+SLOT_CACHE_TTL = float(os.getenv("SLOT_CACHE_TTL", "30"))
+SLOT_CACHE_REDIS_TTL = int(os.getenv("SLOT_CACHE_REDIS_TTL", "300"))
+# Outlives any in-flight fetch that compares against it
+SLOT_META_VERSION_TTL = 3600
+
+# Shared with vendor-service (events.py)
+SLOT_EVENTS_CHANNEL = "slot_events"
+
+# Write the fetched copy only if no invalidation bumped the version since
+# it was read (a missing version counts as 0)
+# KEYS[1] = slot metadata, KEYS[2] = its version
+# ARGV[1] = version read before the fetch, ARGV[2] = metadata, ARGV[3] = ttl
+STORE_IF_CURRENT_SCRIPT = """
+if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+
+class SlotCache:
+    """
+    Two-tier slot metadata cache: in-process LRU with TTL in front of a
+    shared Redis copy, in front of vendor-service.
+
+    Entries are dropped when vendor-service announces a slot change on
+    the `slot_events` channel; the TTLs bound staleness if an event is lost.
+    Each invalidation also bumps the slot's version key, and a fetch that
+    overlapped one does not write its (possibly stale) copy back. Redis
+    failures fall through to vendor-service.
+    """
+
+    def __init__(self):
+        self.redis = redis_client.async_client
+        self._store_if_current = self.redis.register_script(STORE_IF_CURRENT_SCRIPT)
+        self.local = TTLCache(SLOT_CACHE_SIZE, SLOT_CACHE_TTL)
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    @staticmethod
+    def redis_key(slot_id) -> str:
+        return f"slot_meta:{slot_id}"
+
+    @staticmethod
+    def version_key(slot_id) -> str:
+        return f"slot_meta_version:{slot_id}"
+
+    async def get(self, slot_id) -> Dict[str, Any]:
+        """Return slot metadata, going to vendor-service only on a full miss"""
+        key = str(slot_id)
+
+        slot = self.local.get(key)
+        if slot is not None:
+            self.local_hits += 1
+            return slot
+
+        try:
+            cached, version = await self.redis.mget(self.redis_key(key), self.version_key(key))
+        except RedisError as e:
+            logger.warning(f"Slot cache Redis tier unavailable: {e}")
+            cached, version = None, None
+
+        if cached is not None:
+            self.redis_hits += 1
+            slot = json.loads(cached)
+            self.local.set(key, slot)
+            return slot
+
+        # Single-flight: concurrent misses for one slot share one upstream call
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            return await asyncio.shield(pending)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            slot = await get_slot_by_id(slot_id)
+            if await self._store(key, slot, version):
+                self.local.set(key, slot)
+            future.set_result(slot)
+            return slot
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody else is waiting
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def _store(self, key: str, slot: Dict[str, Any], version) -> bool:
+        """Share a fetched slot unless it was invalidated meanwhile; False if so"""
+        try:
+            return bool(await self._store_if_current(
+                keys=[self.redis_key(key), self.version_key(key)],
+                args=[version or 0, json.dumps(slot), SLOT_CACHE_REDIS_TTL]
+            ))
+        except RedisError as e:
+            logger.warning(f"Slot cache Redis tier unavailable: {e}")
+            return True
+
+    async def invalidate(self, slot_id):
+        """Drop a slot from both tiers (same steps as vendor-service's publish_slot_event)"""
+        key = str(slot_id)
+        self.local.delete(key)
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.incr(self.version_key(key))
+        pipe.expire(self.version_key(key), SLOT_META_VERSION_TTL)
+        pipe.delete(self.redis_key(key))
+        await pipe.execute()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.local_hits + self.redis_hits + self.coalesced + self.misses
+        return {
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "coalesced": self.coalesced,
+            "misses": self.misses,
+            "hit_rate": round((lookups - self.misses) / lookups, 4) if lookups else 0.0,
+            "saved_round_trips": lookups - self.misses,
+            "local_entries": len(self.local),
+        }
+
+
+# Global slot cache instance
+slot_cache = SlotCache()
+
+
+# ======================================================
+# INVALIDATION LISTENER
+# ======================================================
+async def run_slot_invalidation():
+    """Drop cached slots announced on the slot_events channel"""
+    while True:
+        pubsub = redis_client.async_client.pubsub()
+        try:
+            await pubsub.subscribe(SLOT_EVENTS_CHANNEL)
+            async for message in pubsub.listen():
+                if message["type"] != "message":
+                    continue
+                event = json.loads(message["data"])
+                slot_cache.local.delete(str(event["slot_id"]))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Slot invalidation listener failed: {e}")
+            # Anything cached meanwhile may have missed an event
+            slot_cache.local.clear()
+            await asyncio.sleep(1)
+        finally:
+            await pubsub.aclose()
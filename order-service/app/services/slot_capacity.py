@@ -0,0 +1,853 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+import uuid
+from collections import defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from tnt_common import metrics
+from app.db.models import Order, OrderStatus, SlotReservation
+from app.db.session import AsyncSessionLocal
+from app.utils.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+WRITE_BEHIND_INTERVAL = float(os.getenv("SLOT_WRITE_BEHIND_INTERVAL", "0.5"))
+WRITE_BEHIND_BATCH = int(os.getenv("SLOT_WRITE_BEHIND_BATCH", "500"))
+RECONCILE_INTERVAL = float(os.getenv("SLOT_RECONCILE_INTERVAL", "60"))
+RECONCILE_BATCH = int(os.getenv("SLOT_RECONCILE_BATCH", "500"))
+# Holders reserved / released more recently than this may still be
+# committing; reconciliation leaves them as they are
+RECONCILE_GRACE = float(os.getenv("SLOT_RECONCILE_GRACE", "120"))
+# How long a capacity change for an unloaded slot waits for its loader
+PENDING_MAX_TTL = int(os.getenv("SLOT_PENDING_MAX_TTL", "300"))
+# Split every slot's live counter across this many keys (1 = one counter per slot)
+CAPACITY_SHARDS = max(1, int(os.getenv("SLOT_CAPACITY_SHARDS", "1")))
+# Waitlists outlive any slot they belong to
+WAITLIST_TTL = int(os.getenv("SLOT_WAITLIST_TTL", "86400"))
+
+DIRTY_SLOTS_KEY = "slot_capacity:dirty"
+
+# Script return codes (non-negative values are the remaining capacity)
+FULL = -1
+NOT_LOADED = -2
+ALREADY_HELD = -3
+NOT_HELD = -4
+HAS_CAPACITY = -5
+
+SHARD_CONTENTION = metrics.contention("slot_capacity_shard", "empty_shard")
+
+
+# ======================================================
+# LUA SCRIPTS (executed atomically inside Redis)
+# ======================================================
+# Seed a slot's counter and holder set (all or nothing, so a concurrent
+# loader never clobbers live bookings) and record the max capacity it
+# reflects. A capacity change that committed after the loader read the
+# row was left as a pending max by ADJUST_SCRIPT and is folded in here.
+# KEYS[1] = seeded max capacity, KEYS[2] = pending max capacity,
+# KEYS[3] = holder set, KEYS[4..] = capacity counter (or its shards)
+# ARGV[1] = max capacity ('' if not tracked), ARGV[2..] = counter values,
+# then the holders of active orders
+SEED_SCRIPT = """
+local shards = #KEYS - 3
+for i = 4, #KEYS do
+    if redis.call('EXISTS', KEYS[i]) == 1 then
+        return 0
+    end
+end
+local max = ARGV[1]
+local delta = 0
+local pending = redis.call('GET', KEYS[2])
+if pending and max ~= '' then
+    delta = tonumber(pending) - tonumber(max)
+    max = pending
+end
+redis.call('DEL', KEYS[2])
+for i = 1, shards do
+    local value = tonumber(ARGV[i + 1])
+    if i == 1 then
+        value = value + delta
+    end
+    redis.call('SET', KEYS[i + 3], value)
+end
+redis.call('DEL', KEYS[3])
+for i = shards + 2, #ARGV do
+    redis.call('SADD', KEYS[3], ARGV[i])
+end
+if max == '' then
+    redis.call('DEL', KEYS[1])
+else
+    redis.call('SET', KEYS[1], max)
+end
+return 1
+"""
+
+# KEYS[1] = capacity counter, KEYS[2] = holder set, KEYS[3] = dirty slot set,
+# KEYS[4] = holder changes (zset, score = time of the last reserve / release)
+# ARGV[1] = holder (student phone), ARGV[2] = slot id, ARGV[3] = now
+RESERVE_SCRIPT = """
+local remaining = redis.call('GET', KEYS[1])
+if not remaining then
+    return -2
+end
+if redis.call('SISMEMBER', KEYS[2], ARGV[1]) == 1 then
+    return -3
+end
+if tonumber(remaining) <= 0 then
+    return -1
+end
+remaining = redis.call('DECR', KEYS[1])
+redis.call('SADD', KEYS[2], ARGV[1])
+redis.call('ZADD', KEYS[4], ARGV[3], ARGV[1])
+redis.call('SADD', KEYS[3], ARGV[2])
+return remaining
+"""
+
+RELEASE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return -2
+end
+if redis.call('SREM', KEYS[2], ARGV[1]) == 0 then
+    return -4
+end
+local remaining = redis.call('INCR', KEYS[1])
+redis.call('ZADD', KEYS[4], ARGV[3], ARGV[1])
+redis.call('SADD', KEYS[3], ARGV[2])
+return remaining
+"""
+
+# Cancellation that hands the seat straight to the head of the waitlist
+# KEYS[1..4] as RESERVE_SCRIPT, KEYS[5] = waitlist (zset, score = join time),
+# KEYS[6] = waitlisted carts
+# ARGV[1] = holder, ARGV[2] = slot id, ARGV[3] = now
+# Returns {code} or {remaining, promoted holder, cart, join score}
+RELEASE_OR_PROMOTE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return {-2}
+end
+if redis.call('SREM', KEYS[2], ARGV[1]) == 0 then
+    return {-4}
+end
+redis.call('ZADD', KEYS[4], ARGV[3], ARGV[1])
+while true do
+    local head = redis.call('ZPOPMIN', KEYS[5])
+    if #head == 0 then
+        break
+    end
+    local cart = redis.call('HGET', KEYS[6], head[1])
+    redis.call('HDEL', KEYS[6], head[1])
+    -- Skip students who booked the slot some other way meanwhile
+    if redis.call('SISMEMBER', KEYS[2], head[1]) == 0 then
+        redis.call('SADD', KEYS[2], head[1])
+        redis.call('ZADD', KEYS[4], ARGV[3], head[1])
+        return {tonumber(redis.call('GET', KEYS[1])), head[1], cart or '', head[2]}
+    end
+end
+local remaining = redis.call('INCR', KEYS[1])
+redis.call('SADD', KEYS[3], ARGV[2])
+return {remaining}
+"""
+
+# Hand free seats (e.g. added by the vendor) to the head of the waitlist
+# KEYS[1] = holder set, KEYS[2] = holder changes, KEYS[3] = dirty slot set,
+# KEYS[4] = waitlist, KEYS[5] = waitlisted carts, KEYS[6..] = capacity counter (or its shards)
+# ARGV[1] = slot id, ARGV[2] = now, ARGV[3] = most students to promote
+# Returns {holder, cart, join score, ...} per promoted student
+PROMOTE_SCRIPT = """
+local function next_waitlisted()
+    while true do
+        local head = redis.call('ZPOPMIN', KEYS[4])
+        if #head == 0 then
+            return nil
+        end
+        local cart = redis.call('HGET', KEYS[5], head[1])
+        redis.call('HDEL', KEYS[5], head[1])
+        if redis.call('SISMEMBER', KEYS[1], head[1]) == 0 then
+            return {head[1], cart or '', head[2]}
+        end
+    end
+end
+local promoted = {}
+local limit = tonumber(ARGV[3])
+for i = 6, #KEYS do
+    while limit > 0 and tonumber(redis.call('GET', KEYS[i]) or '0') > 0 do
+        local student = next_waitlisted()
+        if not student then
+            limit = 0
+        else
+            redis.call('DECR', KEYS[i])
+            redis.call('SADD', KEYS[1], student[1])
+            redis.call('ZADD', KEYS[2], ARGV[2], student[1])
+            for _, value in ipairs(student) do
+                table.insert(promoted, value)
+            end
+            limit = limit - 1
+        end
+    end
+end
+if #promoted > 0 then
+    redis.call('SADD', KEYS[3], ARGV[1])
+end
+return promoted
+"""
+
+# Join the waitlist of a full slot
+# KEYS[1] = holder set, KEYS[2] = waitlist, KEYS[3] = waitlisted carts,
+# KEYS[4..] = capacity counter (or all of its shards)
+# ARGV[1] = student, ARGV[2] = join score, ARGV[3] = cart, ARGV[4] = ttl
+# Returns the 0-based position or a code
+JOIN_WAITLIST_SCRIPT = """
+local remaining = 0
+for i = 4, #KEYS do
+    local shard = redis.call('GET', KEYS[i])
+    if not shard then
+        return -2
+    end
+    remaining = remaining + tonumber(shard)
+end
+if redis.call('SISMEMBER', KEYS[1], ARGV[1]) == 1 then
+    return -3
+end
+if remaining > 0 then
+    return -5
+end
+redis.call('ZADD', KEYS[2], 'NX', ARGV[2], ARGV[1])
+redis.call('HSETNX', KEYS[3], ARGV[1], ARGV[3])
+redis.call('EXPIRE', KEYS[2], ARGV[4])
+redis.call('EXPIRE', KEYS[3], ARGV[4])
+return redis.call('ZRANK', KEYS[2], ARGV[1])
+"""
+
+# Capacity change from the vendor on a live counter. The change is taken
+# against the max the counter was seeded with (or last adjusted to), so a
+# counter loaded after the table already moved, or a repeated adjustment,
+# changes nothing; `delta` is only used when no seeded max is recorded.
+# Without a counter the new max is kept as pending for a load() that read
+# the row before the change committed (see SEED_SCRIPT).
+# KEYS[1] = capacity counter, KEYS[2] = seeded max capacity, KEYS[3] = dirty slot set,
+# KEYS[4] = pending max capacity
+# ARGV[1] = delta, ARGV[2] = slot id, ARGV[3] = new max capacity, ARGV[4] = pending ttl
+# Returns the change applied to the counter
+ADJUST_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    redis.call('SET', KEYS[4], ARGV[3], 'EX', ARGV[4])
+    return 0
+end
+local delta = tonumber(ARGV[1])
+local seeded = redis.call('GET', KEYS[2])
+if seeded then
+    delta = tonumber(ARGV[3]) - tonumber(seeded)
+end
+redis.call('SET', KEYS[2], ARGV[3])
+if delta == 0 then
+    return 0
+end
+redis.call('INCRBY', KEYS[1], delta)
+redis.call('SADD', KEYS[3], ARGV[2])
+return delta
+"""
+
+# Multi-slot, all-or-nothing variant
+# KEYS[1] = dirty slot set, then (capacity counter, holder set, holder changes) per slot
+# ARGV[1] = holder, ARGV[2] = now, ARGV[3..] = slot ids
+# Returns {code, index of the offending slot} or {0, 0}
+RESERVE_MANY_SCRIPT = """
+local n = #ARGV - 2
+for i = 1, n do
+    local remaining = redis.call('GET', KEYS[3 * i - 1])
+    if not remaining then
+        return {-2, i}
+    end
+    if redis.call('SISMEMBER', KEYS[3 * i], ARGV[1]) == 1 then
+        return {-3, i}
+    end
+    if tonumber(remaining) <= 0 then
+        return {-1, i}
+    end
+end
+for i = 1, n do
+    redis.call('DECR', KEYS[3 * i - 1])
+    redis.call('SADD', KEYS[3 * i], ARGV[1])
+    redis.call('ZADD', KEYS[3 * i + 1], ARGV[2], ARGV[1])
+    redis.call('SADD', KEYS[1], ARGV[i + 2])
+end
+return {0, 0}
+"""
+
+# Rebuild a live counter from the orders table: the holders become the
+# students with an active order and the counter max capacity minus the
+# holders. Holders reserved or released after the cutoff may still be
+# committing, so they are left as they are.
+# KEYS[1] = holder set, KEYS[2] = holder changes, KEYS[3] = seeded max capacity,
+# KEYS[4] = dirty slot set, KEYS[5..] = capacity counter (or its shards)
+# ARGV[1] = slot id, ARGV[2] = max capacity, ARGV[3] = cutoff,
+# ARGV[4..] = holders of active orders
+# Returns the rebuilt remaining capacity or -2 (not loaded)
+RECONCILE_SCRIPT = """
+for i = 5, #KEYS do
+    if redis.call('EXISTS', KEYS[i]) == 0 then
+        return -2
+    end
+end
+local function settled(holder)
+    local changed = redis.call('ZSCORE', KEYS[2], holder)
+    return not changed or tonumber(changed) <= tonumber(ARGV[3])
+end
+local active = {}
+for i = 4, #ARGV do
+    active[ARGV[i]] = true
+    if settled(ARGV[i]) then
+        redis.call('SADD', KEYS[1], ARGV[i])
+    end
+end
+for _, holder in ipairs(redis.call('SMEMBERS', KEYS[1])) do
+    if not active[holder] and settled(holder) then
+        redis.call('SREM', KEYS[1], holder)
+    end
+end
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', ARGV[3])
+local available = tonumber(ARGV[2]) - redis.call('SCARD', KEYS[1])
+local shards = #KEYS - 4
+for i = 1, shards do
+    local value = 0
+    if available <= 0 then
+        if i == 1 then
+            value = available
+        end
+    else
+        value = math.floor(available / shards)
+        if i - 1 < available % shards then
+            value = value + 1
+        end
+    end
+    redis.call('SET', KEYS[4 + i], value)
+end
+redis.call('SET', KEYS[3], ARGV[2])
+redis.call('SADD', KEYS[4], ARGV[1])
+return available
+"""
+
+
+class Promotion(NamedTuple):
+    """Waitlisted student who was handed a freed seat"""
+    student_phone: str
+    items: List[Dict]
+    joined_at: float
+
+
+class SlotCapacityEngine:
+    """
+    Redis-side slot capacity counters.
+
+    Redis holds the live counter for every slot that has been booked
+    since it was loaded; `slot_reservations` is kept in step by an
+    asynchronous write-behind of dirty slots. A periodic reconciliation
+    rebuilds every live counter from the orders table, so a seat leaked
+    by a crash between reserve and commit comes back.
+
+    With shards > 1 each counter is split across that many keys: bookers
+    start at a random shard and move on while shards are empty, releases
+    and vendor changes land on any shard, and reads sum the shards.
+    """
+
+    def __init__(self, shards: int = CAPACITY_SHARDS):
+        # Event-loop client: every call is awaited on the booking path
+        self.redis = redis_client.async_client
+        self.shards = shards
+        self._seed = self.redis.register_script(SEED_SCRIPT)
+        self._reserve = self.redis.register_script(RESERVE_SCRIPT)
+        self._release = self.redis.register_script(RELEASE_SCRIPT)
+        self._reserve_many = self.redis.register_script(RESERVE_MANY_SCRIPT)
+        self._adjust = self.redis.register_script(ADJUST_SCRIPT)
+        self._release_or_promote = self.redis.register_script(RELEASE_OR_PROMOTE_SCRIPT)
+        self._promote = self.redis.register_script(PROMOTE_SCRIPT)
+        self._join_waitlist = self.redis.register_script(JOIN_WAITLIST_SCRIPT)
+        self._reconcile = self.redis.register_script(RECONCILE_SCRIPT)
+
+    @staticmethod
+    def capacity_key(slot_id) -> str:
+        return f"slot_capacity:{slot_id}"
+
+    @staticmethod
+    def max_capacity_key(slot_id) -> str:
+        return f"slot_capacity_max:{slot_id}"
+
+    @staticmethod
+    def pending_max_key(slot_id) -> str:
+        return f"slot_capacity_pending_max:{slot_id}"
+
+    @staticmethod
+    def holders_key(slot_id) -> str:
+        return f"slot_holders:{slot_id}"
+
+    @staticmethod
+    def holder_changes_key(slot_id) -> str:
+        return f"slot_holder_changes:{slot_id}"
+
+    @staticmethod
+    def waitlist_key(slot_id) -> str:
+        return f"slot_waitlist:{slot_id}"
+
+    @staticmethod
+    def waitlist_carts_key(slot_id) -> str:
+        return f"slot_waitlist_carts:{slot_id}"
+
+    def capacity_keys(self, slot_id) -> List[str]:
+        """The slot's counter, or its shards (remaining capacity is their sum)"""
+        if self.shards == 1:
+            return [self.capacity_key(slot_id)]
+        return [f"{self.capacity_key(slot_id)}:{shard}" for shard in range(self.shards)]
+
+    def _any_shard(self, slot_id) -> str:
+        return random.choice(self.capacity_keys(slot_id))
+
+    def _keys(self, slot_id, capacity_key: Optional[str] = None) -> List[str]:
+        return [
+            capacity_key or self._any_shard(slot_id),
+            self.holders_key(slot_id),
+            DIRTY_SLOTS_KEY,
+            self.holder_changes_key(slot_id)
+        ]
+
+    @staticmethod
+    def split_capacity(available: int, shards: int) -> List[int]:
+        """Spread capacity evenly (an overbooked slot keeps its deficit on shard 0)"""
+        if available <= 0:
+            return [available] + [0] * (shards - 1)
+        return [available // shards + (1 if i < available % shards else 0) for i in range(shards)]
+
+    def _waitlist_keys(self, slot_id) -> List[str]:
+        return [self.waitlist_key(slot_id), self.waitlist_carts_key(slot_id)]
+
+    # --------------------------------------------------
+    # LOADING
+    # --------------------------------------------------
+    async def load(self, db: AsyncSession, slot_id) -> bool:
+        """
+        Seed the Redis counter and holder set from the database (max
+        capacity minus active orders, or the stored counter for rows from
+        before max capacity was tracked)
+        """
+        reservation = await db.get(SlotReservation, slot_id)
+
+        if not reservation:
+            return False
+
+        holders = (await db.scalars(
+            select(Order.student_phone).where(
+                Order.slot_id == slot_id,
+                Order.status != OrderStatus.cancelled
+            )
+        )).all()
+
+        keys = self.capacity_keys(slot_id)
+        if reservation.max_capacity is not None:
+            max_capacity, available = reservation.max_capacity, reservation.max_capacity - len(holders)
+        else:
+            max_capacity, available = "", reservation.available_capacity
+
+        await self._seed(
+            keys=[self.max_capacity_key(slot_id), self.pending_max_key(slot_id), self.holders_key(slot_id)] + keys,
+            args=[max_capacity] + self.split_capacity(available, len(keys)) + list(holders)
+        )
+        return True
+
+    # --------------------------------------------------
+    # RESERVE / RELEASE
+    # --------------------------------------------------
+    async def reserve(self, db: AsyncSession, slot_id, holder: str) -> int:
+        """
+        Atomically check capacity, decrement and record the holder. With
+        shards, the remaining capacity returned is that of the shard used.
+        """
+        keys = self.capacity_keys(slot_id)
+        first = random.choice(keys)
+        result = await self._reserve_on(db, slot_id, holder, first)
+
+        if result != FULL or len(keys) == 1:
+            return result
+
+        # That shard is empty: try only the shards that still have seats
+        SHARD_CONTENTION.empty_shard.inc()
+        # (one MGET, so a sold-out slot costs two round trips, not one per shard)
+        others = [
+            key for key, value in zip(keys, await self.redis.mget(keys))
+            if key != first and value is not None and int(value) > 0
+        ]
+        random.shuffle(others)
+
+        for key in others:
+            result = await self._reserve_on(db, slot_id, holder, key)
+            if result != FULL:
+                break
+
+        return result
+
+    async def _reserve_on(self, db: AsyncSession, slot_id, holder: str, capacity_key: str) -> int:
+        keys = self._keys(slot_id, capacity_key)
+        result = await self._reserve(keys=keys, args=[holder, str(slot_id), time.time()])
+
+        if result == NOT_LOADED:
+            if not await self.load(db, slot_id):
+                return FULL
+            result = await self._reserve(keys=keys, args=[holder, str(slot_id), time.time()])
+
+        return int(result)
+
+    async def release(self, slot_id, holder: str) -> int:
+        """Give a holder's seat back to the slot"""
+        return int(await self._release(keys=self._keys(slot_id), args=[holder, str(slot_id), time.time()]))
+
+    async def release_or_promote(self, slot_id, holder: str) -> Tuple[int, Optional[Promotion]]:
+        """
+        Give a holder's seat to the first student on the slot's waitlist,
+        or back to the slot when nobody is waiting (one atomic step, so
+        no concurrent booking can take the seat in between).
+        """
+        return (await self.release_or_promote_pairs([(slot_id, holder)]))[0]
+
+    async def release_or_promote_pairs(self, pairs: List[Tuple]) -> List[Tuple[int, Optional[Promotion]]]:
+        """release_or_promote for each (slot_id, holder), one pipelined round trip"""
+        pipe = self.redis.pipeline(transaction=False)
+        for slot_id, holder in pairs:
+            await self._release_or_promote(
+                keys=self._keys(slot_id) + self._waitlist_keys(slot_id),
+                args=[holder, str(slot_id), time.time()],
+                client=pipe
+            )
+
+        released = []
+        for result in await pipe.execute():
+            if len(result) == 1:
+                released.append((int(result[0]), None))
+            else:
+                released.append((int(result[0]), self._promotion(*result[1:])))
+        return released
+
+    @staticmethod
+    def _promotion(student, cart, score) -> Promotion:
+        return Promotion(
+            student_phone=student.decode() if isinstance(student, bytes) else student,
+            items=json.loads(cart) if cart else [],
+            joined_at=float(score)
+        )
+
+    async def undo_promotion(self, slot_id, holder: str, promotion: Promotion):
+        """Put seat, holder and waitlist back as they were before release_or_promote"""
+        now = time.time()
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.srem(self.holders_key(slot_id), promotion.student_phone)
+        pipe.sadd(self.holders_key(slot_id), holder)
+        pipe.zadd(self.holder_changes_key(slot_id), {promotion.student_phone: now, holder: now})
+        pipe.zadd(self.waitlist_key(slot_id), {promotion.student_phone: promotion.joined_at})
+        pipe.hset(self.waitlist_carts_key(slot_id), promotion.student_phone, json.dumps(promotion.items))
+        await pipe.execute()
+
+    async def promote(self, slot_id, limit: int) -> List[Promotion]:
+        """
+        Hand up to `limit` free seats of a loaded slot to the head of its
+        waitlist (e.g. after the vendor added seats)
+        """
+        keys = [
+            self.holders_key(slot_id),
+            self.holder_changes_key(slot_id),
+            DIRTY_SLOTS_KEY
+        ] + self._waitlist_keys(slot_id) + self.capacity_keys(slot_id)
+
+        result = await self._promote(keys=keys, args=[str(slot_id), time.time(), limit])
+        return [self._promotion(*result[i:i + 3]) for i in range(0, len(result), 3)]
+
+    async def undo_promotions(self, slot_id, promotions: List[Promotion]):
+        """Give the seats of promote() back and requeue the students where they were"""
+        now = time.time()
+        pipe = self.redis.pipeline(transaction=True)
+        for promotion in promotions:
+            pipe.srem(self.holders_key(slot_id), promotion.student_phone)
+            pipe.zadd(self.holder_changes_key(slot_id), {promotion.student_phone: now})
+            pipe.zadd(self.waitlist_key(slot_id), {promotion.student_phone: promotion.joined_at})
+            pipe.hset(self.waitlist_carts_key(slot_id), promotion.student_phone, json.dumps(promotion.items))
+        pipe.incrby(self._any_shard(slot_id), len(promotions))
+        pipe.sadd(DIRTY_SLOTS_KEY, str(slot_id))
+        await pipe.execute()
+
+    # --------------------------------------------------
+    # WAITLIST
+    # --------------------------------------------------
+    async def join_waitlist(self, db: AsyncSession, slot_id, student: str, items: List[Dict]) -> int:
+        """
+        Queue a student (with their cart) for the next freed seat of a
+        full slot. Returns the 0-based position, or a code when the slot
+        is unknown, already held or has seats left.
+        """
+        keys = [self.holders_key(slot_id)] + self._waitlist_keys(slot_id) + self.capacity_keys(slot_id)
+        args = [student, time.time(), json.dumps(items), WAITLIST_TTL]
+
+        result = await self._join_waitlist(keys=keys, args=args)
+
+        if result == NOT_LOADED:
+            if not await self.load(db, slot_id):
+                return NOT_LOADED
+            result = await self._join_waitlist(keys=keys, args=args)
+
+        return int(result)
+
+    async def leave_waitlist(self, slot_id, student: str) -> bool:
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.zrem(self.waitlist_key(slot_id), student)
+        pipe.hdel(self.waitlist_carts_key(slot_id), student)
+        removed, _ = await pipe.execute()
+        return bool(removed)
+
+    async def waitlist_position(self, slot_id, student: str) -> Optional[int]:
+        return await self.redis.zrank(self.waitlist_key(slot_id), student)
+
+    async def reserve_many(self, db: AsyncSession, slot_ids: List, holder: str) -> Tuple[int, Optional[object]]:
+        """
+        Reserve one seat in every slot or in none of them.
+
+        Returns (0, None) on success, otherwise the failure code and the
+        slot that caused it.
+        """
+        loaded = False
+        retries = 0
+
+        while True:
+            keys = [DIRTY_SLOTS_KEY]
+            for slot_id, capacity_key in zip(slot_ids, await self._fullest_shards(slot_ids)):
+                keys += [capacity_key, self.holders_key(slot_id), self.holder_changes_key(slot_id)]
+
+            args = [holder, time.time()] + [str(slot_id) for slot_id in slot_ids]
+            code, index = await self._reserve_many(keys=keys, args=args)
+
+            if code == NOT_LOADED and not loaded:
+                # Seed every missing counter, then retry once
+                loaded = True
+                for slot_id in slot_ids:
+                    if not await self.load(db, slot_id):
+                        return FULL, slot_id
+                continue
+
+            if code == FULL and retries < self.shards - 1:
+                # The chosen shard emptied meanwhile; another may still have seats
+                retries += 1
+                continue
+
+            break
+
+        if code == 0:
+            return 0, None
+        return int(code), slot_ids[int(index) - 1]
+
+    async def _fullest_shards(self, slot_ids: List) -> List[str]:
+        """Per slot, the shard with the most seats left (one MGET)"""
+        if self.shards == 1:
+            return [self.capacity_key(slot_id) for slot_id in slot_ids]
+
+        keys = [self.capacity_keys(slot_id) for slot_id in slot_ids]
+        values = await self.redis.mget([key for shard_keys in keys for key in shard_keys])
+
+        picks = []
+        for i, shard_keys in enumerate(keys):
+            shard_values = values[i * self.shards:(i + 1) * self.shards]
+            best = max(range(self.shards), key=lambda shard: int(shard_values[shard] or 0))
+            picks.append(shard_keys[best])
+        return picks
+
+    async def available_many(self, slot_ids: List) -> List[Optional[int]]:
+        """Live remaining capacity per slot (None when not loaded), one MGET"""
+        keys = [key for slot_id in slot_ids for key in self.capacity_keys(slot_id)]
+        if not keys:
+            return []
+        values = await self.redis.mget(keys)
+
+        counters = []
+        for i in range(len(slot_ids)):
+            shard_values = values[i * self.shards:(i + 1) * self.shards]
+            if any(value is None for value in shard_values):
+                counters.append(None)
+            else:
+                counters.append(sum(int(value) for value in shard_values))
+        return counters
+
+    async def release_many(self, slot_ids: List, holder: str):
+        """Give a holder's seats back to several slots (one pipelined round trip)"""
+        await self.release_pairs([(slot_id, holder) for slot_id in slot_ids])
+
+    async def release_pairs(self, pairs: List[Tuple]) -> List[int]:
+        """Give back the seat of each (slot_id, holder), one pipelined round trip"""
+        pipe = self.redis.pipeline(transaction=False)
+        for slot_id, holder in pairs:
+            await self._release(keys=self._keys(slot_id), args=[holder, str(slot_id), time.time()], client=pipe)
+        return [int(result) for result in await pipe.execute()]
+
+    async def adjust(self, changes: Dict[object, Tuple[int, int]]) -> Dict[object, int]:
+        """
+        Apply max-capacity changes (slot -> (delta, new max)) to live
+        counters once the table holds them. Slots without a counter pick
+        the change up when they are loaded, also a load that read the
+        table before the change; a counter loaded after the change, or
+        adjusted twice, is left as it is. Returns the change applied per
+        slot (0 when nothing moved).
+        """
+        pipe = self.redis.pipeline(transaction=False)
+        for slot_id, (delta, new_max) in changes.items():
+            await self._adjust(
+                keys=[
+                    self._any_shard(slot_id),
+                    self.max_capacity_key(slot_id),
+                    DIRTY_SLOTS_KEY,
+                    self.pending_max_key(slot_id)
+                ],
+                args=[delta, str(slot_id), new_max, PENDING_MAX_TTL],
+                client=pipe
+            )
+        return {slot_id: int(applied) for slot_id, applied in zip(changes, await pipe.execute())}
+
+    # --------------------------------------------------
+    # WRITE-BEHIND
+    # --------------------------------------------------
+    async def flush_dirty(self, db: AsyncSession) -> int:
+        """Write the current counters of dirty slots to slot_reservations"""
+        slot_ids = await self.redis.spop(DIRTY_SLOTS_KEY, WRITE_BEHIND_BATCH)
+        if not slot_ids:
+            return 0
+
+        slot_ids = [s.decode() if isinstance(s, bytes) else s for s in slot_ids]
+        counters = await self.available_many(slot_ids)
+
+        rows = [
+            {"slot_id": uuid.UUID(slot_id), "available_capacity": capacity}
+            for slot_id, capacity in zip(slot_ids, counters)
+            if capacity is not None
+        ]
+
+        if not rows:
+            return 0
+
+        try:
+            # ORM bulk UPDATE by primary key (one executemany)
+            await db.execute(update(SlotReservation), rows)
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            # Put them back so the next tick retries
+            await self.redis.sadd(DIRTY_SLOTS_KEY, *slot_ids)
+            raise
+
+        return len(rows)
+
+    async def reconcile(self, db: AsyncSession, slot_ids: Optional[Iterable] = None) -> int:
+        """
+        Rebuild every live counter from the orders table (see
+        RECONCILE_SCRIPT), so a seat reserved by a request that died
+        before its commit comes back. Each batch holds the row locks of
+        its slots, so no capacity change commits (and then adjusts the
+        counter) in between; rows locked by one are skipped until the
+        next run. Slots without a counter are loaded from the table on
+        their next booking. Returns the slots reconciled.
+        """
+        query = select(SlotReservation.slot_id)
+        if slot_ids is not None:
+            query = query.where(SlotReservation.slot_id.in_(list(slot_ids)))
+
+        all_slots = (await db.scalars(query)).all()
+        if not all_slots:
+            return 0
+
+        exists = await self.redis.mget([self.capacity_keys(s)[0] for s in all_slots])
+        loaded = [s for s, value in zip(all_slots, exists) if value is not None]
+
+        reconciled = 0
+        for start in range(0, len(loaded), RECONCILE_BATCH):
+            reconciled += await self._reconcile_batch(db, loaded[start:start + RECONCILE_BATCH])
+        return reconciled
+
+    async def _reconcile_batch(self, db: AsyncSession, slot_ids: List) -> int:
+        try:
+            rows = (await db.execute(
+                select(SlotReservation.slot_id, SlotReservation.max_capacity)
+                .where(SlotReservation.slot_id.in_(slot_ids))
+                .order_by(SlotReservation.slot_id)
+                .with_for_update(skip_locked=True)
+            )).all()
+
+            holders = defaultdict(list)
+            for slot_id, student_phone in (await db.execute(
+                select(Order.slot_id, Order.student_phone).where(
+                    Order.slot_id.in_([slot_id for slot_id, _ in rows]),
+                    Order.status != OrderStatus.cancelled
+                )
+            )).all():
+                holders[slot_id].append(student_phone)
+
+            cutoff = time.time() - RECONCILE_GRACE
+            pipe = self.redis.pipeline(transaction=False)
+            for slot_id, max_capacity in rows:
+                if max_capacity is None:
+                    # From before max capacity was tracked: just write it behind
+                    pipe.sadd(DIRTY_SLOTS_KEY, str(slot_id))
+                    continue
+                await self._reconcile(
+                    keys=[
+                        self.holders_key(slot_id),
+                        self.holder_changes_key(slot_id),
+                        self.max_capacity_key(slot_id),
+                        DIRTY_SLOTS_KEY
+                    ] + self.capacity_keys(slot_id),
+                    args=[str(slot_id), max_capacity, cutoff] + holders[slot_id],
+                    client=pipe
+                )
+            results = await pipe.execute()
+        finally:
+            # Release the row locks
+            await db.rollback()
+
+        return sum(1 for result in results if result != NOT_LOADED)
+
+
+# Global engine instance
+slot_capacity = SlotCapacityEngine()
+
+
+# ======================================================
+# BACKGROUND WORKERS
+# ======================================================
+async def _flush_once() -> int:
+    async with AsyncSessionLocal() as db:
+        return await slot_capacity.flush_dirty(db)
+
+
+async def _reconcile_once() -> int:
+    async with AsyncSessionLocal() as db:
+        return await slot_capacity.reconcile(db)
+
+
+async def run_write_behind():
+    """Drain dirty slots into the database until cancelled"""
+    while True:
+        try:
+            # Keep draining while there is a backlog
+            while await _flush_once() >= WRITE_BEHIND_BATCH:
+                pass
+        except Exception as e:
+            logger.warning(f"Slot write-behind failed: {e}")
+
+        await asyncio.sleep(WRITE_BEHIND_INTERVAL)
+
+
+async def run_reconciliation():
+    """Periodically rebuild the live counters from the orders table"""
+    while True:
+        try:
+            await _reconcile_once()
+        except Exception as e:
+            logger.warning(f"Slot reconciliation failed: {e}")
+
+        await asyncio.sleep(RECONCILE_INTERVAL)
@@ -0,0 +1,203 @@
+import asyncio
+import logging
+import os
+import socket
+from typing import Dict, List, Tuple
+from uuid import UUID
+
+from redis.exceptions import ResponseError
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import Order, OrderStatus, SlotReservation
+from app.db.session import AsyncSessionLocal
+from app.services.booking import promote_waitlists
+from app.services.slot_capacity import slot_capacity
+from app.utils.redis_client import decode_stream_entries, redis_client
+
+logger = logging.getLogger(__name__)
+
+# Shared with vendor-service (events.py)
+SLOT_EVENTS_STREAM = "slot_events:stream"
+
+SLOT_EVENTS_GROUP = os.getenv("SLOT_EVENTS_GROUP", "order-service")
+SLOT_EVENTS_CONSUMER = f"{socket.gethostname()}-{os.getpid()}"
+SLOT_EVENTS_BATCH = int(os.getenv("SLOT_EVENTS_BATCH", "100"))
+SLOT_EVENTS_BLOCK_MS = int(os.getenv("SLOT_EVENTS_BLOCK_MS", "5000"))
+# Entries unacknowledged this long (crashed consumer, failed apply) are re-claimed
+SLOT_EVENTS_CLAIM_IDLE_MS = int(os.getenv("SLOT_EVENTS_CLAIM_IDLE_MS", "60000"))
+SLOT_EVENTS_MAX_DELIVERIES = int(os.getenv("SLOT_EVENTS_MAX_DELIVERIES", "5"))
+
+
+# ======================================================
+# APPLY
+# ======================================================
+async def apply_slot_events(db: AsyncSession, events: List[Dict]) -> Dict[UUID, Tuple[int, int]]:
+    """
+    Apply slot events to slot_reservations (one transaction) and return
+    the capacity changes (slot -> (delta, new max)) for the live Redis
+    counters.
+
+    Idempotent: every event carries the slot's version, bumped under the
+    slot's row lock in vendor-service (so it follows commit order), and
+    a reservation ignores events at or below the last one it applied.
+    So redeliveries and out-of-order duplicates are no-ops for the
+    table; they still return the slot's current max, so the counter
+    adjustment (a no-op once applied) is retried if it failed before.
+
+    A deleted slot keeps its row with max capacity 0, which leaves it
+    full and keeps its version for later duplicates.
+    """
+    changes: Dict[UUID, Tuple[int, int]] = {}
+
+    for event in events:
+        if not event.get("slot_version"):
+            # Queued before slots were versioned; the startup sync covers it
+            logger.warning(f"Skipping unversioned slot event {event.get('outbox_id')}")
+            continue
+
+        slot_id = UUID(event["slot_id"])
+        version = int(event["slot_version"])
+        new_max = 0 if event["event"] == "slot.deleted" else int(event["max_capacity"])
+
+        reservation = await db.get(SlotReservation, slot_id, with_for_update=True)
+
+        if reservation is None:
+            booked = await db.scalar(
+                select(func.count()).select_from(Order).where(
+                    Order.slot_id == slot_id,
+                    Order.status != OrderStatus.cancelled
+                )
+            )
+            db.add(SlotReservation(
+                slot_id=slot_id,
+                available_capacity=new_max - booked,
+                max_capacity=new_max,
+                event_version=version
+            ))
+            await db.flush()  # later events in the batch see the row
+            continue
+
+        if (reservation.event_version or 0) >= version:
+            if reservation.max_capacity is not None:
+                changes.setdefault(slot_id, (0, reservation.max_capacity))
+            continue
+
+        old_max = reservation.max_capacity if reservation.max_capacity is not None else new_max
+        reservation.available_capacity += new_max - old_max
+        reservation.max_capacity = new_max
+        reservation.event_version = version
+        changes[slot_id] = (changes.get(slot_id, (0, 0))[0] + new_max - old_max, new_max)
+
+    await db.commit()
+    return changes
+
+
+# ======================================================
+# CONSUMER GROUP
+# ======================================================
+async def _ensure_group():
+    try:
+        await redis_client.async_client.xgroup_create(
+            SLOT_EVENTS_STREAM, SLOT_EVENTS_GROUP, id="0", mkstream=True
+        )
+    except ResponseError as e:
+        if "BUSYGROUP" not in str(e):
+            raise
+
+
+async def _handle(entries) -> int:
+    """
+    Apply a batch, adjust the live counters, then XACK it. An entry is
+    acked only once both are done, so a failed adjustment is redelivered
+    (and, being absolute, applied once).
+    """
+    entries = decode_stream_entries(entries)
+    if not entries:
+        return 0
+
+    # Entries trimmed from the stream while pending come back without fields
+    events = [fields for _, fields in entries if fields]
+    if events:
+        async with AsyncSessionLocal() as db:
+            changes = await apply_slot_events(db, events)
+        added = await slot_capacity.adjust(changes)
+        # Seats the vendor added go to the slots' waitlists first
+        await promote_waitlists(added)
+
+    await redis_client.async_client.xack(
+        SLOT_EVENTS_STREAM, SLOT_EVENTS_GROUP, *[entry_id for entry_id, _ in entries]
+    )
+    return len(entries)
+
+
+async def _claim_stale() -> int:
+    """Take over entries left unacknowledged too long; drop poison entries"""
+    r = redis_client.async_client
+
+    stale = await r.xpending_range(
+        SLOT_EVENTS_STREAM, SLOT_EVENTS_GROUP, "-", "+", SLOT_EVENTS_BATCH,
+        idle=SLOT_EVENTS_CLAIM_IDLE_MS
+    )
+    poison = [p["message_id"] for p in stale if p["times_delivered"] >= SLOT_EVENTS_MAX_DELIVERIES]
+    if poison:
+        logger.error(f"Dropping slot events after {SLOT_EVENTS_MAX_DELIVERIES} deliveries: {poison}")
+        await r.xack(SLOT_EVENTS_STREAM, SLOT_EVENTS_GROUP, *poison)
+
+    retry = [p["message_id"] for p in stale if p["times_delivered"] < SLOT_EVENTS_MAX_DELIVERIES]
+    if not retry:
+        return 0
+
+    claimed = await r.xclaim(
+        SLOT_EVENTS_STREAM, SLOT_EVENTS_GROUP, SLOT_EVENTS_CONSUMER,
+        SLOT_EVENTS_CLAIM_IDLE_MS, retry
+    )
+
+    # One at a time so a poison entry cannot hold back the rest
+    handled = 0
+    for entry in claimed:
+        try:
+            handled += await _handle([entry])
+        except Exception as e:
+            logger.warning(f"Slot event {entry[0]} failed again: {e}")
+    return handled
+
+
+async def run_slot_event_consumer():
+    """
+    Apply vendor-service slot events as they arrive (XREADGROUP BLOCK,
+    no polling). Every order-service worker joins the same group, so
+    each event is applied once per deployment, not once per worker.
+    """
+    r = redis_client.async_client
+    loop = asyncio.get_running_loop()
+    next_claim = 0.0
+    group_ready = False
+
+    while True:
+        try:
+            if not group_ready:
+                await _ensure_group()
+                group_ready = True
+
+            if loop.time() >= next_claim:
+                await _claim_stale()
+                next_claim = loop.time() + SLOT_EVENTS_CLAIM_IDLE_MS / 1000
+
+            response = await r.xreadgroup(
+                SLOT_EVENTS_GROUP, SLOT_EVENTS_CONSUMER,
+                {SLOT_EVENTS_STREAM: ">"},
+                count=SLOT_EVENTS_BATCH,
+                block=SLOT_EVENTS_BLOCK_MS
+            )
+            for _, entries in response or []:
+                await _handle(entries)
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Unacked entries stay pending and are re-claimed once idle;
+            # the stream / group may have been deleted, so recreate it
+            logger.warning(f"Slot event consumer failed: {e}")
+            group_ready = False
+            await asyncio.sleep(1)
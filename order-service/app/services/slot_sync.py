@@ -0,0 +1,203 @@
+import asyncio
+import logging
+import os
+from typing import Dict, List, Tuple
+from uuid import UUID
+
+import httpx
+from fastapi import HTTPException
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from tnt_common import metrics
+from app.core.security import create_service_token
+from app.db.models import Order, OrderStatus, SlotReservation
+from app.db.session import AsyncSessionLocal
+from app.db.upsert import dialect_insert
+from app.services.booking import promote_waitlists
+from app.services.slot_capacity import slot_capacity
+from app.utils.http_client import service_clients
+from app.utils.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+SLOT_SYNC_CONCURRENCY = int(os.getenv("SLOT_SYNC_CONCURRENCY", "8"))
+# Rows per upsert statement (stays under driver bind-parameter limits)
+SLOT_SYNC_CHUNK = int(os.getenv("SLOT_SYNC_CHUNK", "5000"))
+SLOT_SYNC_RETRY_DELAY = float(os.getenv("SLOT_SYNC_RETRY_DELAY", "5"))
+# One worker syncs per deployment; the others skip while the lock lives
+SLOT_SYNC_LOCK_KEY = "slot_sync:lock"
+SLOT_SYNC_LOCK_TTL = int(os.getenv("SLOT_SYNC_LOCK_TTL", "300"))
+
+SLOT_SYNC_LOCK_CONTENTION = metrics.contention("slot_sync_lock", "held_elsewhere")
+
+# Upsert stages are timed once per chunk
+SYNC_STAGES = metrics.stages(
+    "sync_slot_reservations",
+    "fetch_vendors", "read_reservations", "booked_count", "upsert", "commit", "adjust_counters",
+    "promote_waitlists"
+)
+
+
+# ======================================================
+# FETCH (VENDOR SERVICE)
+# ======================================================
+async def _fetch_vendor_slots(client: httpx.AsyncClient, semaphore: asyncio.Semaphore, vendor: Dict) -> List[Dict]:
+    async with semaphore:
+        # /slots/ is vendor-scoped: call it as the vendor
+        token = create_service_token(vendor["phone"], "vendor", vendor_id=vendor["id"])
+        response = await client.get("/slots/", headers={"Authorization": f"Bearer {token}"})
+
+    if response.status_code != 200:
+        logger.warning(f"Slot sync: vendor {vendor['id']} slots returned {response.status_code}")
+        return []
+
+    return response.json()
+
+
+async def fetch_vendor_capacities() -> Dict[UUID, int]:
+    """Max capacity of every slot, vendors fetched concurrently (bounded)"""
+    client = service_clients.get("vendor")
+
+    vendors_response = await client.get("/vendors/")
+    if vendors_response.status_code != 200:
+        raise HTTPException(status_code=500, detail="Failed to fetch vendors")
+
+    semaphore = asyncio.Semaphore(SLOT_SYNC_CONCURRENCY)
+    per_vendor = await asyncio.gather(*(
+        _fetch_vendor_slots(client, semaphore, vendor)
+        for vendor in vendors_response.json()
+    ))
+
+    return {
+        UUID(slot["id"]): slot["max_capacity"]
+        for slots in per_vendor
+        for slot in slots
+    }
+
+
+# ======================================================
+# APPLY (DATABASE + LIVE COUNTERS)
+# ======================================================
+async def apply_capacities(db: AsyncSession, capacities: Dict[UUID, int]) -> Dict[UUID, Tuple[int, int]]:
+    """
+    Upsert slot_reservations from vendor max capacities without losing
+    bookings:
+
+    - new slots start at max capacity minus their existing (non-cancelled) orders
+    - known slots move by the change in max capacity (new max - old max)
+    - rows from before max_capacity was tracked just record the max
+
+    Known rows are read FOR UPDATE, so a concurrent sync waits and then
+    sees the new max (no change left to apply). Returns the applied
+    changes (slot -> (delta, new max)), which are then mirrored onto the
+    live Redis counters; seats added to a slot go to its waitlist first.
+    """
+    slot_ids = list(capacities)
+    changes: Dict[UUID, Tuple[int, int]] = {}
+
+    for start in range(0, len(slot_ids), SLOT_SYNC_CHUNK):
+        chunk = slot_ids[start:start + SLOT_SYNC_CHUNK]
+
+        with SYNC_STAGES.read_reservations.time():
+            previous = dict((await db.execute(
+                select(SlotReservation.slot_id, SlotReservation.max_capacity)
+                .where(SlotReservation.slot_id.in_(chunk))
+                .with_for_update()
+            )).all())
+
+        new_ids = [slot_id for slot_id in chunk if slot_id not in previous]
+        booked = {}
+        if new_ids:
+            with SYNC_STAGES.booked_count.time():
+                booked = dict((await db.execute(
+                    select(Order.slot_id, func.count())
+                    .where(
+                        Order.slot_id.in_(new_ids),
+                        Order.status != OrderStatus.cancelled
+                    )
+                    .group_by(Order.slot_id)
+                )).all())
+
+        stmt = dialect_insert(db, SlotReservation).values([
+            {
+                "slot_id": slot_id,
+                "available_capacity": capacities[slot_id] - booked.get(slot_id, 0),
+                "max_capacity": capacities[slot_id],
+            }
+            for slot_id in chunk
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["slot_id"],
+            set_={
+                "available_capacity": (
+                    SlotReservation.available_capacity
+                    + stmt.excluded.max_capacity
+                    - func.coalesce(SlotReservation.max_capacity, stmt.excluded.max_capacity)
+                ),
+                "max_capacity": stmt.excluded.max_capacity,
+            },
+            # Unchanged slots are not rewritten
+            where=SlotReservation.max_capacity.is_distinct_from(stmt.excluded.max_capacity)
+        )
+        with SYNC_STAGES.upsert.time():
+            await db.execute(stmt)
+
+        for slot_id in chunk:
+            old_max = previous.get(slot_id)
+            if old_max is not None and old_max != capacities[slot_id]:
+                changes[slot_id] = (capacities[slot_id] - old_max, capacities[slot_id])
+
+    with SYNC_STAGES.commit.time():
+        await db.commit()
+
+    # After commit: a counter loaded from here on already sees the new rows
+    # (and its seeded max, so adjust() leaves it alone)
+    with SYNC_STAGES.adjust_counters.time():
+        added = await slot_capacity.adjust(changes)
+
+    with SYNC_STAGES.promote_waitlists.time():
+        await promote_waitlists(added)
+    return changes
+
+
+async def sync_slot_reservations(db: AsyncSession) -> int:
+    """Bring slot_reservations in line with Vendor Service; returns slots seen"""
+    with SYNC_STAGES.fetch_vendors.time():
+        capacities = await fetch_vendor_capacities()
+    if capacities:
+        await apply_capacities(db, capacities)
+    return len(capacities)
+
+
+# ======================================================
+# BACKGROUND STARTUP SYNC
+# ======================================================
+async def run_slot_sync():
+    """
+    Sync once after startup (retrying until Vendor Service answers). Only
+    the worker that takes the lock syncs; after a successful sync the
+    lock is left to expire, so restarts within its TTL skip the sync.
+    """
+    while True:
+        try:
+            if not await redis_client.async_client.set(SLOT_SYNC_LOCK_KEY, "locked", ex=SLOT_SYNC_LOCK_TTL, nx=True):
+                SLOT_SYNC_LOCK_CONTENTION.held_elsewhere.inc()
+                logger.info("Slot sync: running in another worker")
+                return
+
+            try:
+                async with AsyncSessionLocal() as db:
+                    count = await sync_slot_reservations(db)
+            except BaseException:
+                # Let this worker (or another) retry
+                await redis_client.async_client.delete(SLOT_SYNC_LOCK_KEY)
+                raise
+            logger.info(f"Slot sync: {count} slots")
+            return
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Slot sync failed, retrying in {SLOT_SYNC_RETRY_DELAY}s: {e}")
+
+        await asyncio.sleep(SLOT_SYNC_RETRY_DELAY)
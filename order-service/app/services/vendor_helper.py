@@ -1,5 +1,96 @@
+import asyncio
+import json
+import logging
+import os
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from redis.exceptions import RedisError
+
+from app.utils.redis_client import redis_client
+from tnt_common.ttl_cache import TTLCache
 from app.utils.vendor_client import get_vendor_id_by_phone as get_vendor_id_from_service
 
+logger = logging.getLogger(__name__)
+
+VENDOR_CACHE_SIZE = int(os.getenv("VENDOR_CACHE_SIZE", "4096"))
+VENDOR_CACHE_TTL = float(os.getenv("VENDOR_CACHE_TTL", "60"))
+VENDOR_CACHE_REDIS_TTL = int(os.getenv("VENDOR_CACHE_REDIS_TTL", "600"))
+
+# Shared with vendor-service (events.py / api/deps/vendor.py)
+VENDOR_EVENTS_CHANNEL = "vendor_events"
+
+
+def vendor_phone_key(phone: str) -> str:
+    return f"vendor_phone:{phone}"
+
+
+_local = TTLCache(VENDOR_CACHE_SIZE, VENDOR_CACHE_TTL)
+_stats = {"claim_hits": 0, "local_hits": 0, "redis_hits": 0, "misses": 0}
+
+
+async def get_vendor_id_by_phone(phone: str, payload: Optional[Dict[str, Any]] = None):
+    """
+    Resolve a vendor phone to its vendor_id.
+
+    Uses the `vendor_id` JWT claim when the token carries one, then the
+    local cache, then the Redis cache shared with vendor-service, and only
+    then asks vendor-service. Redis failures fall through to vendor-service.
+    """
+    if payload and payload.get("vendor_id"):
+        _stats["claim_hits"] += 1
+        return UUID(payload["vendor_id"])
+
+    vendor_id = _local.get(phone)
+    if vendor_id is not None:
+        _stats["local_hits"] += 1
+        return vendor_id
+
+    try:
+        cached = await redis_client.async_client.get(vendor_phone_key(phone))
+    except RedisError as e:
+        logger.warning(f"Vendor cache Redis tier unavailable: {e}")
+        cached = None
+
+    if cached is not None:
+        _stats["redis_hits"] += 1
+        vendor_id = UUID(cached.decode() if isinstance(cached, bytes) else cached)
+        _local.set(phone, vendor_id)
+        return vendor_id
+
+    _stats["misses"] += 1
+    vendor_id = await get_vendor_id_from_service(phone)
+    try:
+        await redis_client.async_client.set(vendor_phone_key(phone), str(vendor_id), ex=VENDOR_CACHE_REDIS_TTL)
+    except RedisError as e:
+        logger.warning(f"Vendor cache Redis tier unavailable: {e}")
+    _local.set(phone, vendor_id)
+    return vendor_id
+
+
+def vendor_cache_stats() -> Dict[str, Any]:
+    return {**_stats, "local_entries": len(_local)}
+
 
-async def get_vendor_id_by_phone(phone: str):
-    return await get_vendor_id_from_service(phone)
+# ======================================================
+# INVALIDATION LISTENER
+# ======================================================
+async def run_vendor_invalidation():
+    """Drop cached vendor identities announced on the vendor_events channel"""
+    while True:
+        pubsub = redis_client.async_client.pubsub()
+        try:
+            await pubsub.subscribe(VENDOR_EVENTS_CHANNEL)
+            async for message in pubsub.listen():
+                if message["type"] != "message":
+                    continue
+                event = json.loads(message["data"])
+                _local.delete(event["phone"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Vendor invalidation listener failed: {e}")
+            _local.clear()
+            await asyncio.sleep(1)
+        finally:
+            await pubsub.aclose()
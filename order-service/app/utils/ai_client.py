@@ -1,21 +1,19 @@
-import httpx
-import os
 from typing import Dict, Any, Optional
 from pydantic import BaseModel
 
-# AI Service configuration
-AI_SERVICE_URL = os.getenv("AI_SERVICE_URL", "http://localhost:8004")
+from app.utils.http_client import service_clients
 
 class ETAPredictionRequest(BaseModel):
-    vendor_id: int
-    slot_id: int
+    vendor_id: str
+    slot_id: str
     current_orders: int
     historical_avg_orders: float
+    history_days: Optional[int] = None  # trading days behind historical_avg_orders
     time_of_day: str
     day_of_week: str
 
 class RushDetectionRequest(BaseModel):
-    vendor_id: int
+    vendor_id: str
     current_capacity: int
     available_capacity: int
     booking_rate_per_minute: float
@@ -23,22 +21,23 @@ class RushDetectionRequest(BaseModel):
     day_of_week: str
 
 class AIClient:
-    def __init__(self):
-        self.base_url = AI_SERVICE_URL
+    @property
+    def client(self):
+        return service_clients.get("ai")
 
     async def predict_eta(self, request: ETAPredictionRequest) -> Optional[Dict[str, Any]]:
         """Get ETA prediction from AI service"""
         try:
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                response = await client.post(
-                    f"{self.base_url}/predict-eta",
-                    json=request.dict()
-                )
-                if response.status_code == 200:
-                    return response.json()
-                else:
-                    print(f"AI ETA prediction failed: {response.status_code}")
-                    return None
+            response = await self.client.post(
+                "/predict-eta",
+                json=request.dict(),
+                timeout=5.0
+            )
+            if response.status_code == 200:
+                return response.json()
+            else:
+                print(f"AI ETA prediction failed: {response.status_code}")
+                return None
         except Exception as e:
             print(f"AI service unavailable for ETA: {e}")
             return None
@@ -46,16 +45,16 @@ class AIClient:
     async def detect_rush(self, request: RushDetectionRequest) -> Optional[Dict[str, Any]]:
         """Get rush detection from AI service"""
         try:
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                response = await client.post(
-                    f"{self.base_url}/detect-rush",
-                    json=request.dict()
-                )
-                if response.status_code == 200:
-                    return response.json()
-                else:
-                    print(f"AI rush detection failed: {response.status_code}")
-                    return None
+            response = await self.client.post(
+                "/detect-rush",
+                json=request.dict(),
+                timeout=5.0
+            )
+            if response.status_code == 200:
+                return response.json()
+            else:
+                print(f"AI rush detection failed: {response.status_code}")
+                return None
         except Exception as e:
             print(f"AI service unavailable for rush detection: {e}")
             return None
@@ -63,9 +62,8 @@ class AIClient:
     async def health_check(self) -> bool:
         """Check if AI service is healthy"""
         try:
-            async with httpx.AsyncClient(timeout=2.0) as client:
-                response = await client.get(f"{self.base_url}/health")
-                return response.status_code == 200
+            response = await self.client.get("/health", timeout=2.0)
+            return response.status_code == 200
         except:
             return False
 
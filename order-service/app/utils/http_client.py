@@ -0,0 +1,15 @@
+import os
+
+from tnt_common.http_client import ServiceClients
+from app.core.security import ServiceTokenAuth
+
+# Global client registry
+VENDOR_SERVICE_URL = os.getenv("VENDOR_SERVICE_URL", "http://localhost:8001")
+AI_SERVICE_URL = os.getenv("AI_SERVICE_URL", "http://localhost:8004")
+
+# Calls go out with an order-service token (not rate limited upstream)
+service_auth = ServiceTokenAuth()
+
+service_clients = ServiceClients()
+service_clients.register("vendor", VENDOR_SERVICE_URL, auth=service_auth)
+service_clients.register("ai", AI_SERVICE_URL, auth=service_auth)
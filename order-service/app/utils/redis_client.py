@@ -1,13 +1,18 @@
 import redis
+import redis.asyncio
 import os
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
+
+from tnt_common.metrics import instrument_redis
 
 # Redis configuration
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
 
 class RedisClient:
     def __init__(self):
-        self.client = redis.from_url(REDIS_URL)
+        self.client = instrument_redis(redis.from_url(REDIS_URL))
+        # Event-loop client for async request handlers and workers
+        self.async_client = instrument_redis(redis.asyncio.from_url(REDIS_URL))
 
     def acquire_lock(self, lock_key: str, ttl_seconds: int = 30) -> bool:
         """Acquire a distributed lock with TTL"""
@@ -36,5 +41,19 @@ class RedisClient:
         except:
             return False
 
+def decode_stream_entries(entries) -> List[Tuple[str, Dict]]:
+    """XREADGROUP / XCLAIM entries as (id, fields) with str ids, keys and values"""
+    return [
+        (
+            entry_id.decode() if isinstance(entry_id, bytes) else entry_id,
+            {
+                (key.decode() if isinstance(key, bytes) else key):
+                (value.decode() if isinstance(value, bytes) else value)
+                for key, value in (fields or {}).items()
+            }
+        )
+        for entry_id, fields in entries
+    ]
+
 # Global Redis client instance
 redis_client = RedisClient()
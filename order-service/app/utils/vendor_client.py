@@ -1,12 +1,12 @@
-import httpx
+from uuid import UUID
 from fastapi import HTTPException
 
-VENDOR_SERVICE_URL = "http://localhost:8001"  # adjust if needed
+from app.utils.http_client import service_clients
 
 
 async def get_slot_by_id(slot_id):
-    async with httpx.AsyncClient() as client:
-        response = await client.get(f"{VENDOR_SERVICE_URL}/slots/{slot_id}")
+    client = service_clients.get("vendor")
+    response = await client.get(f"/slots/{slot_id}")
 
     if response.status_code != 200:
         raise HTTPException(
@@ -18,8 +18,8 @@ async def get_slot_by_id(slot_id):
 
 
 async def get_vendor_id_by_phone(phone: str):
-    async with httpx.AsyncClient() as client:
-        response = await client.get(f"{VENDOR_SERVICE_URL}/vendors/phone/{phone}")
+    client = service_clients.get("vendor")
+    response = await client.get(f"/vendors/phone/{phone}")
 
     if response.status_code != 200:
         raise HTTPException(
@@ -28,4 +28,4 @@ async def get_vendor_id_by_phone(phone: str):
         )
 
     vendor_data = response.json()
-    return vendor_data["id"]
+    return UUID(vendor_data["id"])
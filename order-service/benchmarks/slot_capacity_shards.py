@@ -0,0 +1,111 @@
+"""
+Hot slot booking: one Redis capacity counter vs sharded counters.
+
+Opens one slot of --capacity seats and fires --requests bookings at it
+(each a different student) from 1..N concurrent bookers (tasks on one
+event loop, as in a worker), once with the single counter and once per
+--shards value. Reports bookings per second
+and checks that exactly --capacity seats were sold.
+
+    cd order-service
+    REDIS_URL=redis://localhost:6379 python -m benchmarks.slot_capacity_shards \\
+        --capacity 300 --requests 3000 --concurrency 1 8 32 128 --shards 4 8
+
+Uses REDIS_URL directly (keys are created under a throwaway slot id and
+deleted afterwards); no database is needed since the counters are seeded
+in Redis.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+import uuid
+
+# Importing the engine sets up the (unused) database session
+os.environ.setdefault(
+    "ORDER_DB_URL",
+    f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_orders.db')}"
+)
+
+from app.services.slot_capacity import SlotCapacityEngine  # noqa: E402
+
+
+async def seed(engine: SlotCapacityEngine, slot_id, capacity: int):
+    keys = engine.capacity_keys(slot_id)
+    await engine.redis.delete(*keys, engine.holders_key(slot_id), engine.holder_changes_key(slot_id))
+    await engine.redis.mset(dict(zip(keys, engine.split_capacity(capacity, len(keys)))))
+
+
+async def cleanup(engine: SlotCapacityEngine, slot_id):
+    await engine.redis.delete(
+        *engine.capacity_keys(slot_id), engine.holders_key(slot_id), engine.holder_changes_key(slot_id)
+    )
+    await engine.redis.srem("slot_capacity:dirty", str(slot_id))
+
+
+async def booker(engine: SlotCapacityEngine, slot_id, students) -> int:
+    """One concurrent client: books for its share of the students in turn"""
+    sold = 0
+    for student in students:
+        # Counter is seeded, so the database is never consulted
+        if await engine.reserve(None, slot_id, student) >= 0:
+            sold += 1
+    return sold
+
+
+async def measure(shards: int, capacity: int, requests: int, concurrency: int, runs: int):
+    engine = SlotCapacityEngine(shards=shards)
+    rates = []
+
+    for _ in range(runs):
+        slot_id = uuid.uuid4()
+        await seed(engine, slot_id, capacity)
+        students = [f"bench-{i}" for i in range(requests)]
+        shares = [students[i::concurrency] for i in range(concurrency)]
+
+        try:
+            started = time.perf_counter()
+            sold = sum(await asyncio.gather(*(booker(engine, slot_id, share) for share in shares)))
+            elapsed = time.perf_counter() - started
+
+            remaining = (await engine.available_many([slot_id]))[0]
+        finally:
+            await cleanup(engine, slot_id)
+
+        if sold != capacity or remaining != 0:
+            raise SystemExit(f"shards={shards}: sold {sold} seats, {remaining} left (capacity {capacity})")
+
+        rates.append(requests / elapsed)
+
+    return statistics.median(rates)
+
+
+async def main(args):
+    print(
+        f"{args.capacity} seats, {args.requests} booking attempts, "
+        f"median of {args.runs} runs (bookings/s)"
+    )
+
+    modes = [1] + [shards for shards in args.shards if shards > 1]
+    print(f"{'concurrency':>11} " + " ".join(
+        f"{'single' if shards == 1 else f'{shards} shards':>10}" for shards in modes
+    ))
+
+    for concurrency in args.concurrency:
+        rates = [
+            await measure(shards, args.capacity, args.requests, concurrency, args.runs)
+            for shards in modes
+        ]
+        print(f"{concurrency:>11} " + " ".join(f"{rate:>10.0f}" for rate in rates))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--capacity", type=int, default=300)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--shards", type=int, nargs="+", default=[4, 8])
+    parser.add_argument("--runs", type=int, default=3)
+    asyncio.run(main(parser.parse_args()))
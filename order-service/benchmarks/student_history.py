@@ -0,0 +1,149 @@
+"""
+Student order history: per-order item loading (N+1) vs selectinload.
+
+Seeds one student with --orders orders of --items items each, then loads
+the history page by page both ways and reports queries and latency.
+
+    cd order-service
+    python -m benchmarks.student_history --orders 500 --items 3
+
+Runs against ORDER_DB_URL (defaults to a throwaway SQLite file).
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+os.environ.setdefault(
+    "ORDER_DB_URL",
+    f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_orders.db')}"
+)
+
+from sqlalchemy import event, select  # noqa: E402
+
+from app.db.models import Base, Order, OrderItem, OrderStatus  # noqa: E402
+from app.db.session import AsyncSessionLocal, async_engine, engine  # noqa: E402
+from app.schemas.order import order_response_list  # noqa: E402
+from app.services.booking import get_student_orders, student_orders_query  # noqa: E402
+from app.utils.pagination import apply_keyset, split_page  # noqa: E402
+
+STUDENT_PHONE = "bench-student"
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args, **kwargs):
+        self.count += 1
+
+
+def seed(orders: int, items: int):
+    Base.metadata.create_all(bind=engine)
+    start = datetime(2026, 1, 1)
+
+    with engine.begin() as conn:
+        conn.execute(Order.__table__.delete().where(Order.student_phone == STUDENT_PHONE))
+
+        order_rows = [
+            {
+                "id": uuid.uuid4(),
+                "student_phone": STUDENT_PHONE,
+                "vendor_id": uuid.uuid4(),
+                "slot_id": uuid.uuid4(),
+                "status": OrderStatus.completed,
+                "created_at": start + timedelta(minutes=i),
+            }
+            for i in range(orders)
+        ]
+        conn.execute(Order.__table__.insert(), order_rows)
+        conn.execute(OrderItem.__table__.insert(), [
+            {"id": uuid.uuid4(), "order_id": row["id"], "item_id": uuid.uuid4(), "quantity": 1}
+            for row in order_rows
+            for _ in range(items)
+        ])
+
+
+async def load_n_plus_one(limit: int):
+    """What lazy-loading `order.items` amounted to: one items query per order"""
+    cursor = None
+    async with AsyncSessionLocal() as db:
+        while True:
+            result = await db.scalars(
+                apply_keyset(student_orders_query(STUDENT_PHONE), Order, cursor, limit)
+            )
+            orders, cursor = split_page(result.all(), limit)
+            payload = []
+            for order in orders:
+                items = (await db.scalars(
+                    select(OrderItem).where(OrderItem.order_id == order.id)
+                )).all()
+                payload.append({
+                    "id": order.id,
+                    "vendor_id": order.vendor_id,
+                    "slot_id": order.slot_id,
+                    "status": order.status,
+                    "created_at": order.created_at,
+                    "items": items,
+                })
+            order_response_list.dump_json(
+                order_response_list.validate_python(payload, from_attributes=True)
+            )
+            if not cursor:
+                break
+
+
+async def load_selectin(limit: int):
+    """The /orders/student path"""
+    cursor = None
+    async with AsyncSessionLocal() as db:
+        while True:
+            orders, cursor = await get_student_orders(
+                db, STUDENT_PHONE, cursor=cursor, limit=limit
+            )
+            order_response_list.dump_json(
+                order_response_list.validate_python(orders, from_attributes=True)
+            )
+            if not cursor:
+                break
+
+
+async def measure(name: str, loader, limit: int, runs: int):
+    counter = QueryCounter()
+    event.listen(async_engine.sync_engine, "before_cursor_execute", counter)
+    timings = []
+    try:
+        for _ in range(runs):
+            counter.count = 0
+            started = time.perf_counter()
+            await loader(limit)
+            timings.append((time.perf_counter() - started) * 1000)
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", counter)
+
+    print(
+        f"{name:<12} queries={counter.count:<6} "
+        f"median={statistics.median(timings):8.1f} ms  "
+        f"min={min(timings):8.1f} ms"
+    )
+
+
+async def main(args):
+    seed(args.orders, args.items)
+    print(f"{args.orders} orders x {args.items} items, page size {args.limit}, {args.runs} runs")
+    await measure("n_plus_one", load_n_plus_one, args.limit, args.runs)
+    await measure("selectinload", load_selectin, args.limit, args.runs)
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--orders", type=int, default=500)
+    parser.add_argument("--items", type=int, default=3)
+    parser.add_argument("--limit", type=int, default=200)
+    parser.add_argument("--runs", type=int, default=5)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,54 @@
+"""
+Order-service tests run against a SQLite database and an in-process
+fakeredis server (Lua scripts need `lupa`), both set up before the app
+modules create their global clients.
+
+    pip install -r requirements-dev.txt
+    python -m pytest tests
+"""
+import asyncio
+import os
+import tempfile
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")
+
+import redis  # noqa: E402
+import redis.asyncio  # noqa: E402
+
+_server = fakeredis.FakeServer()
+redis.from_url = lambda *args, **kwargs: fakeredis.FakeRedis(server=_server)
+redis.asyncio.from_url = lambda *args, **kwargs: fakeredis.FakeAsyncRedis(server=_server)
+
+os.environ["ORDER_DB_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test_orders.db')}"
+
+from app.db.migrate import migrate  # noqa: E402
+from app.db.models import Base  # noqa: E402
+from app.db.session import engine  # noqa: E402
+from app.utils.redis_client import redis_client  # noqa: E402
+
+migrate()
+
+
+@pytest.fixture(scope="session")
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture
+def run(loop):
+    """Run a coroutine on the session's event loop (the async clients are bound to it)"""
+    return loop.run_until_complete
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    redis_client.client.flushall()
+    with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
+    yield
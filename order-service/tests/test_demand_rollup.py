@@ -0,0 +1,71 @@
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, update
+
+from app.db.models import Order, OrderDemandDaily, OrderDemandHourly, OrderStatus
+from app.db.session import AsyncSessionLocal
+from app.services.demand_rollup import roll_up
+
+PLACED_AT = (datetime.utcnow() - timedelta(hours=2)).replace(minute=10, second=0, microsecond=0)
+
+
+async def _add_orders(vendor_id, *statuses):
+    async with AsyncSessionLocal() as db:
+        orders = [
+            Order(
+                student_phone=f"student-{index}",
+                vendor_id=vendor_id,
+                slot_id=uuid.uuid4(),
+                status=status,
+                created_at=PLACED_AT + timedelta(seconds=index)
+            )
+            for index, status in enumerate(statuses)
+        ]
+        db.add_all(orders)
+        await db.commit()
+    return [order.id for order in orders]
+
+
+async def _counts(vendor_id):
+    async with AsyncSessionLocal() as db:
+        hourly = await db.scalar(select(OrderDemandHourly.order_count).where(OrderDemandHourly.vendor_id == vendor_id))
+        daily = await db.scalar(select(OrderDemandDaily.order_count).where(OrderDemandDaily.vendor_id == vendor_id))
+    return hourly, daily
+
+
+async def _roll_up():
+    async with AsyncSessionLocal() as db:
+        return await roll_up(db)
+
+
+# ======================================================
+# ROLLUP
+# ======================================================
+def test_only_confirmed_and_completed_orders_count(run):
+    vendor_id = uuid.uuid4()
+    run(_add_orders(
+        vendor_id,
+        OrderStatus.confirmed, OrderStatus.cancelled, OrderStatus.completed, OrderStatus.cancelled
+    ))
+
+    assert run(_roll_up()) == 4
+    assert run(_counts(vendor_id)) == (2, 2)
+
+
+def test_rollup_waits_for_pending_holds(run):
+    vendor_id = uuid.uuid4()
+    _, hold, _ = run(_add_orders(vendor_id, OrderStatus.confirmed, OrderStatus.pending, OrderStatus.confirmed))
+
+    assert run(_roll_up()) == 1
+    assert run(_roll_up()) == 0
+    assert run(_counts(vendor_id)) == (1, 1)
+
+    async def confirm():
+        async with AsyncSessionLocal() as db:
+            await db.execute(update(Order).where(Order.id == hold).values(status=OrderStatus.confirmed))
+            await db.commit()
+
+    run(confirm())
+    assert run(_roll_up()) == 2
+    assert run(_counts(vendor_id)) == (3, 3)
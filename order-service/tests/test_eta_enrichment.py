@@ -0,0 +1,87 @@
+import asyncio
+import uuid
+
+from app.db.models import Order, OrderStatus
+from app.db.session import AsyncSessionLocal
+from app.services import eta_enrichment
+from app.services.eta_enrichment import (
+    ETA_STREAM, _claim_stale, _ensure_group, _read_batch, enqueue_eta, enrich_batch
+)
+from app.utils.ai_client import ai_client
+from app.utils.redis_client import redis_client
+
+
+async def _add_order() -> Order:
+    async with AsyncSessionLocal() as db:
+        order = Order(
+            student_phone="student",
+            vendor_id=uuid.uuid4(),
+            slot_id=uuid.uuid4(),
+            status=OrderStatus.confirmed
+        )
+        db.add(order)
+        await db.commit()
+    await enqueue_eta(order)
+    return order
+
+
+def _predict(prediction):
+    async def predict_eta(request):
+        return prediction
+    return predict_eta
+
+
+async def _claim_idle():
+    # Pending entries count as idle only once the clock has moved on
+    await asyncio.sleep(0.01)
+    return await _claim_stale()
+
+
+async def _estimated_minutes(order_id):
+    async with AsyncSessionLocal() as db:
+        return (await db.get(Order, order_id)).estimated_minutes
+
+
+# ======================================================
+# QUEUE
+# ======================================================
+def test_entries_of_a_crashed_worker_are_reclaimed(run, monkeypatch):
+    monkeypatch.setattr(eta_enrichment, "ETA_CLAIM_IDLE_MS", 0)
+    monkeypatch.setattr(ai_client, "predict_eta", _predict({"estimated_minutes": 12, "confidence_score": 0.5}))
+
+    async def scenario():
+        await _ensure_group()
+        order = await _add_order()
+
+        # Read, then died before the commit
+        assert len(await _read_batch()) == 1
+        assert await _read_batch() == []
+
+        entries = await _claim_idle()
+        assert await enrich_batch(entries) == 1
+        return order, await redis_client.async_client.xlen(ETA_STREAM), await _claim_idle()
+
+    order, stream_length, pending = run(scenario())
+    assert run(_estimated_minutes(order.id)) == 12
+    assert stream_length == 0
+    assert pending == []
+
+
+def test_failed_predictions_are_retried_then_dropped(run, monkeypatch):
+    monkeypatch.setattr(eta_enrichment, "ETA_CLAIM_IDLE_MS", 0)
+    monkeypatch.setattr(ai_client, "predict_eta", _predict(None))
+
+    async def scenario():
+        await _ensure_group()
+        await _add_order()
+
+        entries = await _read_batch()
+        for _ in range(eta_enrichment.ETA_MAX_ATTEMPTS - 1):
+            assert await enrich_batch(entries) == 0
+            entries = await _claim_idle()
+            assert len(entries) == 1
+
+        assert await enrich_batch(entries) == 0
+        return await _claim_idle(), await redis_client.async_client.xlen(ETA_STREAM)
+
+    assert run(scenario()) == ([], 0)
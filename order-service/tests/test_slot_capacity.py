@@ -0,0 +1,161 @@
+import uuid
+
+from app.db.models import Order, OrderStatus, SlotReservation
+from app.db.session import AsyncSessionLocal
+from app.services import slot_capacity as slot_capacity_module
+from app.services.slot_capacity import slot_capacity
+from app.services.slot_sync import apply_capacities
+
+
+async def _add_slot(max_capacity: int, *students: str):
+    slot_id = uuid.uuid4()
+    async with AsyncSessionLocal() as db:
+        db.add(SlotReservation(
+            slot_id=slot_id,
+            available_capacity=max_capacity - len(students),
+            max_capacity=max_capacity
+        ))
+        for student in students:
+            db.add(Order(
+                student_phone=student,
+                vendor_id=uuid.uuid4(),
+                slot_id=slot_id,
+                status=OrderStatus.confirmed
+            ))
+        await db.commit()
+    return slot_id
+
+
+async def _holders(slot_id):
+    return {
+        holder.decode()
+        for holder in await slot_capacity.redis.smembers(slot_capacity.holders_key(slot_id))
+    }
+
+
+# ======================================================
+# RECONCILIATION
+# ======================================================
+def test_reconcile_returns_seat_reserved_without_order(run, monkeypatch):
+    slot_id = run(_add_slot(3, "booked"))
+
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            # A booking that died between reserve and commit
+            assert await slot_capacity.reserve(db, slot_id, "crashed") == 1
+        # ... long enough ago to be settled
+        monkeypatch.setattr(slot_capacity_module, "RECONCILE_GRACE", 0)
+
+        async with AsyncSessionLocal() as db:
+            assert await slot_capacity.reconcile(db) == 1
+
+        return await slot_capacity.available_many([slot_id]), await _holders(slot_id)
+
+    available, holders = run(scenario())
+    assert available == [2]
+    assert holders == {"booked"}
+
+
+def test_reconcile_leaves_reservations_still_committing(run):
+    slot_id = run(_add_slot(3, "booked"))
+
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            assert await slot_capacity.reserve(db, slot_id, "in-flight") == 1
+            await slot_capacity.reconcile(db)
+
+        return await slot_capacity.available_many([slot_id]), await _holders(slot_id)
+
+    available, holders = run(scenario())
+    assert available == [1]
+    assert holders == {"booked", "in-flight"}
+
+
+def test_reconcile_restores_seat_of_active_order(run, monkeypatch):
+    slot_id = run(_add_slot(3, "booked"))
+    monkeypatch.setattr(slot_capacity_module, "RECONCILE_GRACE", 0)
+
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            await slot_capacity.load(db, slot_id)
+        # Seat handed back while the order stayed active (e.g. a cancel that never committed)
+        await slot_capacity.release(slot_id, "booked")
+
+        async with AsyncSessionLocal() as db:
+            await slot_capacity.reconcile(db)
+
+        return await slot_capacity.available_many([slot_id]), await _holders(slot_id)
+
+    available, holders = run(scenario())
+    assert available == [2]
+    assert holders == {"booked"}
+
+
+# ======================================================
+# LOAD
+# ======================================================
+def test_reservation_right_after_load_keeps_its_holder(run, monkeypatch):
+    slot_id = run(_add_slot(3, "booked"))
+    seed = slot_capacity._seed
+
+    async def seed_then_reserve(*args, **kwargs):
+        seeded = await seed(*args, **kwargs)
+        # Another worker books as soon as the counter exists
+        async with AsyncSessionLocal() as db:
+            assert await slot_capacity.reserve(db, slot_id, "racer") == 1
+        return seeded
+
+    monkeypatch.setattr(slot_capacity, "_seed", seed_then_reserve)
+
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            assert await slot_capacity.load(db, slot_id)
+        return await slot_capacity.available_many([slot_id]), await _holders(slot_id)
+
+    available, holders = run(scenario())
+    assert available == [1]
+    assert holders == {"booked", "racer"}
+
+
+# ======================================================
+# CAPACITY CHANGES
+# ======================================================
+def test_capacity_change_committed_during_load_is_kept(run, monkeypatch):
+    slot_id = run(_add_slot(3, "booked"))
+    seed = slot_capacity._seed
+
+    async def seed_after_capacity_change(*args, **kwargs):
+        # The loader has read the old row; the vendor raises capacity to 5
+        # and the sync commits and adjusts before the counter is seeded
+        async with AsyncSessionLocal() as db:
+            assert await apply_capacities(db, {slot_id: 5}) == {slot_id: (2, 5)}
+        return await seed(*args, **kwargs)
+
+    monkeypatch.setattr(slot_capacity, "_seed", seed_after_capacity_change)
+
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            assert await slot_capacity.load(db, slot_id)
+        monkeypatch.setattr(slot_capacity, "_seed", seed)
+
+        # The change is applied exactly once, also when it is repeated
+        async with AsyncSessionLocal() as db:
+            await apply_capacities(db, {slot_id: 5})
+
+        return await slot_capacity.available_many([slot_id])
+
+    assert run(scenario()) == [4]
+
+
+def test_capacity_change_before_load_is_not_applied_twice(run):
+    slot_id = run(_add_slot(3, "booked"))
+
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            await apply_capacities(db, {slot_id: 5})
+        async with AsyncSessionLocal() as db:
+            assert await slot_capacity.load(db, slot_id)
+
+        return await slot_capacity.available_many([slot_id])
+
+    assert run(scenario()) == [4]
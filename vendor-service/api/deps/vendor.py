@@ -1,18 +1,73 @@
+import asyncio
+import json
+import logging
+import os
+from typing import NamedTuple
+from uuid import UUID
+
 from fastapi import Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from database import get_db
+from events import VENDOR_EVENTS_CHANNEL, vendor_phone_key
 from models import Vendor
+from redis_client import redis_client
 from security import verify_vendor_token
+from tnt_common.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+VENDOR_CACHE_SIZE = int(os.getenv("VENDOR_CACHE_SIZE", "4096"))
+VENDOR_CACHE_TTL = float(os.getenv("VENDOR_CACHE_TTL", "60"))
+VENDOR_CACHE_REDIS_TTL = int(os.getenv("VENDOR_CACHE_REDIS_TTL", "600"))
+
+_local = TTLCache(VENDOR_CACHE_SIZE, VENDOR_CACHE_TTL)
+
+
+class CurrentVendor(NamedTuple):
+    """Identity of the calling vendor (all route handlers need is the id)"""
+    id: UUID
+    phone: str
+
+
+def _cached_vendor_id(phone: str):
+    vendor_id = _local.get(phone)
+    if vendor_id is not None:
+        return vendor_id
+
+    try:
+        cached = redis_client.get(vendor_phone_key(phone))
+    except Exception as e:
+        logger.warning(f"Vendor identity cache unavailable: {e}")
+        return None
+
+    if cached is None:
+        return None
+
+    vendor_id = UUID(cached.decode() if isinstance(cached, bytes) else cached)
+    _local.set(phone, vendor_id)
+    return vendor_id
 
 
 def get_current_vendor(
     token_data=Depends(verify_vendor_token),
     db: Session = Depends(get_db),
 ):
+    phone = token_data["phone"]
+
+    # 1️⃣ vendor_id claim embedded by auth-service
+    if token_data.get("vendor_id"):
+        return CurrentVendor(id=UUID(token_data["vendor_id"]), phone=phone)
+
+    # 2️⃣ phone -> vendor_id cache (shared with order-service)
+    vendor_id = _cached_vendor_id(phone)
+    if vendor_id is not None:
+        return CurrentVendor(id=vendor_id, phone=phone)
+
+    # 3️⃣ Database lookup
     vendor = (
         db.query(Vendor)
-        .filter(Vendor.phone == token_data.phone)
+        .filter(Vendor.phone == phone)
         .first()
     )
 
@@ -22,4 +77,35 @@ def get_current_vendor(
             detail="Vendor account not found"
         )
 
-    return vendor
+    _local.set(phone, vendor.id)
+    try:
+        redis_client.set(vendor_phone_key(phone), str(vendor.id), ttl_seconds=VENDOR_CACHE_REDIS_TTL)
+    except Exception as e:
+        logger.warning(f"Vendor identity cache unavailable: {e}")
+
+    return CurrentVendor(id=vendor.id, phone=phone)
+
+
+def evict_vendor(phone: str):
+    """Drop a phone from this process's identity cache"""
+    _local.delete(phone)
+
+
+async def run_vendor_invalidation():
+    """Drop cached vendor identities announced on the vendor_events channel"""
+    while True:
+        pubsub = redis_client.async_client.pubsub()
+        try:
+            await pubsub.subscribe(VENDOR_EVENTS_CHANNEL)
+            async for message in pubsub.listen():
+                if message["type"] != "message":
+                    continue
+                evict_vendor(json.loads(message["data"])["phone"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Vendor invalidation listener failed: {e}")
+            _local.clear()
+            await asyncio.sleep(1)
+        finally:
+            await pubsub.aclose()
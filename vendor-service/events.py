@@ -0,0 +1,189 @@
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import SlotEventOutbox
+from redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+# Shared with order-service (app/services/slot_cache.py, vendor_helper.py,
+# slot_events.py)
+SLOT_EVENTS_CHANNEL = "slot_events"
+VENDOR_EVENTS_CHANNEL = "vendor_events"
+SLOT_EVENTS_STREAM = "slot_events:stream"
+
+SLOT_EVENTS_STREAM_MAXLEN = int(os.getenv("SLOT_EVENTS_STREAM_MAXLEN", "100000"))
+OUTBOX_RELAY_INTERVAL = float(os.getenv("OUTBOX_RELAY_INTERVAL", "2"))
+OUTBOX_RELAY_BATCH = int(os.getenv("OUTBOX_RELAY_BATCH", "500"))
+OUTBOX_RETENTION = timedelta(hours=float(os.getenv("OUTBOX_RETENTION_HOURS", "24")))
+
+# Outlives any order-service fetch that compares against it
+SLOT_META_VERSION_TTL = 3600
+
+
+def slot_meta_key(slot_id) -> str:
+    return f"slot_meta:{slot_id}"
+
+
+def slot_meta_version_key(slot_id) -> str:
+    return f"slot_meta_version:{slot_id}"
+
+
+def vendor_phone_key(phone: str) -> str:
+    return f"vendor_phone:{phone}"
+
+
+def publish_slot_event(event: str, slot):
+    """
+    Announce a slot create/update/delete.
+
+    Drops the shared cached copy, bumps its version (so an order-service
+    fetch already in flight does not write the old copy back) and tells
+    every order-service worker to evict its local one. Never fails the
+    vendor request: cache TTLs bound staleness if Redis is unavailable.
+    """
+    try:
+        pipe = redis_client.client.pipeline(transaction=True)
+        pipe.incr(slot_meta_version_key(slot.id))
+        pipe.expire(slot_meta_version_key(slot.id), SLOT_META_VERSION_TTL)
+        pipe.delete(slot_meta_key(slot.id))
+        pipe.execute()
+        redis_client.publish(
+            SLOT_EVENTS_CHANNEL,
+            json.dumps({
+                "event": event,
+                "slot_id": str(slot.id),
+                "vendor_id": str(slot.vendor_id)
+            })
+        )
+    except Exception as e:
+        logger.warning(f"Failed to publish slot {event} event: {e}")
+
+
+def publish_vendor_event(event: str, vendor):
+    """
+    Announce a vendor create/change so every service drops its cached
+    phone -> vendor_id mapping for that phone.
+    """
+    try:
+        redis_client.delete(vendor_phone_key(vendor.phone))
+        redis_client.publish(
+            VENDOR_EVENTS_CHANNEL,
+            json.dumps({
+                "event": event,
+                "vendor_id": str(vendor.id),
+                "phone": vendor.phone
+            })
+        )
+    except Exception as e:
+        logger.warning(f"Failed to publish vendor {event} event: {e}")
+
+
+# ======================================================
+# SLOT EVENT OUTBOX -> REDIS STREAM
+# ======================================================
+def record_slot_event(db: Session, event: str, slot):
+    """
+    Queue a slot event in the outbox. Call before commit: the event is
+    stored in the same transaction as the slot change, so a committed
+    change is never lost even if Redis is down.
+
+    Bumps the slot's version, which the event carries. The caller holds
+    the slot's row lock (or just created it), so versions follow the
+    commit order of the slot's changes, which outbox ids do not.
+    """
+    slot.version = (slot.version or 0) + 1
+    db.add(SlotEventOutbox(
+        event=event,
+        slot_id=slot.id,
+        vendor_id=slot.vendor_id,
+        max_capacity=slot.max_capacity,
+        slot_version=slot.version
+    ))
+
+
+def relay_outbox(db: Session) -> int:
+    """
+    XADD one batch of unpublished outbox rows to the slot event stream and
+    mark them published. A crash between the two re-sends the batch:
+    delivery is at-least-once and consumers dedupe on the slot version
+    (so an event relayed after a newer one of its slot is dropped).
+    """
+    query = (
+        select(SlotEventOutbox)
+        .where(SlotEventOutbox.published_at.is_(None))
+        .order_by(SlotEventOutbox.id)
+        .limit(OUTBOX_RELAY_BATCH)
+    )
+    if db.get_bind().dialect.name == "postgresql":
+        # Concurrent relays (request path + background) split the rows
+        query = query.with_for_update(skip_locked=True)
+
+    rows = db.scalars(query).all()
+    if not rows:
+        db.rollback()
+        return 0
+
+    pipe = redis_client.client.pipeline(transaction=False)
+    for row in rows:
+        pipe.xadd(
+            SLOT_EVENTS_STREAM,
+            {
+                "outbox_id": row.id,
+                "event": row.event,
+                "slot_id": str(row.slot_id),
+                "vendor_id": str(row.vendor_id),
+                "max_capacity": row.max_capacity if row.max_capacity is not None else "",
+                "slot_version": row.slot_version if row.slot_version is not None else "",
+            },
+            maxlen=SLOT_EVENTS_STREAM_MAXLEN,
+            approximate=True
+        )
+    pipe.execute()
+
+    published_at = datetime.utcnow()
+    for row in rows:
+        row.published_at = published_at
+    db.commit()
+
+    return len(rows)
+
+
+def publish_outbox(db: Session):
+    """Relay right after a slot change commits; the background relay retries on failure"""
+    try:
+        relay_outbox(db)
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"Outbox relay failed (will retry in background): {e}")
+
+
+def _relay_pending():
+    with SessionLocal() as db:
+        while relay_outbox(db) >= OUTBOX_RELAY_BATCH:
+            pass
+
+        db.execute(
+            delete(SlotEventOutbox).where(
+                SlotEventOutbox.published_at < datetime.utcnow() - OUTBOX_RETENTION
+            )
+        )
+        db.commit()
+
+
+async def run_outbox_relay():
+    """Background relay for events the request path could not publish"""
+    while True:
+        try:
+            await asyncio.to_thread(_relay_pending)
+        except Exception as e:
+            logger.warning(f"Outbox relay failed: {e}")
+
+        await asyncio.sleep(OUTBOX_RELAY_INTERVAL)
@@ -1,15 +1,51 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from database import engine, Base
 import models  # IMPORTANT
+from migrate_db import migrate
 
-Base.metadata.create_all(bind=engine)
+# Bring the schema up to date (AUTO_MIGRATE=false to run `python migrate_db.py` separately)
+if os.getenv("AUTO_MIGRATE", "true").lower() == "true":
+    migrate()
 
 from routes.vendor_routes import router as vendor_router
 from routes.menu_routes import router as menu_router
 from routes.item_routes import router as item_router
 from routes.slot_routes import router as slot_router
+from api.deps.vendor import run_vendor_invalidation
+from events import run_outbox_relay
+from tnt_common.metrics import MetricsMiddleware, metrics_response
+from tnt_common.rate_limit import RateLimitMiddleware
+from redis_client import redis_client
+from security import SECRET_KEY, ALGORITHM
 
-app = FastAPI(title="TNT Vendor Service")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    background_tasks = [
+        # Keep the vendor identity cache in step across workers
+        asyncio.create_task(run_vendor_invalidation()),
+        # Slot events the request path could not hand to Redis
+        asyncio.create_task(run_outbox_relay()),
+    ]
+    yield
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+
+
+app = FastAPI(title="TNT Vendor Service", lifespan=lifespan)
+
+app.add_middleware(
+    RateLimitMiddleware,
+    service="vendor",
+    redis=redis_client.async_client,
+    jwt_secret=SECRET_KEY,
+    jwt_algorithm=ALGORITHM
+)
+# Outermost, so rate-limited requests are timed too
+app.add_middleware(MetricsMiddleware)
 
 @app.get("/")
 def root():
@@ -19,6 +55,10 @@ def root():
         "docs": "/docs"
     }
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return metrics_response()
+
 app.include_router(vendor_router)
 app.include_router(menu_router)
 app.include_router(item_router)
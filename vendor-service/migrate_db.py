@@ -1,11 +1,109 @@
-from database import engine, Base
+"""
+Numbered, forward-only schema migrations (replaces the old drop-and-recreate).
+
+Every module in migrations/ named NNNN_description.py defines
+`upgrade(conn)`. Modules that must run outside a transaction (CREATE INDEX
+CONCURRENTLY) set `TRANSACTIONAL = False`. Applied versions are recorded in
+`schema_migrations`; a Postgres advisory lock keeps several workers booting
+at once from racing each other.
+
+    python migrate_db.py            # apply pending migrations
+    python migrate_db.py --status   # list applied / pending
+"""
+import argparse
+import importlib
+import logging
+import pkgutil
+from datetime import datetime
+from typing import List, Tuple
+
 from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+import migrations
+from database import engine
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_TABLE = "schema_migrations"
+
+# pg_advisory_lock key, unique per service database
+ADVISORY_LOCK_ID = 70010001
+
+
+def discover() -> List[Tuple[str, object]]:
+    """All migration modules, in version order"""
+    return [
+        (name, importlib.import_module(f"{migrations.__name__}.{name}"))
+        for _, name, _ in sorted(pkgutil.iter_modules(migrations.__path__))
+        if name[:4].isdigit()
+    ]
+
+
+def _ensure_table(conn: Connection):
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} ("
+        "version VARCHAR(255) PRIMARY KEY, "
+        "applied_at TIMESTAMP NOT NULL)"
+    ))
+
+
+def applied_versions(bind: Engine = engine) -> set:
+    with bind.begin() as conn:
+        _ensure_table(conn)
+        return set(conn.scalars(text(f"SELECT version FROM {MIGRATIONS_TABLE}")))
+
+
+def _apply(bind: Engine, name: str, module):
+    def run(conn: Connection):
+        module.upgrade(conn)
+        conn.execute(
+            text(f"INSERT INTO {MIGRATIONS_TABLE} (version, applied_at) VALUES (:version, :applied_at)"),
+            {"version": name, "applied_at": datetime.utcnow()}
+        )
+
+    if getattr(module, "TRANSACTIONAL", True):
+        with bind.begin() as conn:
+            run(conn)
+    else:
+        with bind.connect() as conn:
+            run(conn.execution_options(isolation_level="AUTOCOMMIT"))
+
+
+def migrate(bind: Engine = engine) -> List[str]:
+    """Apply every pending migration; returns the versions applied"""
+    is_postgres = bind.dialect.name == "postgresql"
+    applied = []
+
+    with bind.connect() as lock_conn:
+        if is_postgres:
+            lock_conn.execute(text("SELECT pg_advisory_lock(:id)"), {"id": ADVISORY_LOCK_ID})
+            lock_conn.commit()
+        try:
+            done = applied_versions(bind)
+            for name, module in discover():
+                if name in done:
+                    continue
+                logger.info(f"Applying migration {name}")
+                _apply(bind, name, module)
+                applied.append(name)
+        finally:
+            if is_postgres:
+                lock_conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": ADVISORY_LOCK_ID})
+                lock_conn.commit()
+
+    return applied
 
-# Drop all tables and recreate with new schema
-print("Dropping all tables...")
-Base.metadata.drop_all(bind=engine)
 
-print("Creating all tables with new schema...")
-Base.metadata.create_all(bind=engine)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vendor service schema migrations")
+    parser.add_argument("--status", action="store_true", help="list migrations without applying")
+    args = parser.parse_args()
 
-print("Migration completed successfully.")
+    if args.status:
+        done = applied_versions()
+        for name, _ in discover():
+            print(f"{'applied' if name in done else 'pending'}  {name}")
+    else:
+        applied = migrate()
+        print(f"Applied: {', '.join(applied)}" if applied else "Schema is up to date")
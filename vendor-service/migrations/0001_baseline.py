@@ -0,0 +1,7 @@
+"""Tables as they existed before migrations (create_all never drops or alters)"""
+from database import Base
+import models  # noqa: F401  (registers the tables)
+
+
+def upgrade(conn):
+    Base.metadata.create_all(bind=conn)
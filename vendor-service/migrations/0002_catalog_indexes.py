@@ -0,0 +1,13 @@
+"""Indexes for slot overlap checks and menu / item listings"""
+from migrations import create_index
+
+TRANSACTIONAL = False
+
+
+def upgrade(conn):
+    # Overlap check and vendor slot listing
+    create_index(conn, "ix_slots_vendor_time", "slots", "vendor_id, start_time, end_time")
+
+    # Items of a menu, menus of a vendor
+    create_index(conn, "ix_items_menu_id", "items", "menu_id")
+    create_index(conn, "ix_menus_vendor_id", "menus", "vendor_id")
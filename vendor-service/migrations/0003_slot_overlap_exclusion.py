@@ -0,0 +1,33 @@
+"""
+Database-enforced slot overlap prevention (Postgres only).
+
+The route-level overlap query is check-then-insert, so two concurrent
+requests can both pass it. The exclusion constraint makes the database
+reject the loser. Existing overlapping slots must be fixed before this
+migration can apply.
+"""
+from sqlalchemy import text
+
+
+def upgrade(conn):
+    if conn.dialect.name != "postgresql":
+        return
+
+    # `vendor_id WITH =` inside a GiST index needs btree_gist
+    conn.execute(text("CREATE EXTENSION IF NOT EXISTS btree_gist"))
+
+    # Postgres ships no time-of-day range type
+    has_type = conn.scalar(text("SELECT 1 FROM pg_type WHERE typname = 'timerange'"))
+    if not has_type:
+        conn.execute(text("CREATE TYPE timerange AS RANGE (subtype = time)"))
+
+    has_constraint = conn.scalar(text("SELECT 1 FROM pg_constraint WHERE conname = 'slots_no_overlap'"))
+    if not has_constraint:
+        # Half-open [start, end) ranges match the route check (start < end' AND end > start');
+        # rows without a valid range are left to the application
+        conn.execute(text(
+            "ALTER TABLE slots ADD CONSTRAINT slots_no_overlap EXCLUDE USING gist ("
+            "vendor_id WITH =, "
+            "timerange(start_time, end_time) WITH &&"
+            ") WHERE (start_time < end_time)"
+        ))
@@ -0,0 +1,8 @@
+"""Transactional outbox for slot events"""
+from database import Base
+from models import SlotEventOutbox
+
+
+def upgrade(conn):
+    # Creates ix_slot_event_outbox_unpublished with the table
+    Base.metadata.create_all(bind=conn, tables=[SlotEventOutbox.__table__])
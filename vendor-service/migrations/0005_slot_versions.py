@@ -0,0 +1,8 @@
+"""Per-slot versions, bumped under the row lock, for ordering slot events"""
+from migrations import add_column
+
+
+def upgrade(conn):
+    add_column(conn, "slots", "version", "INTEGER NOT NULL DEFAULT 0")
+    # Rows queued before this carry no version; consumers skip them
+    add_column(conn, "slot_event_outbox", "slot_version", "INTEGER")
@@ -0,0 +1,39 @@
+"""
+Vendor service migrations (applied by migrate_db.py).
+
+0001 creates the current model schema on an empty database, so every
+later migration must be idempotent (IF NOT EXISTS / existence checks):
+on a fresh database its objects may already be there.
+"""
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+
+def create_index(conn: Connection, name: str, table: str, columns: str, where: str = None):
+    """
+    CREATE INDEX IF NOT EXISTS; CONCURRENTLY on Postgres so writes keep
+    flowing (the calling migration must set TRANSACTIONAL = False).
+    """
+    if conn.dialect.name == "postgresql":
+        # A failed concurrent build leaves an INVALID index that IF NOT EXISTS would keep
+        invalid = conn.scalar(text(
+            "SELECT NOT i.indisvalid FROM pg_index i "
+            "JOIN pg_class c ON c.oid = i.indexrelid WHERE c.relname = :name"
+        ), {"name": name})
+        if invalid:
+            conn.execute(text(f"DROP INDEX CONCURRENTLY {name}"))
+        concurrently = "CONCURRENTLY "
+    else:
+        concurrently = ""
+
+    sql = f"CREATE INDEX {concurrently}IF NOT EXISTS {name} ON {table} ({columns})"
+    if where:
+        sql += f" WHERE {where}"
+    conn.execute(text(sql))
+
+
+def add_column(conn: Connection, table: str, column: str, ddl: str):
+    """ALTER TABLE .. ADD COLUMN unless it is already there (SQLite has no IF NOT EXISTS)"""
+    if column in {c["name"] for c in inspect(conn).get_columns(table)}:
+        return
+    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
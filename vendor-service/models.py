@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Time
+from sqlalchemy import Column, Integer, BigInteger, String, ForeignKey, Time, DateTime, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import uuid
+from datetime import datetime
 from database import Base
 
 # ---------- Vendor ----------
@@ -24,7 +25,7 @@ class Menu(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String, nullable=False)
 
-    vendor_id = Column(UUID(as_uuid=True), ForeignKey("vendors.id"))
+    vendor_id = Column(UUID(as_uuid=True), ForeignKey("vendors.id"), index=True)
 
     vendor = relationship("Vendor", back_populates="menus")
     items = relationship("Item", back_populates="menu", cascade="all, delete")
@@ -40,7 +41,7 @@ class Item(Base):
     description = Column(String)
     is_available = Column(String, default="yes")
 
-    menu_id = Column(UUID(as_uuid=True), ForeignKey("menus.id"))
+    menu_id = Column(UUID(as_uuid=True), ForeignKey("menus.id"), index=True)
 
     menu = relationship("Menu", back_populates="items")
 
@@ -58,4 +59,37 @@ class Slot(Base):
     max_capacity = Column(Integer, default=20)
     current_load = Column(Integer, default=0)
 
+    # Bumped with every change, under the row lock: orders a slot's events
+    version = Column(Integer, nullable=False, default=0, server_default="0")
+
     vendor = relationship("Vendor", back_populates="slots")
+
+    # Mirrors migrations/0002 (the overlap exclusion constraint lives in 0003 only)
+    __table_args__ = (
+        Index("ix_slots_vendor_time", "vendor_id", "start_time", "end_time"),
+    )
+
+
+# ---------- Slot Event Outbox ----------
+class SlotEventOutbox(Base):
+    """Slot changes written with the change itself, relayed to the slot event stream"""
+    __tablename__ = "slot_event_outbox"
+
+    # Relay order only: ids are taken before commit, so they can commit out of order
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    event = Column(String, nullable=False)
+    slot_id = Column(UUID(as_uuid=True), nullable=False)
+    vendor_id = Column(UUID(as_uuid=True), nullable=False)
+    max_capacity = Column(Integer)
+    # Slot version after the change: the event version consumers dedupe on
+    slot_version = Column(Integer)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    published_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index(
+            "ix_slot_event_outbox_unpublished", "id",
+            postgresql_where=text("published_at IS NULL"),
+            sqlite_where=text("published_at IS NULL")
+        ),
+    )
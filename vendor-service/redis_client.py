@@ -0,0 +1,41 @@
+import redis
+import redis.asyncio
+import os
+from typing import Optional
+
+from tnt_common.metrics import instrument_redis
+
+# Redis configuration (shared with order-service)
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+
+class RedisClient:
+    def __init__(self):
+        self.client = instrument_redis(redis.from_url(REDIS_URL))
+        # Event-loop client for long-lived listeners (pub/sub)
+        self.async_client = instrument_redis(redis.asyncio.from_url(REDIS_URL))
+
+    def get(self, key: str) -> Optional[str]:
+        """Get value from Redis"""
+        return self.client.get(key)
+
+    def set(self, key: str, value: str, ttl_seconds: Optional[int] = None) -> bool:
+        """Set value in Redis with optional TTL"""
+        return self.client.set(key, value, ex=ttl_seconds)
+
+    def delete(self, *keys: str) -> int:
+        """Delete keys from Redis"""
+        return self.client.delete(*keys)
+
+    def publish(self, channel: str, message: str) -> int:
+        """Publish a message on a pub/sub channel"""
+        return self.client.publish(channel, message)
+
+    def ping(self) -> bool:
+        """Check Redis connectivity"""
+        try:
+            return self.client.ping()
+        except:
+            return False
+
+# Global Redis client instance
+redis_client = RedisClient()
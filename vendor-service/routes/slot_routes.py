@@ -1,12 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
+from sqlalchemy.exc import IntegrityError
 
 from api.deps.vendor import get_current_vendor
 from database import get_db
 from models import Slot
 from schemas import SlotCreate, SlotResponse
 from security import verify_vendor_token
+from events import publish_slot_event, record_slot_event, publish_outbox
 
 # 🔐 ROUTER-LEVEL SECURITY (APPLIED ONCE)
 router = APIRouter(
@@ -15,6 +17,24 @@ router = APIRouter(
     dependencies=[Depends(verify_vendor_token)]
 )
 
+# --------------------------------------------------
+# OVERLAP CHECK (half-open [start, end), on ix_slots_vendor_time)
+# --------------------------------------------------
+def find_overlapping_slot(db: Session, vendor_id, start_time, end_time, exclude_slot_id=None):
+    query = db.query(Slot).filter(
+        Slot.vendor_id == vendor_id,
+        and_(
+            Slot.start_time < end_time,
+            Slot.end_time > start_time,
+        )
+    )
+
+    if exclude_slot_id is not None:
+        query = query.filter(Slot.id != exclude_slot_id)
+
+    return query.first()
+
+
 # --------------------------------------------------
 # CREATE SLOT (vendor ownership + overlap prevention)
 # --------------------------------------------------
@@ -25,16 +45,8 @@ def create_slot(
     current_vendor = Depends(get_current_vendor),
 ):
     # 1️⃣ Prevent overlapping slots for same vendor
-    overlapping_slot = (
-        db.query(Slot)
-        .filter(
-            Slot.vendor_id == current_vendor.id,
-            and_(
-                Slot.start_time < slot.end_time,
-                Slot.end_time > slot.start_time,
-            )
-        )
-        .first()
+    overlapping_slot = find_overlapping_slot(
+        db, current_vendor.id, slot.start_time, slot.end_time
     )
 
     if overlapping_slot:
@@ -51,9 +63,22 @@ def create_slot(
     )
 
     db.add(new_slot)
-    db.commit()
+    try:
+        db.flush()  # assign new_slot.id for the outbox row
+        record_slot_event(db, "slot.created", new_slot)
+        db.commit()
+    except IntegrityError:
+        # Lost a race to a concurrent overlapping insert (slots_no_overlap)
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Slot time overlaps with an existing slot"
+        )
     db.refresh(new_slot)
 
+    publish_slot_event("slot.created", new_slot)
+    publish_outbox(db)
+
     return new_slot
 
 
@@ -115,6 +140,7 @@ def update_slot(
             Slot.id == slot_id,
             Slot.vendor_id == current_vendor.id
         )
+        .with_for_update()  # serializes the slot's changes (and event versions)
         .first()
     )
 
@@ -125,17 +151,8 @@ def update_slot(
         )
 
     # Prevent overlap on update
-    overlapping_slot = (
-        db.query(Slot)
-        .filter(
-            Slot.vendor_id == current_vendor.id,
-            Slot.id != slot_id,
-            and_(
-                Slot.start_time < slot.end_time,
-                Slot.end_time > slot.start_time,
-            )
-        )
-        .first()
+    overlapping_slot = find_overlapping_slot(
+        db, current_vendor.id, slot.start_time, slot.end_time, exclude_slot_id=slot_id
     )
 
     if overlapping_slot:
@@ -147,10 +164,22 @@ def update_slot(
     existing_slot.start_time = slot.start_time
     existing_slot.end_time = slot.end_time
     existing_slot.max_capacity = slot.max_capacity
+    record_slot_event(db, "slot.updated", existing_slot)
 
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # Lost a race to a concurrent overlapping write (slots_no_overlap)
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Updated slot overlaps with another slot"
+        )
     db.refresh(existing_slot)
 
+    publish_slot_event("slot.updated", existing_slot)
+    publish_outbox(db)
+
     return existing_slot
 
 
@@ -169,6 +198,7 @@ def delete_slot(
             Slot.id == slot_id,
             Slot.vendor_id == current_vendor.id
         )
+        .with_for_update()  # serializes the slot's changes (and event versions)
         .first()
     )
 
@@ -178,7 +208,11 @@ def delete_slot(
             detail="Slot not found"
         )
 
+    record_slot_event(db, "slot.deleted", slot)
     db.delete(slot)
     db.commit()
 
+    publish_slot_event("slot.deleted", slot)
+    publish_outbox(db)
+
     return {"message": "Slot deleted"}
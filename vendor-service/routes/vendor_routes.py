@@ -5,6 +5,7 @@ from database import get_db
 from models import Vendor
 from schemas import VendorCreate, VendorResponse
 from security import verify_vendor_token
+from events import publish_vendor_event
 
 router = APIRouter(prefix="/vendors", tags=["Vendors"])
 
@@ -27,6 +28,8 @@ def create_vendor(vendor: VendorCreate, db: Session = Depends(get_db)):
     db.commit()
     db.refresh(new_vendor)
 
+    publish_vendor_event("vendor.created", new_vendor)
+
     return new_vendor
 
 
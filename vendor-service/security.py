@@ -23,7 +23,9 @@ def verify_vendor_token(
 
         return {
             "phone": phone,
-            "role": role
+            "role": role,
+            # Optional claim set by auth-service; lets us skip the phone lookup
+            "vendor_id": payload.get("vendor_id")
         }
 
     except Exception: